@@ -0,0 +1,282 @@
+import collections
+import concurrent.futures
+import hashlib
+import heapq
+import itertools
+import os
+import os.path as osp
+import threading
+import uuid
+
+import numpy as np
+
+from labelme.logger import logger
+
+DEFAULT_CACHE_DIR = osp.join(osp.expanduser("~"), ".cache", "labelme", "embeddings")
+DEFAULT_MAX_BYTES = 4 * 1024**3
+
+
+def compute_image_key(image: np.ndarray) -> str:
+    """Content hash of an image, used instead of keeping ``image.tobytes()``."""
+    image = np.ascontiguousarray(image)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((image.shape, image.dtype.str)).encode())
+    h.update(memoryview(image).cast("B"))
+    return h.hexdigest()
+
+
+def compute_model_id(encoder_path) -> str:
+    """Identity of an encoder model, derived from the file name, size and mtime.
+
+    Hashing the whole onnx file would take longer than a cache lookup saves,
+    and a replaced model file always changes its size or mtime.
+    """
+    st = os.stat(encoder_path)
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr((osp.basename(encoder_path), st.st_size, st.st_mtime_ns)).encode())
+    return "%s-%s" % (osp.splitext(osp.basename(encoder_path))[0], h.hexdigest())
+
+
+class EmbeddingCache:
+    """Disk-backed image embedding store shared across sessions.
+
+    Embeddings are saved as ``<cache_dir>/<model_id>/<image_key>.npy`` and
+    loaded back memory-mapped, so a hit costs a file open instead of running
+    the encoder. The total size of all ``.npy`` files under ``cache_dir`` is
+    kept below ``max_bytes`` by evicting the least recently used entries.
+    """
+
+    def __init__(self, model_id, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self._root = cache_dir or DEFAULT_CACHE_DIR
+        self._dir = osp.join(self._root, model_id)
+        self._max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # path -> size in bytes, ordered from least to most recently used
+        self._entries = None
+        self._total_bytes = 0
+
+    @classmethod
+    def for_encoder(cls, encoder_path, **kwargs):
+        try:
+            model_id = compute_model_id(encoder_path)
+        except OSError:
+            model_id = osp.splitext(osp.basename(encoder_path))[0]
+        return cls(model_id=model_id, **kwargs)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_entries()
+            return self._total_bytes
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._load_entries()
+            self._evict()
+
+    def _path(self, key):
+        return osp.join(self._dir, key + ".npy")
+
+    def _load_entries(self):
+        if self._entries is not None:
+            return
+        found = []
+        if osp.isdir(self._root):
+            for model_dir in os.scandir(self._root):
+                if not model_dir.is_dir():
+                    continue
+                for entry in os.scandir(model_dir.path):
+                    if not entry.name.endswith(".npy"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime_ns, entry.path, st.st_size))
+        found.sort()
+        self._entries = collections.OrderedDict((path, size) for _, path, size in found)
+        self._total_bytes = sum(self._entries.values())
+
+    def _evict(self, keep=None):
+        while self._total_bytes > self._max_bytes and self._entries:
+            path = next(iter(self._entries))
+            if path == keep:
+                if len(self._entries) == 1:
+                    break
+                self._entries.move_to_end(path)
+                continue
+            size = self._entries.pop(path)
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # e.g. still memory-mapped by this or another process on Windows
+                logger.debug(f"Failed to evict embedding {path!r}: {e}")
+
+    def get(self, key):
+        path = self._path(key)
+        with self._lock:
+            self._load_entries()
+            if path not in self._entries and not osp.exists(path):
+                return None
+            try:
+                # copy-on-write keeps the array writable for onnxruntime
+                # without ever touching the file
+                embedding = np.load(path, mmap_mode="c")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable embedding {path!r}: {e}")
+                size = self._entries.pop(path, 0)
+                self._total_bytes -= size
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                return None
+
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            else:
+                # written by another process after our directory scan
+                self._entries[path] = embedding.nbytes
+                self._total_bytes += embedding.nbytes
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return embedding
+
+    def __contains__(self, key):
+        return osp.exists(self._path(key))
+
+    def put(self, key, embedding: np.ndarray):
+        path = self._path(key)
+        tmp_path = "%s.%s.tmp" % (path, uuid.uuid4().hex)
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(embedding))
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"Failed to save embedding {path!r}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._load_entries()
+            self._total_bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            self._evict(keep=path)
+
+
+class EmbeddingScheduler:
+    """Runs an image encoder on a small pool of worker threads.
+
+    Requests for the image currently on the canvas are queued at priority 0
+    and always run before speculative requests for upcoming images (priority
+    >= 1), so at most ``max_workers`` in-flight speculative encodes delay the
+    current one. ``max_workers`` also caps the number of concurrent encoder
+    sessions. Both kinds of request store their result in ``cache``, and a
+    request for an image that is already being encoded shares that future.
+    """
+
+    def __init__(self, encode, cache, max_workers=1):
+        self._encode = encode
+        self._cache = cache
+        self._max_workers = max_workers
+
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (priority, seq, kind, payload)
+        self._seq = itertools.count()
+        self._inflight = {}  # image key -> Future
+        self._generation = 0
+        self._workers = []
+
+    def submit(self, image, key=None):
+        """Encode the current image ahead of all speculative work."""
+        if key is None:
+            key = compute_image_key(image)
+        with self._cond:
+            future = self._inflight.get(key)
+            if future is None:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+                self._push(0, "image", (key, image, future))
+            return future
+
+    def precompute(self, loaders):
+        """Replace the speculative queue with ``loaders``, nearest first.
+
+        Each loader is called on a worker thread and returns the image to
+        encode, or None to skip it.
+        """
+        with self._cond:
+            self._generation += 1
+            self._queue = [item for item in self._queue if item[2] == "image"]
+            heapq.heapify(self._queue)
+            for priority, load in enumerate(loaders, start=1):
+                self._push(priority, "load", (self._generation, load))
+
+    def cancel_precompute(self):
+        with self._cond:
+            self._generation += 1
+            self._queue = [item for item in self._queue if item[2] == "image"]
+            heapq.heapify(self._queue)
+
+    def _push(self, priority, kind, payload):
+        heapq.heappush(self._queue, (priority, next(self._seq), kind, payload))
+        if len(self._workers) < self._max_workers:
+            worker = threading.Thread(target=self._work, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+        self._cond.notify()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                _, _, kind, payload = heapq.heappop(self._queue)
+                if kind == "load" and payload[0] != self._generation:
+                    continue
+
+            if kind == "image":
+                key, image, future = payload
+            else:
+                try:
+                    image = payload[1]()
+                except Exception as e:
+                    logger.debug(f"Failed to load image for precompute: {e}")
+                    continue
+                if image is None:
+                    continue
+                key = compute_image_key(image)
+                with self._cond:
+                    if key in self._inflight:
+                        continue
+                    future = concurrent.futures.Future()
+                    self._inflight[key] = future
+
+            try:
+                embedding = self._cache.get(key)
+                if embedding is None:
+                    logger.debug(
+                        "Computing image embedding (%s)..."
+                        % ("current" if kind == "image" else "precompute")
+                    )
+                    embedding = self._encode(image)
+                    self._cache.put(key, embedding)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(embedding)
+            finally:
+                with self._cond:
+                    self._inflight.pop(key, None)
@@ -11,8 +11,19 @@ def _get_contour_length(contour):
     return np.linalg.norm(contour_end - contour_start, axis=1).sum()
 
 
-def compute_polygon_from_mask(mask):
-    contours = [contour - 0.5 for contour in skimage.measure.find_contours(np.pad(mask, pad_width=1), level=0.5)]
+def compute_polygon_from_mask(mask, offset=(0, 0), shape=None):
+    """Compute the outline polygon of a mask in xy coordinates.
+
+    ``mask`` may be a crop of a larger mask: ``offset`` is the (row, col) of
+    its top-left corner and ``shape`` the shape of the full mask. The result
+    is the same as for the full mask as long as the crop keeps a zero border
+    around the foreground wherever it does not touch the edge of the full
+    mask.
+    """
+    offset = np.asarray(offset, dtype=np.float64)
+    if shape is None:
+        shape = mask.shape
+    contours = [contour - 0.5 + offset for contour in skimage.measure.find_contours(np.pad(mask, pad_width=1), level=0.5)]
     if len(contours) == 0:
         logger.warning("No contour found, so returning empty polygon.")
         return np.empty((0, 2), dtype=np.float32)
@@ -23,7 +34,7 @@ def compute_polygon_from_mask(mask):
         coords=contour,
         tolerance=np.ptp(contour, axis=0).max() * POLYGON_APPROX_TOLERANCE,
     )
-    polygon = np.clip(polygon, (0, 0), (mask.shape[0] - 1, mask.shape[1] - 1))
+    polygon = np.clip(polygon, (0, 0), (shape[0] - 1, shape[1] - 1))
     polygon = polygon[:-1]  # drop last point that is duplicate of first point
 
     if 0:
@@ -1,12 +1,13 @@
-import collections
 import threading
 
 import imgviz
 import numpy as np
 import skimage
 
-from labelme.logger import logger
 from labelme.ai import _utils
+from labelme.ai._embedding_cache import EmbeddingCache
+from labelme.ai._embedding_cache import EmbeddingScheduler
+from labelme.ai._embedding_cache import compute_image_key
 
 
 class EfficientSam:
@@ -16,41 +17,53 @@ class EfficientSam:
         self._decoder_session = onnxruntime.InferenceSession(decoder_path)
 
         self._lock = threading.Lock()
-        self._image_embedding_cache = collections.OrderedDict()
+        self._embedding_cache = EmbeddingCache.for_encoder(encoder_path)
+        self._scheduler = EmbeddingScheduler(
+            encode=self._compute_image_embedding, cache=self._embedding_cache
+        )
 
-        self._thread = None
+        self._future = None
 
     def set_image(self, image: np.ndarray):
         with self._lock:
             self._image = image
-            self._image_embedding = self._image_embedding_cache.get(
-                self._image.tobytes()
-            )
-
-        if self._image_embedding is None:
-            self._thread = threading.Thread(
-                target=self._compute_and_cache_image_embedding
-            )
-            self._thread.start()
-
-    def _compute_and_cache_image_embedding(self):
-        with self._lock:
-            logger.debug("Computing image embedding...")
-            image = imgviz.rgba2rgb(self._image)
-            batched_images = image.transpose(2, 0, 1)[None].astype(np.float32) / 255.0
-            (self._image_embedding,) = self._encoder_session.run(
-                output_names=None,
-                input_feed={"batched_images": batched_images},
-            )
-            if len(self._image_embedding_cache) > 10:
-                self._image_embedding_cache.popitem(last=False)
-            self._image_embedding_cache[self._image.tobytes()] = self._image_embedding
-            logger.debug("Done computing image embedding.")
+            image_key = compute_image_key(image)
+            self._image_embedding = self._embedding_cache.get(image_key)
+            self._future = None
+            if self._image_embedding is None:
+                self._future = self._scheduler.submit(image, key=image_key)
+
+    def precompute_images(self, loaders):
+        """Encode upcoming images in the background into the embedding cache.
+
+        ``loaders`` are callables returning the image (as it would be passed
+        to ``set_image``) or None, ordered from the most to the least likely
+        to be visited next. Pending loaders from a previous call are dropped.
+        """
+        self._scheduler.precompute(loaders)
+
+    def cancel_precompute(self):
+        self._scheduler.cancel_precompute()
+
+    def _compute_image_embedding(self, image):
+        image = imgviz.rgba2rgb(image)
+        batched_images = image.transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+        (image_embedding,) = self._encoder_session.run(
+            output_names=None,
+            input_feed={"batched_images": batched_images},
+        )
+        return image_embedding
 
     def _get_image_embedding(self):
-        if self._thread is not None:
-            self._thread.join()
-            self._thread = None
+        with self._lock:
+            future = self._future
+        if future is not None:
+            embedding = future.result()
+            with self._lock:
+                if self._future is future:
+                    self._image_embedding = embedding
+                    self._future = None
+            return embedding
         with self._lock:
             return self._image_embedding
 
@@ -1316,11 +1316,13 @@ class MainWindow(QtWidgets.QMainWindow):
             shape.selected = False
         self.labelList.clearSelection()
         self.canvas.selectedShapes = selected_shapes
+        items = []
         for shape in self.canvas.selectedShapes:
             shape.selected = True
-            item = self.labelList.findItemByShape(shape)
-            self.labelList.selectItem(item)
-            self.labelList.scrollToItem(item)
+            items.append(self.labelList.findItemByShape(shape))
+        if items:
+            self.labelList.selectItems(items)
+            self.labelList.scrollToItem(items[-1])
         self._noSelectionSlot = False
         n_selected = len(selected_shapes)
         self.actions.delete.setEnabled(n_selected)
@@ -1382,9 +1384,8 @@ class MainWindow(QtWidgets.QMainWindow):
         return (0, 255, 0)
 
     def remLabels(self, shapes):
-        for shape in shapes:
-            item = self.labelList.findItemByShape(shape)
-            self.labelList.removeItem(item)
+        items = [self.labelList.findItemByShape(shape) for shape in shapes]
+        self.labelList.removeItems(items)
 
     def loadShapes(self, shapes, replace=True):
         self._noSelectionSlot = True
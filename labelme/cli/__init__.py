@@ -1,5 +1,6 @@
 # flake8: noqa
 
+from . import benchmark_json
 from . import draw_json
 from . import draw_label_png
 from . import export_json
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import argparse
+
+from labelme.label_file import LabelFile
+from labelme.utils import json_codec
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark label file load / save with each JSON backend"
+    )
+    parser.add_argument("json_file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--point-decimals",
+        type=int,
+        default=2,
+        help="point precision of the compact mode",
+    )
+    args = parser.parse_args()
+
+    data = json_codec.load_file(args.json_file)
+    compact_data = dict(
+        data, shapes=LabelFile.round_points(data["shapes"], args.point_decimals)
+    )
+
+    print(
+        "{:8} {:8} {:>10} {:>10} {:>10}".format(
+            "codec", "mode", "load ms", "save ms", "size KB"
+        )
+    )
+    for mode, obj, compact in [
+        ("indent", data, False),
+        ("compact", compact_data, True),
+    ]:
+        results = json_codec.benchmark(obj, compact=compact, repeat=args.repeat)
+        for codec, (load_seconds, save_seconds, size) in results.items():
+            print(
+                "{:8} {:8} {:10.1f} {:10.1f} {:10.0f}".format(
+                    codec,
+                    mode,
+                    load_seconds * 1000,
+                    save_seconds * 1000,
+                    size / 1024,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import argparse
 import base64
-import json
 import os
 import os.path as osp
 
@@ -9,6 +8,7 @@ import PIL.Image
 
 from labelme import utils
 from labelme.logger import logger
+from labelme.utils import json_codec
 
 
 def main():
@@ -37,7 +37,7 @@ def main():
     if not osp.exists(out_dir):
         os.mkdir(out_dir)
 
-    data = json.load(open(json_file))
+    data = json_codec.load_file(json_file)
     imageData = data.get("imageData")
 
     if not imageData:
@@ -1,6 +1,8 @@
 from qtpy import QtCore
 
 from labelme.ai.efficient_sam import *
+from labelme.ai._embedding_cache import EmbeddingCache
+from labelme.ai._embedding_cache import EmbeddingScheduler
 from labelme.dlcv.dlcv_translator import DlcvTrObject
 from labelme.dlcv.utils_func import notification
 import pynvml
@@ -47,8 +49,11 @@ class EfficientSam(EfficientSam, DlcvTrObject, QtCore.QObject):
         self._decoder_session = onnxruntime.InferenceSession(
             decoder_path, providers=providers)
         self._lock = threading.Lock()
-        self._image_embedding_cache = collections.OrderedDict()
-        self._thread = None
+        self._embedding_cache = EmbeddingCache.for_encoder(encoder_path)
+        self._scheduler = EmbeddingScheduler(
+            encode=self._compute_image_embedding, cache=self._embedding_cache
+        )
+        self._future = None
 
         super(QtCore.QObject, self).__init__(parent)
 
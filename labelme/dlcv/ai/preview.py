@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Optional
+
+import imgviz
+import numpy as np
+from qtpy import QtCore
+
+from labelme.logger import logger
+
+# 防抖间隔 (ms): 最后一次请求之后这么久没有新请求才开始解码，
+# 期间的鼠标移动只保留最新一次
+_DEBOUNCE_MS = 15
+
+
+class AiPreviewWorker(QtCore.QObject):
+    """
+    ai_polygon / ai_mask 悬停预览的后台解码器
+
+    原来 paintEvent 每次重绘都同步调用 SAM 解码器
+    （onnx + remove_small_objects + find_contours），
+    鼠标移动时界面明显卡顿。现在画布只提交请求：
+    1. 同一时刻只保留最新的一个请求，解码期间的鼠标位置直接被合并丢弃
+    2. 解码在后台线程进行，结果缓存为可直接绘制的几何数据，完成后发出 sig_ready
+    3. paintEvent 只读取缓存结果，不再调用模型
+    """
+
+    sig_ready = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._pending = None  # (key, generation, model, points, point_labels)
+        self._last_key = None  # 最近一次提交的请求 key，用于去重
+        self._requested_at = 0.0  # 最近一次提交请求的时间 (time.monotonic)
+        self._result = None  # (key, geometry)
+        self._generation = 0
+        self._thread = None
+
+    def request(self, model, mode: str, points, point_labels):
+        """提交预览请求，points 最后一个点为鼠标悬停点"""
+        key = (
+            id(model),
+            mode,
+            tuple((float(x), float(y)) for x, y in points),
+            tuple(int(label) for label in point_labels),
+        )
+        with self._cond:
+            if key == self._last_key:
+                return
+            self._last_key = key
+            self._pending = (key, self._generation, model, points, point_labels)
+            self._requested_at = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def result(self, model, mode: str, base_points) -> Optional[tuple]:
+        """
+        取出可绘制的最近一次预览结果
+
+        base_points 为当前图形已确定的点（不含悬停点），
+        与结果不属于同一个图形时返回 None；
+        鼠标仍在移动时返回的是上一次完成的结果，略有滞后但不会阻塞界面
+        """
+        with self._cond:
+            result = self._result
+        if result is None:
+            return None
+        key, geometry = result
+        base_points = tuple((float(p.x()), float(p.y())) for p in base_points)
+        if key[0] != id(model) or key[1] != mode or key[2][:-1] != base_points:
+            return None
+        return geometry
+
+    def clear(self):
+        """丢弃排队中的请求与缓存结果（切换图片、结束绘制时调用）"""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+            self._last_key = None
+            self._result = None
+
+    # region 后台线程
+    def _work(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                # 防抖：新请求会提前唤醒并替换 _pending，
+                # 一直等到最后一次请求之后 _DEBOUNCE_MS 内没有新请求
+                while self._pending is not None:
+                    remaining = (
+                        self._requested_at + _DEBOUNCE_MS / 1000.0 - time.monotonic()
+                    )
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._pending is None:
+                    continue
+                key, generation, model, points, point_labels = self._pending
+                self._pending = None
+
+            try:
+                geometry = _predict_geometry(model, key[1], points, point_labels)
+            except Exception as e:
+                logger.warning(f"AI preview failed: {e}")
+                continue
+
+            with self._cond:
+                if generation != self._generation:
+                    continue
+                self._result = (key, geometry)
+            self.sig_ready.emit()
+
+    # endregion
+
+
+def _predict_geometry(model, mode: str, points, point_labels):
+    """
+    调用解码器并转换为绘制用的几何数据
+
+    ai_polygon: 多边形顶点 (N, 2)，点数不足 3 时为 None
+    ai_mask: (x1, y1, x2, y2, 裁剪后的 mask)
+    """
+    if mode == "ai_polygon":
+        polygon = model.predict_polygon_from_points(
+            points=points, point_labels=point_labels
+        )
+        if len(polygon) <= 2:
+            return None
+        return np.asarray(polygon)
+
+    mask = model.predict_mask_from_points(points=points, point_labels=point_labels)
+    y1, x1, y2, x2 = imgviz.instances.masks_to_bboxes([mask])[0].astype(int)
+    return x1, y1, x2, y2, mask[y1 : y2 + 1, x1 : x2 + 1]
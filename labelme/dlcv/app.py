@@ -2,6 +2,8 @@ import sys
 import time  # noqa
 import traceback
 import math
+import copy
+import functools
 from pathlib import Path
 
 import labelme.dlcv.ai
@@ -31,13 +33,12 @@ import json
 
 from labelme import __appname__
 from labelme.app import *
-from labelme.dlcv.utils_func import notification, normalize_16b_gray_to_uint8, Toast, ToastPreset
+from labelme.dlcv.utils_func import notification, normalize_16b_gray_to_uint8, qimage_to_ai_input, Toast, ToastPreset
 from labelme.dlcv.store import STORE
 from labelme.dlcv import dlcv_tr
 from labelme.utils.qt import removeAction, newIcon
 from shapely.geometry import Polygon, LineString
 from shapely.ops import split
-from shapely.validation import explain_validity
 from labelme.dlcv.shape import ShapeType
 from labelme.utils import print_time  # noqa
 from labelme.dlcv.shape import Shape
@@ -62,6 +63,10 @@ from labelme.dlcv.canvas import CURSOR_DRAW
 import os
 from labelme.dlcv.widget.label_count import LabelCountDock
 from labelme.dlcv.ui_theme_manager import UiThemeManager
+from labelme.dlcv.image_prefetch import ImagePrefetcher
+from labelme.dlcv.image_pyramid import create_pixmap
+from labelme.dlcv.label_writer import LabelFileWriter, snapshot_shape, write_label_file
+from labelme.dlcv.shape_repair import PolygonValidityCache, fix_points, polygons_valid
 
 Image.MAX_IMAGE_PIXELS = None  # Image 最大像素限制, 防止加载大图时报错
 ImageFile.LOAD_TRUNCATED_IMAGES = True  # 解决图片加载失败问题
@@ -139,6 +144,14 @@ class MainWindow(MainWindow):
         self.settings = QtCore.QSettings("labelme", "labelme")
         # extra 额外属性
         self.action_refresh = None
+        # 切图预解码缓存，需在设置面板恢复设置之前创建
+        self.image_prefetcher = ImagePrefetcher()
+        # 不合法多边形的增量检查结果
+        self._polygon_validity = PolygonValidityCache()
+        # 标注文件后台保存
+        self.label_writer = LabelFileWriter()
+        # 为 True 时 setDirty 只标记为未保存，不触发自动保存
+        self._suspend_auto_save = False
         # 2.5D管理器
         STORE.register_main_window(self)
         super().__init__(config, filename, output, output_file, output_dir)
@@ -148,6 +161,7 @@ class MainWindow(MainWindow):
         Toast.setPositionRelativeToWidget(self)  # 通知控件
         self.dev_setting = QtCore.QSettings("baiduyun_dev", "ai")
         self.canvas.shapeMoved.connect(self._on_canvas_shape_moved)
+        self.label_writer.sig_save_failed.connect(self._on_label_save_failed)
         
         # 移除 [ImageData] 功能, 默认自动保存
         removeAction(self.menus.file, self.actions.saveWithImageData)
@@ -170,6 +184,7 @@ class MainWindow(MainWindow):
 
         self._init_dev_mode()
         self._init_ui()
+        self.image_prefetcher.set_max_bytes(STORE.prefetch_cache_bytes)
 
         # UI 主题由独立组件管理（仅外观，不改功能）
         self.ui_theme_manager = UiThemeManager(main_window=self, settings=self.settings)
@@ -493,6 +508,27 @@ class MainWindow(MainWindow):
         # 放在「打开目录」之后
         self.actions.tool.insert(1, self.action_refresh)
 
+        # 下一张未标注图片
+        self.actions.openNextUnannotatedImg = create_action(
+            dlcv_tr("下一张未标注"),
+            self.openNextUnannotatedImg,
+            "Shift+D",
+            "next",
+            dlcv_tr("打开下一张未标注的图片 (Shift+D)"),
+            enabled=False,
+        )
+        self.addAction(self.actions.openNextUnannotatedImg)
+        file_menu_actions = self.menus.file.actions()
+        if self.actions.openPrevImg in file_menu_actions:
+            prev_idx = file_menu_actions.index(self.actions.openPrevImg)
+            if prev_idx + 1 < len(file_menu_actions):
+                self.menus.file.insertAction(
+                    file_menu_actions[prev_idx + 1],
+                    self.actions.openNextUnannotatedImg,
+                )
+            else:
+                self.menus.file.addAction(self.actions.openNextUnannotatedImg)
+
         # 创建AI多边形
         ai_polygon_mode = self.actions.createAiPolygonMode
         ai_polygon_mode.setIconText(
@@ -795,7 +831,14 @@ class MainWindow(MainWindow):
             "canvas_points_to_crosshair": STORE.canvas_points_to_crosshair,
             "canvas_display_shape_center_cross": STORE.canvas_display_shape_center_cross,
             "canvas_shape_center_cross_length": STORE.canvas_shape_center_cross_length,
+            "prefetch_count": STORE.prefetch_count,
+            "prefetch_cache_mb": self.parameter.child(
+                "other_setting", "prefetch_cache_mb"
+            ).value(),
         })
+        self.image_prefetcher.shutdown()
+        # 等待后台保存全部写完
+        self.label_writer.shutdown()
         self.settings.setValue("setting_store", setting_store)
         self.__store_splitter_sizes()
         # extra End
@@ -1085,6 +1128,7 @@ class MainWindow(MainWindow):
             new_y = max(0, min(new_y, max_y))
             point.setX(new_x)
             point.setY(new_y)
+        shape.mark_geometry_changed()
 
         # 偏移后直接检查边界并自动调整
         self.check_and_adjust_shape_bounds(shape)
@@ -1136,6 +1180,7 @@ class MainWindow(MainWindow):
             new_y = max(0, min(new_y, max_y))
             point.setX(new_x)
             point.setY(new_y)
+        shape.mark_geometry_changed()
 
     # 检查形状是否超出当前图像边界，如果超出则调整
     def check_and_adjust_shape_bounds(self, shape):
@@ -1172,6 +1217,7 @@ class MainWindow(MainWindow):
                 new_y = max(0, min(new_y, max_y))
                 point.setX(new_x)
                 point.setY(new_y)
+            shape.mark_geometry_changed()
 
     def pasteSelectedShape(self):
         """从剪贴板粘贴形状或图像，粘贴位置跟随鼠标
@@ -1266,6 +1312,7 @@ class MainWindow(MainWindow):
                                 new_y = max(0, min(new_y, max_y))
                                 point.setX(new_x)
                                 point.setY(new_y)
+                            shape.mark_geometry_changed()
 
                 elif source_image_path == current_image_path:
                     logger.debug(f"=== DEBUG: 在同一张图片上粘贴，应用偏移 5 ===")
@@ -1349,33 +1396,16 @@ class MainWindow(MainWindow):
 
         lf = LabelFile()
 
-        def format_shape(s):
-            data = s.other_data.copy()
-            data.update(
-                dict(
-                    label=s.label.encode("utf-8") if PY2 else s.label,
-                    points=[(p.x(), p.y()) for p in s.points],
-                    group_id=s.group_id,
-                    description=s.description,
-                    shape_type=s.shape_type,
-                    flags=s.flags,
-                    mask=(
-                        None
-                        if s.mask is None
-                        else utils.img_arr_to_b64(s.mask.astype(np.uint8))
-                    ),
-                )
-            )
-            # 如果是旋转框，保存direction属性
-            if s.shape_type == "rotation":
-                data["direction"] = s.direction
-            return data
-
-        # extra 修正多边形，防止越界
-        for t_shape in self.canvas.shapes:
-            self.fix_shape(t_shape)
+        # extra 修正多边形，防止越界；越界裁剪与合法性检查批量完成，只有不合法的多边形才逐个修复
+        canvas_shapes = list(self.canvas.shapes)
+        for t_shape, is_valid in zip(
+            canvas_shapes, self._clip_and_check_shapes(canvas_shapes)
+        ):
+            if not is_valid:
+                self.fix_shape(t_shape)
 
-        shapes = [format_shape(item.shape()) for item in self.labelList]
+        # 复制保存所需的数据，mask 编码和写文件在后台线程完成
+        shapes = [snapshot_shape(item.shape()) for item in self.labelList]
 
         flags = {}
         for i in range(self.flag_widget.count()):
@@ -1387,21 +1417,20 @@ class MainWindow(MainWindow):
         # extra 如果当前 shapes 为空, 并且 flags 没有 true, 则删除标签文件
         if not shapes and not any(flags.values()):
             label_file = self.getLabelFile()
+            # 等待该文件之前的保存写完，避免删除后又被写出来
+            self.label_writer.wait(label_file)
             if osp.exists(label_file):
                 os.remove(label_file)
+                self.fileListWidget.set_label_file_exists(label_file, False)
                 items = self.fileListWidget.findItems(self.filename, Qt.MatchContains)
                 for item in items:
                     item.setCheckState(Qt.Unchecked)
                 logger.info(f"删除{label_file}")
             # 如果是2.5d模式，则需要更新所有使用该JSON的图片的勾选状态
             if self.is_2_5d:
-                # 从映射中查找完整路径
-                json_name = os.path.basename(label_file)
-                json_dir = os.path.dirname(label_file)  # 获取JSON文件所在目录
+                # 从分组索引中查找同一目录下使用该JSON的完整路径
                 proj_manager = self.proj_manager.o2_5d_manager
-                # 只查找同一目录下使用该JSON的完整路径
-                img_paths = [img_path for img_path, json_file in proj_manager._file_to_json.items()
-                            if json_file == json_name and os.path.dirname(img_path) == json_dir]
+                img_paths = proj_manager.get_group_img_paths(label_file)
                 for img_path in img_paths:
                     # 标准化路径格式
                     img_path = str(Path(img_path).absolute().as_posix())
@@ -1433,19 +1462,33 @@ class MainWindow(MainWindow):
                 self.otherData["img_name_list"] = img_name_list
             # extra End
 
-            lf.save(
-                filename=filename,
-                shapes=shapes,
-                imagePath=imagePath,
-                imageData=imageData,
-                imageHeight=self.image.height(),
-                imageWidth=self.image.width(),
-                otherData=self.otherData,
-                flags=flags,
+            # extra 文件在后台写入；self.labelFile 直接由保存的数据更新，与读回文件的结果一致，不再重新加载
+            otherData = copy.deepcopy(self.otherData)
+            if STORE.json_compact:
+                # 先取整再更新内存中的数据，与写入文件的内容一致
+                shapes = LabelFile.round_points(shapes, STORE.json_point_decimals)
+            # 需在提交写入之前调用，set_saved_data 会整理 shapes 中旋转框的字段
+            lf.set_saved_data(
+                filename, shapes, imagePath, flags=flags, otherData=otherData
+            )
+            self.label_writer.submit(
+                filename,
+                functools.partial(
+                    write_label_file,
+                    filename,
+                    shapes,
+                    mask_encoding=STORE.mask_encoding,
+                    compact=STORE.json_compact,
+                    imagePath=imagePath,
+                    imageData=imageData,
+                    imageHeight=self.image.height(),
+                    imageWidth=self.image.width(),
+                    otherData=otherData,
+                    flags=flags,
+                ),
             )
+            self.fileListWidget.set_label_file_exists(filename, True)
             self.labelFile = lf
-            # extra 保存成功后, self.labelFile 里的数据会被清空, 所以需要重新加载,防止别的地方调用 self.labelFile 时出错
-            self.labelFile.load(filename)
             # extra End
 
             # 保存标注时，设置文件列表的勾选状态
@@ -1454,13 +1497,9 @@ class MainWindow(MainWindow):
                 # 从otherData中获取图片列表
                 img_name_list = self.labelFile.otherData.get('img_name_list', [])
                 if img_name_list:
-                    # 从映射中查找完整路径
-                    json_name = os.path.basename(filename)
-                    json_dir = os.path.dirname(filename)  # 获取JSON文件所在目录
+                    # 从分组索引中查找同一目录下使用该JSON的完整路径
                     proj_manager = self.proj_manager.o2_5d_manager
-                    # 只查找同一目录下使用该JSON的完整路径
-                    img_paths = [img_path for img_path, json_file in proj_manager._file_to_json.items()
-                                if json_file == json_name and os.path.dirname(img_path) == json_dir]
+                    img_paths = proj_manager.get_group_img_paths(filename)
                     for img_path in img_paths:
                         # 标准化路径格式
                         img_path = str(Path(img_path).absolute().as_posix())
@@ -1632,11 +1671,30 @@ class MainWindow(MainWindow):
 
     def loadShapes(self, shapes: [Shape], replace=True):
         # extra 修复 points 少于 3 个点, 加载标签失败, 导致程序崩溃
-        fix_shapes = []
+        fix_shapes = self.fix_shapes(shapes)
+
+        # extra 批量添加：候选框顺序只同步一次，画布只保存一次撤销快照、重绘一次
+        self._noSelectionSlot = True
+        for shape in fix_shapes:
+            super().addLabel(shape)
+        if fix_shapes:
+            self._sync_label_dialog_order_with_uniq_list()
+        self.labelList.clearSelection()
+        self._noSelectionSlot = False
+        self.canvas.loadShapes(fix_shapes, replace=replace)
+
+        if len(fix_shapes) != len(shapes):
+            self.setDirty()
+        self.refresh_invalid_polygon_state()
+
+    def fix_shapes(self, shapes: [Shape]) -> [Shape]:
+        """
+        批量版 fix_shape：越界裁剪与多边形合法性检查都用 numpy / shapely 向量化完成，
+        只有不合法的多边形才逐个走 fix_shape 的修复流程
+        """
+        candidates = []
         for shape in shapes:
-            shape_label = shape.label
-            points_num = len(shape.points)
-            if points_num < 3 and shape.shape_type == ShapeType.POLYGON:
+            if len(shape.points) < 3 and shape.shape_type == ShapeType.POLYGON:
                 logger.warning(f"多边形: {shape.label} 小于 3 个点, 已删除")
                 continue
 
@@ -1645,17 +1703,54 @@ class MainWindow(MainWindow):
                 shape, "direction"
             ):
                 shape.direction = 0.0
+            candidates.append(shape)
 
-            shape = self.fix_shape(shape)
-            if shape is None:
-                logger.warning(f"多边形: {shape_label} 无法修复为合法多边形, 已删除")
-                continue
-            fix_shapes.append(shape)
+        valid = self._clip_and_check_shapes(candidates)
 
-        super().loadShapes(fix_shapes, replace)
-        if len(fix_shapes) != len(shapes):
-            self.setDirty()
-        self.refresh_invalid_polygon_state()
+        fixed = []
+        for shape, is_valid in zip(candidates, valid):
+            if not is_valid:
+                shape_label = shape.label
+                shape = self.fix_shape(shape)
+                if shape is None:
+                    logger.warning(f"多边形: {shape_label} 无法修复为合法多边形, 已删除")
+                    continue
+            fixed.append(shape)
+        return fixed
+
+    def _clip_and_check_shapes(self, shapes: [Shape]) -> np.ndarray:
+        """
+        把 shapes 的点裁剪到图片范围内，并批量检查多边形是否合法
+
+        :return: 与 shapes 等长的 bool 数组，非多边形为 True，少于 3 个点的多边形为 False
+        """
+        max_x, max_y = self.max_x_width, self.max_y_height
+        points_list = [
+            np.array([(p.x(), p.y()) for p in shape.points], dtype=np.float64).reshape(-1, 2)
+            for shape in shapes
+        ]
+        for shape, points in zip(shapes, points_list):
+            clipped = np.clip(points, 0, (max_x, max_y))
+            moved = np.flatnonzero((clipped != points).any(axis=1))
+            for i in moved:
+                shape.points[i].setX(clipped[i, 0])
+                shape.points[i].setY(clipped[i, 1])
+            # 点没有变化时不更新几何版本，绘制与合法性缓存继续有效
+            if len(moved):
+                shape.mark_geometry_changed()
+                points[:] = clipped
+
+        valid = np.ones(len(shapes), dtype=bool)
+        polygon_indices = []
+        for i, shape in enumerate(shapes):
+            if shape.shape_type != ShapeType.POLYGON:
+                continue
+            if len(points_list[i]) < 3:
+                valid[i] = False
+            else:
+                polygon_indices.append(i)
+        valid[polygon_indices] = polygons_valid([points_list[i] for i in polygon_indices])
+        return valid
 
     def undoShapeEdit(self):
         super().undoShapeEdit()
@@ -1744,10 +1839,10 @@ class MainWindow(MainWindow):
         #     return
 
         # changing fileListWidget loads file
-        if filename in self.imageList and (
-            self.fileListWidget.currentRow() != self.imageList.index(filename)
-        ):
-            self.fileListWidget.setCurrentRow(self.imageList.index(filename))
+        # PathTable.get 一次查找行号，不在列表中时为 -1
+        file_row = self.imageList.get(filename) if filename else -1
+        if file_row >= 0 and self.fileListWidget.currentRow() != file_row:
+            self.fileListWidget.setCurrentRow(file_row)
             self.fileListWidget.repaint()
             # return 不需要 return
 
@@ -1804,40 +1899,22 @@ class MainWindow(MainWindow):
             )
             return True
 
+        # 优先从预解码缓存中取 RGB 数组，未命中时同步解码
         try:
-            if osp.getsize(file_path) < 100000000:
-                if isinstance(file_path, str):
-                    file_path_encode = file_path.encode("utf-8")
-                cv_img = cv2.imdecode(
-                    np.fromfile(file_path_encode, dtype=np.uint8),
-                    cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH,
-                )
-            else:
-                image = Image.open(f"{file_path}")
-                image = np.array(image)
-                cv_img = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        except:
-            notification(
-                dlcv_tr("提示"), dlcv_tr("无法打开图片，请检查文件是否已损坏"), ToastPreset.ERROR
+            cv_rgb_img = self.image_prefetcher.get(
+                file_path, to_gray=STORE.convert_img_to_gray
             )
-            return False
+        except:
+            cv_rgb_img = None
 
-        if cv_img is None:
+        if cv_rgb_img is None:
             notification(
                 dlcv_tr("提示"), dlcv_tr("无法打开图片，请检查文件是否已损坏"), ToastPreset.ERROR
             )
             return False
 
-        cv_img = normalize_16b_gray_to_uint8(cv_img)
-        if len(cv_img.shape) == 2:
-            cv_rgb_img = cv2.cvtColor(cv_img, cv2.COLOR_GRAY2RGB)
-        else:
-            cv_rgb_img = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-
-        if STORE.convert_img_to_gray:
-            cv_rgb_img = cv2.cvtColor(cv_rgb_img, cv2.COLOR_RGB2GRAY)
-            cv_rgb_img = cv2.cvtColor(cv_rgb_img, cv2.COLOR_GRAY2RGB)
-
+        # QImage 不会拷贝数据，需持有数组引用
+        self._image_array = cv_rgb_img
         image = numpy_to_qimage(cv_rgb_img)
         # extra End
 
@@ -1862,8 +1939,10 @@ class MainWindow(MainWindow):
 
         # 默认重置偏移；若需要恢复当前文件历史视图，会在后续逻辑中覆盖
         self.canvas.offset = QtCore.QPointF(0, 0)
-        self.canvas.loadPixmap(QtGui.QPixmap.fromImage(image))
+        self.canvas.loadPixmap(create_pixmap(image, cv_rgb_img))
 
+        # 等待该文件的后台保存写完再读取
+        self.label_writer.wait(label_file)
         if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(label_file):
             try:
                 # 从标签文件里加载标签
@@ -1989,8 +2068,63 @@ class MainWindow(MainWindow):
         # extra load_file 之后自动保存一次,防止多个用户同时标注同一个文件夹不打钩
         self.setDirty()
         self._load_file_3d_callback()
+        self._prefetch_neighbor_images(filename)
+        self._precompute_ai_embeddings(filename)
         return True
 
+    def _prefetch_neighbor_images(self, filename):
+        """后台预解码当前图片前后各 N 张图片，按距离由近到远排队"""
+        count = STORE.prefetch_count
+        image_list = self.imageList
+        if count <= 0 or not image_list or filename not in image_list:
+            return
+
+        index = image_list.index(filename)
+        paths = []
+        for step in range(1, count + 1):
+            for neighbor in (index + step, index - step):
+                if 0 <= neighbor < len(image_list):
+                    paths.append(image_list[neighbor])
+        self.image_prefetcher.prefetch(paths, to_gray=STORE.convert_img_to_gray)
+
+    def _precompute_ai_embeddings(self, filename=None):
+        """AI 标注模式下，后台为后面 K 张图片预先计算 SAM 嵌入；非 AI 模式时取消排队中的任务"""
+        model = self.canvas._ai_model
+        if model is None:
+            return
+
+        filename = filename or self.filename
+        count = STORE.ai_precompute_count
+        image_list = self.imageList
+        if (
+            count <= 0
+            or self.canvas.editing()
+            or self.canvas.createMode not in ("ai_polygon", "ai_mask")
+            or not image_list
+            or filename not in image_list
+        ):
+            model.cancel_precompute()
+            return
+
+        from labelme.utils.image import numpy_to_qimage
+
+        index = image_list.index(filename)
+        paths = image_list[index + 1:index + 1 + count]
+        prefetcher = self.image_prefetcher
+        to_gray = STORE.convert_img_to_gray
+
+        def make_loader(path):
+            # 在编码线程中解码，与 loadFile 走同一条路径，保证得到相同的模型输入
+            def load():
+                rgb_img = prefetcher.get(path, to_gray=to_gray)
+                if rgb_img is None:
+                    return None
+                return qimage_to_ai_input(numpy_to_qimage(rgb_img))
+
+            return load
+
+        model.precompute_images([make_loader(path) for path in paths])
+
     def loadFlags(self, flags):
         super().loadFlags(flags)
         # extra 加载json后, uniqLabelList 添加 text_flag
@@ -2076,9 +2210,53 @@ class MainWindow(MainWindow):
         self.canvas.selectShapes(self.canvas.shapes)
         self.deleteSelectedShape()
 
+    def _on_label_save_failed(self, filename: str, error: str):
+        # 保存时已按写入成功更新了界面状态，写入失败后需恢复
+        is_current = self.filename is not None and osp.normcase(
+            osp.abspath(filename)
+        ) == osp.normcase(osp.abspath(self.getLabelFile()))
+        if not osp.exists(filename):
+            self.fileListWidget.set_label_file_exists(filename, False)
+            if self.is_2_5d:
+                proj_manager = self.proj_manager.o2_5d_manager
+                img_paths = proj_manager.get_group_img_paths(filename)
+            else:
+                img_paths = [self.filename] if is_current else []
+            for img_path in img_paths:
+                img_path = str(Path(img_path).absolute().as_posix())
+                for item in self.fileListWidget.findItems(img_path, Qt.MatchExactly):
+                    item.setCheckState(Qt.Unchecked)
+        if is_current:
+            # 当前文件标记为未保存，切换图片时会提示保存；
+            # 不立即自动重新保存，避免持续失败时反复保存、反复弹窗
+            self._suspend_auto_save = True
+            try:
+                self.setDirty()
+            finally:
+                self._suspend_auto_save = False
+        self.errorMessage(
+            self.tr("Error saving label data"), self.tr("<b>%s</b>") % error
+        )
+
+    def hasLabelFile(self):
+        # 后台保存尚未写完的文件也视为已存在
+        if self.filename is not None and self.label_writer.is_pending(
+            self.getLabelFile()
+        ):
+            return True
+        return super().hasLabelFile()
+
     # https://bbs.dlcv.com.cn/t/topic/421
     def setDirty(self):
-        super().setDirty()
+        if self._suspend_auto_save:
+            # 与基类不自动保存时的处理相同
+            self.actions.undo.setEnabled(self.canvas.isShapeRestorable)
+            self.dirty = True
+            self.actions.save.setEnabled(True)
+            if self.filename is not None:
+                self.setWindowTitle(f"{__appname__} - {self.filename}*")
+        else:
+            super().setDirty()
 
         if self.imagePath is not None and Path(self.imagePath) != Path(self.filename):
             if not self.is_2_5d and not self.is_3d:
@@ -2135,9 +2313,22 @@ class MainWindow(MainWindow):
 
         self._config["keep_prev"] = keep_prev
 
+    def openNextUnannotatedImg(self, _value=False):
+        """跳到下一张未标注的图片"""
+        if not self.mayContinue():
+            return
+
+        if not self.fileListWidget.select_next_unannotated():
+            notification(
+                title=dlcv_tr("没有未标注的图片"),
+                text=dlcv_tr("已展开的文件夹中没有未标注的图片"),
+                preset=ToastPreset.WARNING,
+            )
+
     def importDirImages(self, dirpath, pattern=None, load=True):
         self.actions.openNextImg.setEnabled(True)
         self.actions.openPrevImg.setEnabled(True)
+        self.actions.openNextUnannotatedImg.setEnabled(True)
 
         if not self.mayContinue() or not dirpath:
             return
@@ -2145,6 +2336,7 @@ class MainWindow(MainWindow):
         self.lastOpenDir = dirpath
         self.filename = None
         self.fileListWidget.clear()
+        self.image_prefetcher.clear()
 
         self.fileListWidget.set_root_dir(dirpath)
 
@@ -2519,17 +2711,14 @@ class MainWindow(MainWindow):
                         dlcv_tr("请稍等..."),
                         ToastPreset.INFORMATION,
                     )
-                    for shape_data in labelme_data.shapes:
-                        if (
-                            self.ai_controller.category_filter_list
-                            and shape_data["label"]
-                            not in self.ai_controller.category_filter_list
-                        ):
-                            continue
-
-                        shape = Shape(**shape_data)
-                        shape = self.fix_shape(shape)
-                        self.loadShapes([shape], replace=False)
+                    # extra 一次性添加全部预测结果，避免逐个 loadShapes 导致的重复快照与重绘
+                    shapes = [
+                        Shape(**shape_data)
+                        for shape_data in labelme_data.shapes
+                        if not self.ai_controller.category_filter_list
+                        or shape_data["label"] in self.ai_controller.category_filter_list
+                    ]
+                    self.loadShapes(shapes, replace=False)
 
                 elif hasattr(labelme_data, "flags") and labelme_data.flags:
                     # get the first key
@@ -2710,112 +2899,30 @@ class MainWindow(MainWindow):
 
     # ----------- OCR 标注 end -----------
 
-    def _select_valid_polygon(self, geometry):
-        if geometry is None or geometry.is_empty:
-            return None
-
-        geometry_type = getattr(geometry, "geom_type", "")
-        if geometry_type == "Polygon":
-            candidate_polygons = [geometry]
-        elif geometry_type == "MultiPolygon":
-            candidate_polygons = list(geometry.geoms)
-        else:
-            candidate_polygons = []
-            for child in getattr(geometry, "geoms", []):
-                polygon = self._select_valid_polygon(child)
-                if polygon is not None:
-                    candidate_polygons.append(polygon)
-
-        valid_polygons = []
-        for polygon in candidate_polygons:
-            if polygon.is_empty:
-                continue
-            if not polygon.is_valid:
-                continue
-            if polygon.area <= 0:
-                continue
-            if len(polygon.exterior.coords) < 4:
-                continue
-            valid_polygons.append(polygon)
-
-        if not valid_polygons:
-            return None
-        return max(valid_polygons, key=lambda item: item.area)
-
-    def _repair_polygon_points_from_mask(self, points_pos):
-        image = getattr(self, "image", None)
-        image_width = int(image.width()) if image is not None else 0
-        image_height = int(image.height()) if image is not None else 0
-        if image_width <= 0 or image_height <= 0:
-            return None
-
-        polygon_points = np.rint(np.asarray(points_pos, dtype=np.float32)).astype(
-            np.int32
-        )
-        polygon_points[:, 0] = np.clip(polygon_points[:, 0], 0, image_width - 1)
-        polygon_points[:, 1] = np.clip(polygon_points[:, 1], 0, image_height - 1)
-
-        if len(np.unique(polygon_points, axis=0)) < 3:
-            return None
-
-        mask = np.zeros((image_height, image_width), dtype=np.uint8)
-        cv2.fillPoly(mask, [polygon_points.reshape(-1, 1, 2)], 1)
-        if int(mask.sum()) == 0:
-            return None
-
-        from labelme.ai._utils import compute_polygon_from_mask
-
-        repaired_points = compute_polygon_from_mask(mask=mask.astype(bool))
-        if len(repaired_points) < 3:
-            return None
-        return repaired_points.tolist()
-
     def fix_shape(self, shape: Shape) -> Shape | None:
-        # 修复 shape 超出图片范围的问题
-        max_x, max_y = self.max_x_width, self.max_y_height
-        for point in shape.points:
-            if point.x() > max_x:
-                point.setX(max_x)
-            elif point.x() < 0:
-                point.setX(0)
-
-            if point.y() > max_y:
-                point.setY(max_y)
-            elif point.y() < 0:
-                point.setY(0)
-
-        if shape.shape_type != ShapeType.POLYGON:
-            return shape
-
-        # 修复不合法多边形
+        """裁剪越界的点并修复不合法多边形（``shape_repair.fix_points``），无法修复时返回 None"""
         points_pos = shape.get_points_pos()
-        if len(points_pos) < 3:
+        fixed_points = fix_points(
+            shape.shape_type,
+            points_pos,
+            int(self.image.width()),
+            int(self.image.height()),
+        )
+        if fixed_points is None:
             return None
+        if fixed_points == points_pos:
+            return shape
 
-        polygon = Polygon(points_pos)
-        if not polygon.is_valid:
-            repaired_points = self._repair_polygon_points_from_mask(points_pos)
-            if repaired_points is not None:
-                repaired_polygon = Polygon(repaired_points)
-                if repaired_polygon.is_valid and repaired_polygon.area > 0:
-                    shape.clear_points()
-                    for point in repaired_points:
-                        shape.addPoint(QtCore.QPointF(point[0], point[1]))
-                    return shape
-
-            from shapely.validation import make_valid
-
-            repaired_polygon = make_valid(polygon)
-            max_polygon = self._select_valid_polygon(repaired_polygon)
-            if max_polygon is None:
-                return None
-
+        if len(fixed_points) == len(points_pos):
+            # 点数不变（例如只裁剪了越界的点）时原地修改
+            for point, (x, y) in zip(shape.points, fixed_points):
+                point.setX(x)
+                point.setY(y)
+            shape.mark_geometry_changed()
+        else:
             shape.clear_points()
-            for point in max_polygon.exterior.coords:
-                shape.addPoint(QtCore.QPointF(point[0], point[1]))
-
-        if not self.is_shape_valid(shape):
-            return None
+            for x, y in fixed_points:
+                shape.addPoint(QtCore.QPointF(x, y))
         return shape
 
     def simplifyShapePoints(self, shape):
@@ -2889,33 +2996,14 @@ class MainWindow(MainWindow):
         }
 
     def _collect_invalid_polygons(self):
+        # 只重新检查上次之后修改过的多边形
         invalid_shapes = []
         invalid_json = []
-        for index, shape in enumerate(self.canvas.shapes):
-            if shape.shape_type != ShapeType.POLYGON:
-                continue
-            points_pos = shape.get_points_pos()
-            try:
-                if len(points_pos) < 3:
-                    reason = f"polygon points < 3 ({len(points_pos)})"
-                    invalid_shapes.append(shape)
-                    invalid_json.append(
-                        self._shape_to_invalid_polygon_json(shape, index, reason)
-                    )
-                    continue
-
-                polygon = Polygon(points_pos)
-                if not polygon.is_valid:
-                    reason = explain_validity(polygon)
-                    invalid_shapes.append(shape)
-                    invalid_json.append(
-                        self._shape_to_invalid_polygon_json(shape, index, reason)
-                    )
-            except Exception as e:
-                invalid_shapes.append(shape)
-                invalid_json.append(
-                    self._shape_to_invalid_polygon_json(shape, index, str(e))
-                )
+        for index, shape, reason in self._polygon_validity.check(self.canvas.shapes):
+            invalid_shapes.append(shape)
+            invalid_json.append(
+                self._shape_to_invalid_polygon_json(shape, index, reason)
+            )
         return invalid_shapes, invalid_json
 
     def _set_shape_invalid_polygon_color(self, shape: Shape):
@@ -2970,9 +3058,8 @@ class MainWindow(MainWindow):
         if log_invalid and invalid_json:
             image_name = osp.basename(self.filename) if self.filename else ""
             logger.warning(
-                "检测到不合法多边形: image=%s, invalid_polygons_json=%s",
-                image_name,
-                json.dumps(invalid_json, ensure_ascii=False, default=str),
+                f"检测到不合法多边形: image={image_name}, invalid_polygons_json="
+                f"{json.dumps(invalid_json, ensure_ascii=False, default=str)}"
             )
 
         self.canvas.update()
@@ -3035,6 +3122,7 @@ class MainWindow(MainWindow):
         if not edit:
             self.canvas.overrideCursor(CURSOR_DRAW)
         self.canvas.update()
+        self._precompute_ai_embeddings()
 
     # ------------ zx触发事件动作 ------------
     def _init_trigger_action(self):
@@ -0,0 +1,437 @@
+"""无界面的批量自动标注（预标注）。
+
+界面里的 ``MainWindow.predict`` / ``auto_label`` 一次只处理一张图，结果还要逐个
+``Shape`` -> ``fix_shape`` -> ``loadShapes`` 走一遍界面。这里直接遍历图片列表：
+
+1. 线程池并发调用预测函数（推理后端通常释放 GIL 或是独立服务）
+2. 按 ``category_filter_list`` 相同的规则过滤类别，
+   坐标用 ``shape_repair.fix_points`` 修复
+3. 直接写 ``LabelFile`` json，不经过画布
+4. 每张图的结果与耗时追加写入 jsonl 日志，中断后重新运行会跳过已完成的图片
+
+命令行用法::
+
+    python -m labelme.dlcv.batch_auto_label <图片文件夹> --predictor pkg.module:func \\
+        [--model 模型路径] [--workers 4] [--category 类别1,类别2] [--overwrite] \\
+        [--json-mode 2d|3d|2.5d] [--output-dir 输出文件夹]
+
+``--predictor`` 指向的可调用对象接收图片路径，返回带 ``shapes`` / ``flags`` 的预测结果
+（与 ``ai_controller.sig_predict_done`` 发出的 LabelmeData 或等价的 dict）；
+指定 ``--model`` 时先以模型路径调用它得到预测函数。
+
+json 文件名与界面的项目模式一致
+（``--json-mode``，3D / 2.5D 使用 ``ProjManager`` 的规则）；
+2.5D 模式下同一组图片共用一个 json，只对每组的第一张图片做预测。
+指定 ``--output-dir`` 时 json 按相对图片文件夹的路径写到该文件夹下。
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import json
+import os
+import os.path as osp
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import natsort
+import numpy as np
+import PIL.Image
+
+from labelme import utils
+from labelme.dlcv.label_file import LabelFile
+from labelme.dlcv.shape import ShapeType
+from labelme.dlcv.shape_repair import fix_points
+from labelme.logger import logger
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+JOURNAL_NAME = ".auto_label_journal.jsonl"
+
+# 日志中视为"已完成"的状态，重新运行时跳过；error 会被重试
+_DONE_STATUSES = ("ok", "empty", "exists")
+
+
+def _get_field(result, name):
+    if isinstance(result, dict):
+        return result.get(name)
+    return getattr(result, name, None)
+
+
+def _dedup_points(points) -> List[List[float]]:
+    """与 Shape(points=...) 的 addPoint 一致：去掉连续重复点与回到起点的闭合点"""
+    deduped = []
+    for point in points:
+        if hasattr(point, "x"):
+            x, y = point.x(), point.y()
+        else:
+            x, y = point[0], point[1]
+        x, y = float(x), float(y)
+        if deduped:
+            if (x, y) == tuple(deduped[0]):
+                continue
+            last_x, last_y = deduped[-1]
+            if abs(x - last_x) < 1e-6 and abs(y - last_y) < 1e-6:
+                continue
+        deduped.append([x, y])
+    return deduped
+
+
+def build_label_data(
+    result, image_width: int, image_height: int, category_filter_list=None
+):
+    """
+    把预测结果转换为 LabelFile 的 shapes / flags，规则与 ``MainWindow.auto_label`` 一致
+
+    :return: (shapes, flags)
+    """
+    shapes = []
+    flags = {}
+
+    predicted_shapes = _get_field(result, "shapes")
+    predicted_flags = _get_field(result, "flags")
+    if predicted_shapes:
+        for shape_data in predicted_shapes:
+            label = shape_data["label"]
+            if category_filter_list and label not in category_filter_list:
+                continue
+
+            shape_type = shape_data.get("shape_type") or ShapeType.POLYGON
+            points = _dedup_points(shape_data.get("points") or [])
+            points = fix_points(shape_type, points, image_width, image_height)
+            if points is None:
+                continue
+
+            mask = shape_data.get("mask")
+            if mask is not None and not isinstance(mask, str):
+                mask = utils.img_arr_to_b64(np.asarray(mask).astype(np.uint8))
+
+            shape = dict(
+                label=label,
+                points=points,
+                group_id=shape_data.get("group_id"),
+                description=shape_data.get("description"),
+                shape_type=shape_type,
+                flags=shape_data.get("flags") or {},
+                mask=mask,
+            )
+            if shape_type == ShapeType.ROTATION:
+                shape["direction"] = float(shape_data.get("direction", 0.0))
+            shapes.append(shape)
+    elif predicted_flags:
+        # 与界面一致：只取第一个 flag 作为文本标记
+        first_key = list(predicted_flags.keys())[0]
+        if not category_filter_list or first_key in category_filter_list:
+            flags[first_key] = True
+
+    return shapes, flags
+
+
+def load_predictor(spec: str, model_path: Optional[str] = None) -> Callable:
+    """按 ``module:attr`` 加载预测函数；给出 model_path 时以其调用 attr 得到预测函数"""
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError("predictor must be given as module:attr, got %r" % spec)
+    predictor = importlib.import_module(module_name)
+    for name in attr.split("."):
+        predictor = getattr(predictor, name)
+    if model_path:
+        predictor = predictor(model_path)
+    return predictor
+
+
+def list_images(root_dir: str) -> List[str]:
+    """递归列出文件夹下的图片（自然排序，as_posix 格式，与文件树一致）"""
+    paths = []
+    for dir_path, dir_names, file_names in os.walk(root_dir):
+        dir_names[:] = [d for d in dir_names if not d.startswith(".")]
+        for file_name in file_names:
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(osp.join(dir_path, file_name).replace("\\", "/"))
+    return natsort.os_sorted(paths)
+
+
+def _default_json_path(img_path: str) -> str:
+    return osp.splitext(img_path)[0] + LabelFile.suffix
+
+
+def _default_img_name_list(img_path: str) -> List[str]:
+    return [osp.basename(img_path)]
+
+
+JSON_MODES = ("2d", "3d", "2.5d")
+
+
+def make_json_path_fns(image_dir: str, json_mode: str = "2d", output_dir=None):
+    """
+    按项目模式得到 (图片 -> json 路径, 图片 -> img_name_list) 两个函数，规则与界面相同
+
+    :param output_dir: 不为 None 时 json 按相对 image_dir 的路径写到该文件夹下
+    """
+    if json_mode == "2d":
+        json_path_fn, img_name_list_fn = _default_json_path, _default_img_name_list
+    else:
+        # 项目管理器模块会导入界面模块，只在需要时导入
+        from labelme.dlcv.widget_25d_3d.manager import Proj2_5DManager
+        from labelme.dlcv.widget_25d_3d.manager import Proj3DManager
+
+        if json_mode == "3d":
+            manager = Proj3DManager()
+        elif json_mode == "2.5d":
+            manager = Proj2_5DManager()
+            manager.assign_json_files(image_dir)
+        else:
+            raise ValueError(f"Unknown json mode: {json_mode}")
+        json_path_fn = manager.get_json_path
+        img_name_list_fn = manager.get_img_name_list
+
+    if output_dir is None:
+        return json_path_fn, img_name_list_fn
+
+    image_dir = osp.abspath(image_dir)
+
+    def output_json_path(img_path: str) -> str:
+        json_path = osp.abspath(json_path_fn(img_path))
+        return osp.join(output_dir, osp.relpath(json_path, image_dir))
+
+    return output_json_path, img_name_list_fn
+
+
+def first_image_per_json(image_paths: Iterable[str], json_path_fn) -> List[str]:
+    """共用同一个 json 的图片（2.5D）只保留第一张"""
+    seen = set()
+    paths = []
+    for img_path in image_paths:
+        key = osp.normcase(osp.abspath(json_path_fn(img_path)))
+        if key not in seen:
+            seen.add(key)
+            paths.append(img_path)
+    return paths
+
+
+class BatchAutoLabelRunner:
+    """批量自动标注执行器，可在后台线程或命令行中运行"""
+
+    def __init__(
+        self,
+        predict: Callable,
+        image_paths: Iterable[str],
+        journal_path: str,
+        workers: int = 4,
+        category_filter_list=None,
+        overwrite: bool = False,
+        json_path_fn: Callable[[str], str] = _default_json_path,
+        img_name_list_fn: Callable[[str], List[str]] = _default_img_name_list,
+        on_progress: Optional[Callable[[int, int, dict], None]] = None,
+    ):
+        self._predict = predict
+        self._image_paths = list(image_paths)
+        self._journal_path = journal_path
+        self._workers = max(1, int(workers))
+        self._category_filter_list = list(category_filter_list or [])
+        self._overwrite = overwrite
+        self._json_path_fn = json_path_fn
+        self._img_name_list_fn = img_name_list_fn
+        self._on_progress = on_progress
+
+        self._journal_lock = threading.Lock()
+        self._cancel = threading.Event()
+        self.records: List[dict] = []
+
+    def cancel(self):
+        """停止提交新的图片，已在执行的预测会跑完并记录"""
+        self._cancel.set()
+
+    # region 日志
+    def load_journal(self) -> Dict[str, dict]:
+        """读取已有日志，返回 图片路径 -> 最后一条记录"""
+        done = {}
+        if not osp.exists(self._journal_path):
+            return done
+        with open(self._journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 上次中断时可能留下写了一半的行
+                    continue
+                done[record["image"]] = record
+        return done
+
+    def _append_journal(self, record: dict):
+        with self._journal_lock:
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+
+    # endregion
+
+    def _process(self, img_path: str) -> dict:
+        record = {"image": img_path}
+        json_path = self._json_path_fn(img_path)
+        if not self._overwrite and osp.exists(json_path):
+            record.update(status="exists", shapes=0, seconds=0.0)
+            return record
+
+        start = time.perf_counter()
+        try:
+            with PIL.Image.open(img_path) as image:
+                image_width, image_height = image.size
+            result = self._predict(img_path)
+            predict_seconds = time.perf_counter() - start
+
+            shapes, flags = build_label_data(
+                result, image_width, image_height, self._category_filter_list
+            )
+            if shapes or flags:
+                if osp.dirname(json_path):
+                    os.makedirs(osp.dirname(json_path), exist_ok=True)
+                LabelFile().save(
+                    filename=json_path,
+                    shapes=shapes,
+                    imagePath=osp.relpath(img_path, osp.dirname(json_path)),
+                    imageHeight=image_height,
+                    imageWidth=image_width,
+                    otherData={"img_name_list": self._img_name_list_fn(img_path)},
+                    flags=flags,
+                )
+            record.update(
+                status="ok" if shapes or flags else "empty",
+                shapes=len(shapes),
+                predict_seconds=round(predict_seconds, 4),
+            )
+        except Exception as e:
+            logger.warning(f"auto label failed: {img_path}, {e}")
+            record.update(status="error", error=str(e))
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        return record
+
+    def run(self) -> dict:
+        """执行批量标注，返回统计信息（见 ``summarize``）"""
+        journal = self.load_journal()
+        pending = [
+            path
+            for path in self._image_paths
+            if journal.get(path, {}).get("status") not in _DONE_STATUSES
+        ]
+        total = len(pending)
+        logger.info(
+            f"auto label: {len(self._image_paths)} images, "
+            f"{len(self._image_paths) - total} already done, {self._workers} workers"
+        )
+
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(self._workers) as executor:
+            # 只保持少量任务在途，避免一次性为数万张图片创建 future
+            path_iter = iter(pending)
+            running = set()
+            finished = 0
+            while True:
+                while not self._cancel.is_set() and len(running) < self._workers * 2:
+                    path = next(path_iter, None)
+                    if path is None:
+                        break
+                    running.add(executor.submit(self._process, path))
+                if not running:
+                    break
+                done, running = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    record = future.result()
+                    self._append_journal(record)
+                    self.records.append(record)
+                    finished += 1
+                    if self._on_progress is not None:
+                        self._on_progress(finished, total, record)
+
+        stats = summarize(self.records, time.perf_counter() - start)
+        logger.info(f"auto label finished: {stats}")
+        return stats
+
+
+def summarize(records: List[dict], wall_seconds: float) -> dict:
+    """每张图耗时的统计：数量、均值、p50/p95、最大值与吞吐"""
+    stats = {"processed": len(records)}
+    for status in ("ok", "empty", "exists", "error"):
+        stats[status] = sum(1 for r in records if r["status"] == status)
+    stats["shapes"] = sum(r.get("shapes", 0) for r in records)
+
+    seconds = np.array(
+        [r["seconds"] for r in records if r["status"] in ("ok", "empty")], dtype=float
+    )
+    if len(seconds):
+        stats.update(
+            mean_seconds=round(float(seconds.mean()), 4),
+            p50_seconds=round(float(np.percentile(seconds, 50)), 4),
+            p95_seconds=round(float(np.percentile(seconds, 95)), 4),
+            max_seconds=round(float(seconds.max()), 4),
+        )
+    stats["wall_seconds"] = round(wall_seconds, 2)
+    stats["images_per_second"] = (
+        round(len(records) / wall_seconds, 2) if wall_seconds > 0 else 0.0
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batch auto label a folder")
+    parser.add_argument("image_dir", help="folder of images (searched recursively)")
+    parser.add_argument(
+        "--predictor", required=True, help="prediction callable as module:attr"
+    )
+    parser.add_argument("--model", help="model path passed to the predictor factory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--category", default="", help="comma separated labels to keep (default all)"
+    )
+    parser.add_argument(
+        "--journal", help="resume journal path (default <image_dir>/%s)" % JOURNAL_NAME
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="overwrite existing json files"
+    )
+    parser.add_argument(
+        "--json-mode",
+        choices=JSON_MODES,
+        default="2d",
+        help="json naming of the project mode (2.5d: one json per image group)",
+    )
+    parser.add_argument(
+        "--output-dir", help="write json files here instead of next to the images"
+    )
+    args = parser.parse_args()
+
+    json_path_fn, img_name_list_fn = make_json_path_fns(
+        args.image_dir, args.json_mode, args.output_dir
+    )
+    image_paths = list_images(args.image_dir)
+    if args.json_mode == "2.5d":
+        image_paths = first_image_per_json(image_paths, json_path_fn)
+
+    runner = BatchAutoLabelRunner(
+        predict=load_predictor(args.predictor, args.model),
+        image_paths=image_paths,
+        journal_path=args.journal or osp.join(args.image_dir, JOURNAL_NAME),
+        workers=args.workers,
+        category_filter_list=[c for c in args.category.split(",") if c],
+        overwrite=args.overwrite,
+        json_path_fn=json_path_fn,
+        img_name_list_fn=img_name_list_fn,
+        on_progress=lambda done, total, record: logger.info(
+            f"[{done}/{total}] {record['status']} {record['image']} "
+            f"{record['seconds']:.3f}s"
+        ),
+    )
+    print(json.dumps(runner.run(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
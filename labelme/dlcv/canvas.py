@@ -6,6 +6,13 @@ from labelme.dlcv.shape import ShapeType
 from labelme.widgets.canvas import *
 
 
+# 细节级别（LOD）阈值，单位为屏幕像素
+_LOD_VERTEX_MIN_PX = 16  # 图形小于该尺寸时不画顶点标记
+_LOD_LABEL_MIN_PX = 4  # 图形小于该尺寸时不画标签
+_LOD_SIMPLIFY_PX = 2  # 平均边长小于该值时合并顶点绘制轮廓
+_LOD_SIMPLIFY_MIN_POINTS = 16
+
+
 class CustomCanvas(Canvas):
     # 1. 定义一个信号：传递 (被切的老图形, [切出来的新图形1, 新图形2])
     sig_split_finish = QtCore.Signal(object, list)
@@ -85,6 +92,7 @@ class CustomCanvas(Canvas):
 
             # 更新点位置
             shape.points[i] = QtCore.QPointF(new_x, new_y)
+        shape.mark_geometry_changed()
 
         # 更新显示
         self.update()
@@ -349,6 +357,11 @@ class CustomCanvas(Canvas):
 
 from labelme.dlcv.shape import Shape
 from labelme.dlcv.store import STORE
+from labelme.dlcv.ai.preview import AiPreviewWorker
+from labelme.dlcv.image_pyramid import TiledPixmap
+from labelme.dlcv.shape_history import ShapeHistory
+from labelme.dlcv.shape_index import ShapeGridIndex
+from labelme.dlcv.utils_func import qimage_to_ai_input
 
 
 class Canvas(CustomCanvas):
@@ -370,7 +383,7 @@ class Canvas(CustomCanvas):
             raise ValueError(
                 "Unexpected value for double_click event: {}".format(
                     self.double_click))
-        self.num_backups = kwargs.pop("num_backups", 10)
+        num_backups = kwargs.pop("num_backups", 10)
         # 修复_crosshair字典，添加rotation键
         crosshair_config = kwargs.pop(
             "crosshair",
@@ -391,6 +404,14 @@ class Canvas(CustomCanvas):
 
         self._crosshair = crosshair_config
         super().__init__(*args, **kwargs)
+        # extra 父类会用默认值覆盖 num_backups，这里重新设置；撤销历史改为结构共享的快照栈
+        self.num_backups = num_backups
+        self.shapesBackups = ShapeHistory(max_snapshots=num_backups)
+        # 悬停命中与框选用的空间索引
+        self._shape_index = ShapeGridIndex()
+        # 标签背景框边距的缓存：(shapes 列表, 长度, 标签元组) 与 (字体 key, 边距)
+        self._label_margin_labels = None
+        self._label_margin_cache = None
         self.rotation_angle = 0.0  # 旋转框的旋转角度
 
         # 添加箭头拖拽和角度调整功能的变量
@@ -407,6 +428,141 @@ class Canvas(CustomCanvas):
         self.offset = QtCore.QPointF(0, 0)
         # 右键分割标注相关变量
         self.splitting_shape = False  # 是否正在分割标注
+        # AI 悬停预览：后台解码，paintEvent 只绘制缓存结果
+        self._ai_preview = AiPreviewWorker(self)
+        self._ai_preview.sig_ready.connect(self.update)
+
+    # region 撤销历史
+    def storeShapes(self):
+        # 只复制发生变化的图形属性，未修改的图形与上一个快照共用
+        self.shapesBackups.push(self.shapes)
+        # 每次编辑都会保存快照，顺便让空间索引与标签边距在下次查询时重建
+        self._shape_index.invalidate()
+        self._label_margin_labels = None
+
+    def restoreShape(self):
+        if not self.isShapeRestorable:
+            return
+        self.shapesBackups.pop()  # latest
+
+        # 快照中的图形是共享的冻结对象，不能直接交给画布编辑；未变化的图形沿用现有对象，
+        # 其余复制一份。MainWindow.undoShapeEdit 之后调用 loadShapes 会把它重新压回撤销栈
+        shapesBackup = self.shapesBackups.pop()
+        self.shapes = self.shapesBackups.thaw(shapesBackup, self.shapes)
+        self.selectedShapes = []
+        for shape in self.shapes:
+            shape.selected = False
+        self.update()
+
+    # endregion
+
+    def _sync_shape_index(self):
+        """拖动、键盘移动图形时不保存快照，查询前先更新选中与高亮图形在索引中的位置"""
+        moving = self.selectedShapes
+        if self.hShape is not None:
+            moving = moving + [self.hShape]
+        self._shape_index.refresh(self.shapes, moving)
+
+    def _visible_paint_items(self, rect: QtCore.QRect):
+        """
+        需要绘制的图形及其细节级别 (shape, draw_vertices, simplify, draw_label)
+
+        - 外接矩形（加上顶点、标签可能超出的范围）不与重绘区域相交的图形直接跳过
+        - 屏幕上小于 _LOD_VERTEX_MIN_PX 的图形不画顶点标记，小于 _LOD_LABEL_MIN_PX 的不画标签
+        - 平均每条边不足 _LOD_SIMPLIFY_PX 像素的多边形按像素合并顶点后绘制
+        - 选中和高亮的图形始终完整绘制
+        """
+        scale = self.scale
+        origin = self.offsetToCenter() + self.offset
+        margin = Shape.point_size + Shape.PEN_WIDTH
+        if STORE.canvas_display_shape_label:
+            margin += self._label_paint_margin()
+        x1 = (rect.left() - margin) / scale - origin.x()
+        y1 = (rect.top() - margin) / scale - origin.y()
+        x2 = (rect.right() + margin) / scale - origin.x()
+        y2 = (rect.bottom() + margin) / scale - origin.y()
+
+        items = []
+        self._sync_shape_index()
+        for shape, (bx1, by1, bx2, by2) in self._shape_index.query_items(
+                self.shapes, x1, y1, x2, y2):
+            if shape.selected or shape is self.hShape:
+                items.append((shape, True, False, True))
+                continue
+            width, height = (bx2 - bx1) * scale, (by2 - by1) * scale
+            size = max(width, height)
+            simplify = (
+                len(shape.points) > _LOD_SIMPLIFY_MIN_POINTS
+                and 2 * (width + height) < len(shape.points) * _LOD_SIMPLIFY_PX
+            )
+            items.append((
+                shape,
+                size >= _LOD_VERTEX_MIN_PX,
+                simplify,
+                size >= _LOD_LABEL_MIN_PX,
+            ))
+        return items
+
+    def _label_paint_margin(self) -> float:
+        """
+        标签背景框可能超出图形外接矩形的最大宽度（屏幕像素）
+
+        标签集合在图形列表变化或保存快照（编辑标签前会保存）后才重新收集，
+        宽度在字体、字号（随缩放变化）改变时才重新测量
+        """
+        cached = self._label_margin_labels
+        if (
+            cached is None
+            or cached[0] is not self.shapes
+            or cached[1] != len(self.shapes)
+        ):
+            labels = tuple(
+                {shape.label for shape in self.shapes if shape is not None and shape.label}
+            )
+            cached = self._label_margin_labels = (self.shapes, len(self.shapes), labels)
+            self._label_margin_cache = None
+        labels = cached[2]
+        if not labels:
+            return 0
+
+        font = QtGui.QFont(self.font())
+        font.setBold(True)
+        font_size = STORE.canvas_shape_label_font_size
+        font.setPointSize(font_size if self.scale < 1 else int(font_size * self.scale))
+        key = font.key()
+        if self._label_margin_cache is None or self._label_margin_cache[0] != key:
+            metrics = QtGui.QFontMetrics(font)
+            padding = 5
+            margin = (
+                max(metrics.width(label) for label in labels)
+                + metrics.height()
+                + padding * 2
+            )
+            self._label_margin_cache = (key, margin)
+        return self._label_margin_cache[1]
+
+    def selectShapePoint(self, point, multiple_selection_mode):
+        """Select the first shape created which contains this point."""
+        if self.selectedVertex():  # A vertex is marked for selection.
+            index, shape = self.hVertex, self.hShape
+            shape.highlightVertex(index, shape.MOVE_VERTEX)
+        else:
+            # extra 只检查外接矩形包含该点的图形
+            self._sync_shape_index()
+            for shape in reversed(self._shape_index.query_point(self.shapes, point, 0)):
+                if self.isVisible(shape) and shape.containsPoint(point):
+                    self.setHiding()
+                    if shape not in self.selectedShapes:
+                        if multiple_selection_mode:
+                            self.selectionChanged.emit(self.selectedShapes + [shape])
+                        else:
+                            self.selectionChanged.emit([shape])
+                        self.hShapeIsSelected = False
+                    else:
+                        self.hShapeIsSelected = True
+                    self.calculateOffsets(point)
+                    return
+        self.deSelectShape()
 
     def canCloseShape(self):
         can = super().canCloseShape()  # fix ai标注时候，直接按下回车导致程序闪退
@@ -1072,11 +1228,11 @@ class Canvas(CustomCanvas):
                 yMin = min([y1, y2])
 
                 # 取消选中,并重新选中在当前框内的多边形
+                self._sync_shape_index()
                 self.deSelectShape()
 
                 selected_shapes = []
-                for shape in self.shapes:
-                    if shape is None: continue
+                for shape in self._shape_index.query(self.shapes, xMin, yMin, xMax, yMax):
                     for pnt in shape.points:
                         if xMax >= pnt.x() >= xMin and yMax >= pnt.y() >= yMin:
                             selected_shapes.append(shape)
@@ -1106,7 +1262,12 @@ class Canvas(CustomCanvas):
         # - Highlight vertex
         # Update shape/vertex fill and tooltip value accordingly.
         self.setToolTip(self.tr("Image"))
-        for shape in reversed([s for s in self.shapes if self.isVisible(s)]):
+        # 只检查外接矩形在鼠标 epsilon 范围内的图形（epsilon 为屏幕像素）
+        self._sync_shape_index()
+        candidates = self._shape_index.query_point(
+            self.shapes, pos, self.epsilon / self.scale
+        )
+        for shape in reversed([s for s in candidates if self.isVisible(s)]):
             # Look for a nearby vertex to highlight. If that fails,
             # check if we happen to be inside a shape.
             index = shape.nearestVertex(pos, self.epsilon)
@@ -1652,17 +1813,65 @@ class Canvas(CustomCanvas):
 
     # endregion
 
+    def initializeAiModel(self, name):
+        if name not in [model.name for model in labelme.ai.MODELS]:
+            raise ValueError("Unsupported ai model: %s" % name)
+        model = [model for model in labelme.ai.MODELS if model.name == name][0]
+
+        if self._ai_model is not None and self._ai_model.name == model.name:
+            logger.debug("AI model is already initialized: %r" % model.name)
+        else:
+            logger.debug("Initializing AI model: %r" % model.name)
+            self._ai_model = model()
+
+        if self.pixmap is None or self.pixmap.isNull():
+            logger.warning("Pixmap is not set yet")
+            return
+
+        # extra 与 loadPixmap 一致，使用 qimage_to_ai_input 生成模型输入，保证嵌入缓存命中
+        self._ai_model.set_image(image=qimage_to_ai_input(self.pixmap.toImage()))
+
+    def _request_ai_preview(self, drawing_shape: Shape):
+        """
+        提交当前悬停点的 AI 预览请求，并返回已缓存的预览几何数据（可能为 None）
+
+        请求按内容去重，后台完成后通过 sig_ready 触发重绘
+        """
+        if self._ai_model is None:
+            return None
+        points = [[point.x(), point.y()] for point in drawing_shape.points]
+        points.append([self.line.points[1].x(), self.line.points[1].y()])
+        point_labels = list(drawing_shape.point_labels) + [self.line.point_labels[1]]
+        self._ai_preview.request(
+            self._ai_model, self.createMode, points, point_labels
+        )
+        return self._ai_preview.result(
+            self._ai_model, self.createMode, drawing_shape.points
+        )
+
     # 加载图片
     def loadPixmap(self, pixmap: QtGui.QPixmap, clear_shapes=True):
+        self._release_pixmap()
         self.pixmap = pixmap
+        if isinstance(pixmap, TiledPixmap):
+            # 后台生成的缩小图就绪后重绘，缩小显示时改用更粗的一级
+            pixmap.sig_level_ready.connect(self.update)
+        self._ai_preview.clear()
         if self._ai_model and self.createMode in ["ai_polygon", "ai_mask"]:
             if not pixmap.isNull():  # extra 当 pixmap 为空时，不需要调用 _ai_model
                 self._ai_model.set_image(
-                    image=labelme.utils.img_qt_to_arr(self.pixmap.toImage()))
+                    image=qimage_to_ai_input(self.pixmap.toImage()))
         if clear_shapes:
             self.shapes = []
         self.update()
 
+    def _release_pixmap(self):
+        """停止上一张大图的缩小图生成并释放分块缓存"""
+        pixmap = getattr(self, "pixmap", None)
+        if isinstance(pixmap, TiledPixmap):
+            pixmap.sig_level_ready.disconnect(self.update)
+            pixmap.close()
+
     # 绘制画布事件
     def paintEvent(self, event):
         if not self.pixmap:
@@ -1679,7 +1888,22 @@ class Canvas(CustomCanvas):
         # 叠加画布偏移量
         p.translate(self.offsetToCenter() + self.offset)
 
-        p.drawPixmap(0, 0, self.pixmap)
+        if isinstance(self.pixmap, TiledPixmap):
+            # extra 大图只绘制重绘区域内的分块
+            origin = self.offsetToCenter() + self.offset
+            rect = QtCore.QRectF(event.rect())
+            self.pixmap.paint(
+                p,
+                QtCore.QRectF(
+                    rect.left() / self.scale - origin.x(),
+                    rect.top() / self.scale - origin.y(),
+                    rect.width() / self.scale,
+                    rect.height() / self.scale,
+                ),
+                self.scale,
+            )
+        else:
+            p.drawPixmap(0, 0, self.pixmap)
 
         # 将坐标系统改回正常比例以便绘制UI元素
         p.scale(1 / self.scale, 1 / self.scale)
@@ -1758,11 +1982,18 @@ class Canvas(CustomCanvas):
                 p.drawPath(path)
 
         Shape.scale = self.scale
-        for shape in self.shapes:
+        # extra 只绘制与重绘区域相交的图形，缩小时按屏幕尺寸降低细节
+        for shape, draw_vertices, simplify, draw_label in self._visible_paint_items(
+                event.rect()):
             if (shape.selected
                     or not self._hideBackround) and self.isVisible(shape):
                 shape.fill = shape.selected or shape == self.hShape
-                shape.paint(p)
+                shape.paint(
+                    p,
+                    draw_vertices=draw_vertices,
+                    simplify=simplify,
+                    draw_label=draw_label,
+                )
         if self.current:
             self.current.paint(p)
             self.line.paint(p)
@@ -1787,17 +2018,14 @@ class Canvas(CustomCanvas):
         # extra not self.drawing_with_right_btn 右键修改标注时,绘制多边形
         elif self.createMode == "ai_polygon" and self.current is not None and not self.drawing_with_right_btn and self.line.points and len(
                 self.line.points) >= 2:
+            # extra 解码在后台线程完成，这里只绘制缓存的结果
             drawing_shape = self.current.copy()
-            drawing_shape.addPoint(
-                point=self.line.points[1],
-                label=self.line.point_labels[1],
-            )
-            points = self._ai_model.predict_polygon_from_points(
-                points=[[point.x(), point.y()]
-                        for point in drawing_shape.points],
-                point_labels=drawing_shape.point_labels,
-            )
-            if len(points) > 2:
+            points = self._request_ai_preview(drawing_shape)
+            if points is not None:
+                drawing_shape.addPoint(
+                    point=self.line.points[1],
+                    label=self.line.point_labels[1],
+                )
                 drawing_shape.setShapeRefined(
                     shape_type="polygon",
                     points=[
@@ -1811,26 +2039,22 @@ class Canvas(CustomCanvas):
         elif self.createMode == "ai_mask" and self.current is not None and self.line.points and len(
                 self.line.points) >= 2:
             drawing_shape = self.current.copy()
-            drawing_shape.addPoint(
-                point=self.line.points[1],
-                label=self.line.point_labels[1],
-            )
-            mask = self._ai_model.predict_mask_from_points(
-                points=[[point.x(), point.y()]
-                        for point in drawing_shape.points],
-                point_labels=drawing_shape.point_labels,
-            )
-            y1, x1, y2, x2 = imgviz.instances.masks_to_bboxes(
-                [mask])[0].astype(int)
-            drawing_shape.setShapeRefined(
-                shape_type="mask",
-                points=[QtCore.QPointF(x1, y1),
-                        QtCore.QPointF(x2, y2)],
-                point_labels=[1, 1],
-                mask=mask[y1:y2 + 1, x1:x2 + 1],
-            )
-            drawing_shape.selected = True
-            drawing_shape.paint(p)
+            geometry = self._request_ai_preview(drawing_shape)
+            if geometry is not None:
+                x1, y1, x2, y2, mask = geometry
+                drawing_shape.addPoint(
+                    point=self.line.points[1],
+                    label=self.line.point_labels[1],
+                )
+                drawing_shape.setShapeRefined(
+                    shape_type="mask",
+                    points=[QtCore.QPointF(x1, y1),
+                            QtCore.QPointF(x2, y2)],
+                    point_labels=[1, 1],
+                    mask=mask,
+                )
+                drawing_shape.selected = True
+                drawing_shape.paint(p)
 
         # 绘制文本标记到画布左上角
         self._draw_text_flag_on_canvas(p)
@@ -1842,6 +2066,7 @@ class Canvas(CustomCanvas):
         self.restoreCursor()
 
         # extra self.pixmap = None 会导致鼠标点击事件崩溃
+        self._release_pixmap()
         self.pixmap = QtGui.QPixmap()
 
         # extra
@@ -1850,7 +2075,7 @@ class Canvas(CustomCanvas):
         ]  # 程序崩溃, 因为 self.movingShape, selectedShapes 未重置
         # extra End
 
-        self.shapesBackups = []
+        self.shapesBackups.clear()
         self.update()
 
     # 键盘事件
@@ -1,72 +1,625 @@
 import os
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Optional
 
 import natsort
-from ordered_set import OrderedSet
+import numpy as np
 from qtpy import QtCore, QtWidgets, QtGui
 from qtpy.QtCore import Qt
 
 from labelme.dlcv.dlcv_translator import dlcv_tr
+from labelme.dlcv.path_table import PathTable
 from labelme.dlcv.store import STORE
 
+_EMPTY_ROWS = np.empty(0, dtype=np.int64)
+# 后台扫描目录时每批最多条目数 / 最长间隔（秒），尽快让前面的图片可以点击
+_SCAN_BATCH_SIZE = 2000
+_SCAN_BATCH_INTERVAL = 0.1
+# 按显示顺序查找未标注图片时每次检查的行数
+_SEARCH_CHUNK = 1024
 
-class FileTreeItem(QtWidgets.QTreeWidgetItem):
 
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+class FileTreeItem:
+    """文件树节点句柄
+
+    模型里不再为每个文件常驻一个 QTreeWidgetItem，需要"item"的地方（app.py 里的
+    findItems / selectedItems / currentItem 等）按需创建这个轻量句柄，
+    接口与原 QTreeWidgetItem 的用法保持一致。
+    """
+
+    __slots__ = ("_tree", "_path", "_is_dir")
+
+    def __init__(self, tree: "_FileTreeWidget", path: str, is_dir: bool = False):
+        self._tree = tree
+        self._path = path
+        self._is_dir = is_dir
 
     def text(self):
         return self.get_path()
 
     def get_path(self):
-        return self.data(0, Qt.UserRole)
+        return self._path
+
+    def super_text(self, column=0):
+        return os.path.basename(self._path)
+
+    def is_dir(self) -> bool:
+        return self._is_dir
+
+    def childCount(self):
+        if not self._is_dir:
+            return 0
+        index = self._tree.index_of(self)
+        return max(1, self._tree.model().rowCount(index))
+
+    def setCheckState(self, state, *args):
+        # 兼容 QTreeWidgetItem.setCheckState(column, state) 的调用方式
+        if args:
+            state = args[0]
+        self._tree.model().set_checked(self._path, state == Qt.Checked)
+
+    def checkState(self, column=0):
+        return Qt.Checked if self._tree.model().is_checked(self._path) else Qt.Unchecked
+
+    def isHidden(self) -> bool:
+        return not self._tree.index_of(self).isValid()
+
+    def isExpanded(self) -> bool:
+        return self._tree.isExpanded(self._tree.index_of(self))
+
+    def setExpanded(self, expanded: bool):
+        self._tree.setExpanded(self._tree.index_of(self), expanded)
+
+    def __eq__(self, other):
+        return isinstance(other, FileTreeItem) and other._path == self._path
+
+    def __hash__(self):
+        return hash(self._path)
+
+
+class AnnotationIndex:
+    """标注文件（json）存在性索引
+
+    按目录缓存该目录下所有 json 文件名，每个目录只做一次 os.scandir，
+    之后判断某张图片是否已标注只需一次集合查找，不再逐个 os.path.exists。
+    保存 / 删除标注文件时需调用 set_exists 保持索引同步。
+    """
+
+    def __init__(self):
+        self._dir_to_names = {}  # 目录 -> 该目录下 json 文件名集合（均经过 normcase）
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        return os.path.normcase(os.path.normpath(path))
+
+    def add_dir_labels(self, dir_path: str, json_names):
+        """追加某个目录的 json 文件名（分批扫描目录时使用）"""
+        names = self._dir_to_names.setdefault(self._norm(dir_path), set())
+        names.update(os.path.normcase(name) for name in json_names)
+
+    def _scan_dir(self, dir_path: str) -> set:
+        names = set()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.name.lower().endswith(".json") and entry.is_file():
+                        names.add(os.path.normcase(entry.name))
+        except OSError:
+            pass
+        self._dir_to_names[self._norm(dir_path)] = names
+        return names
+
+    def exists(self, json_path: str) -> bool:
+        dir_path, name = os.path.split(json_path)
+        dir_path = dir_path or "."
+        names = self._dir_to_names.get(self._norm(dir_path))
+        if names is None:
+            names = self._scan_dir(dir_path)
+        return os.path.normcase(name) in names
+
+    def set_exists(self, json_path: str, exists: bool):
+        dir_path, name = os.path.split(json_path)
+        names = self._dir_to_names.get(self._norm(dir_path or "."))
+        if names is None:  # 目录尚未扫描，等用到时再扫描
+            return
+        if exists:
+            names.add(os.path.normcase(name))
+        else:
+            names.discard(os.path.normcase(name))
+
+    def clear(self):
+        self._dir_to_names.clear()
+
 
-    def super_text(self, column):
-        return super().text(column)
+class _DirNode:
+    """目录节点：子目录是节点对象，文件只记录在 PathTable 中的行号数组"""
+
+    __slots__ = ("path", "name", "parent", "row", "subdirs", "files", "visible",
+                 "loaded")
+
+    def __init__(self, path, name="", parent=None, row=0):
+        self.path = path
+        self.name = name
+        self.parent = parent
+        self.row = row  # 在父节点 subdirs 中的位置
+        self.subdirs = []
+        self.files = _EMPTY_ROWS  # 该目录下所有图片的全局行号（升序）
+        self.visible = _EMPTY_ROWS  # 经过过滤后显示的全局行号（升序）
+        self.loaded = False
+
+
+class FileTreeModel(QtCore.QAbstractItemModel):
+    """懒加载的文件树模型
+
+    - 目录展开时才通过 loader 开始读取内容（fetchMore），读取结果分批通过
+      append_contents 追加，全部读取完后 finish_node 做一次自然排序
+    - 文件行不创建任何 Python 对象，路径存放在 PathTable，勾选状态存放在 bytearray
+    - 每个 QModelIndex 的 internalPointer 指向其父目录节点，行号前段为子目录，后段为文件
+    - 可见文件按树中的显示顺序另存一份行号数组（及其逆映射），目录内容、过滤或删除变化时
+      失效重建，用于“下一张未标注”等按显示顺序的查找
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = PathTable()
+        self._checked = bytearray()  # 按全局行号记录勾选状态
+        self._root = _DirNode(None)
+        self._node_by_dir_id = {}  # PathTable 目录 id -> 目录节点
+        self._display_rows = None  # 按显示顺序排列的可见文件行号，None 表示需要重建
+        self._display_pos = None  # 全局行号 -> 在 _display_rows 中的位置，不可见为 -1
+        # loader(node)：开始读取目录（可异步），之后调用 append_contents / finish_node
+        self.loader: Optional[Callable] = None
+        self.file_filter: Optional[Callable[[str], bool]] = None
+
+        style = QtWidgets.QApplication.style()
+        self._folder_icon = style.standardIcon(QtWidgets.QStyle.SP_DirIcon)
+
+    # region 根目录
+    def set_root(self, root_dir: Optional[str]):
+        self.beginResetModel()
+        self.table.clear()
+        self._checked = bytearray()
+        self._node_by_dir_id = {}
+        self._root = _DirNode(root_dir)
+        self._invalidate_display_order()
+        self.endResetModel()
+        if root_dir is not None:
+            self.load_node(self._root)
+
+    def root_node(self) -> _DirNode:
+        return self._root
+
+    # endregion
+
+    # region 节点 / 行号换算
+    def node(self, index: QtCore.QModelIndex) -> Optional[_DirNode]:
+        """index 对应的目录节点；文件返回 None，无效 index 返回根节点"""
+        if not index.isValid():
+            return self._root
+        parent = index.internalPointer()
+        if index.row() < len(parent.subdirs):
+            return parent.subdirs[index.row()]
+        return None
+
+    def global_row(self, index: QtCore.QModelIndex) -> int:
+        """文件 index 对应的全局行号，目录返回 -1"""
+        if not index.isValid():
+            return -1
+        parent = index.internalPointer()
+        pos = index.row() - len(parent.subdirs)
+        if pos < 0:
+            return -1
+        return int(parent.visible[pos])
+
+    def index_of_row(self, row: int) -> QtCore.QModelIndex:
+        """全局行号对应的 index，文件被过滤隐藏时返回无效 index"""
+        node = self._node_by_dir_id.get(self.table.dir_id(row))
+        if node is None:
+            return QtCore.QModelIndex()
+        pos = int(np.searchsorted(node.visible, row))
+        if pos >= len(node.visible) or node.visible[pos] != row:
+            return QtCore.QModelIndex()
+        return self.createIndex(len(node.subdirs) + pos, 0, node)
+
+    def index_of_node(self, node: _DirNode) -> QtCore.QModelIndex:
+        if node is self._root or node.parent is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node.parent)
+
+    def find_node(self, dir_path: str) -> Optional[_DirNode]:
+        """在已加载的节点中查找目录"""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.path == dir_path:
+                return node
+            stack.extend(node.subdirs)
+        return None
+
+    def loaded_nodes(self):
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.loaded:
+                yield node
+            stack.extend(node.subdirs)
+
+    # endregion
+
+    # region 勾选状态
+    def is_checked(self, path: str) -> bool:
+        row = self.table.get(path)
+        return row >= 0 and bool(self._checked[row])
+
+    def set_checked(self, path: str, checked: bool):
+        row = self.table.get(path)
+        if row < 0 or bool(self._checked[row]) == checked:
+            return
+        self._checked[row] = checked
+        index = self.index_of_row(row)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+
+    def reset_checked(self, is_checked: Callable[[str], bool], node: _DirNode = None):
+        """按 is_checked 重新计算勾选状态，node 为空时处理所有文件"""
+        table = self.table
+        nodes = list(self.loaded_nodes()) if node is None else [node]
+        rows = range(len(table)) if node is None else node.files.tolist()
+        for row in rows:
+            self._checked[row] = is_checked(table[row])
+        for node in nodes:
+            parent = self.index_of_node(node)
+            count = self.rowCount(parent)
+            if count:
+                self.dataChanged.emit(
+                    self.index(0, 0, parent),
+                    self.index(count - 1, 0, parent),
+                    [Qt.CheckStateRole],
+                )
+
+    # endregion
+
+    # region 加载 / 过滤 / 删除
+    def _filter_rows(self, rows: np.ndarray) -> np.ndarray:
+        if self.file_filter is None or len(rows) == 0:
+            return rows
+        table = self.table
+        keep = [row for row in rows.tolist() if self.file_filter(table[row])]
+        return np.asarray(keep, dtype=np.int64)
+
+    def load_node(self, node: _DirNode):
+        """开始读取目录内容"""
+        if node.loaded or node.path is None or self.loader is None:
+            return
+        node.loaded = True
+        self.loader(node)
+
+    def append_contents(self, node: _DirNode, dir_items, file_items):
+        """追加一批读取到的内容
+
+        Args:
+            node: 目录节点
+            dir_items: [(文件夹名, 路径)]
+            file_items: [(文件名, 路径, 是否勾选)]
+        """
+        parent = self.index_of_node(node)
+        self._invalidate_display_order()
+
+        if dir_items:
+            first = len(node.subdirs)
+            self.beginInsertRows(parent, first, first + len(dir_items) - 1)
+            node.subdirs = node.subdirs + [
+                _DirNode(path, name, node, first + i)
+                for i, (name, path) in enumerate(dir_items)
+            ]
+            self.endInsertRows()
+
+        if file_items:
+            rows = self.table.extend(path for _, path, _ in file_items)
+            self._checked += bytes(bool(checked) for _, _, checked in file_items)
+            files = np.arange(rows.start, rows.stop, dtype=np.int64)
+            self._node_by_dir_id[self.table.dir_id(rows.start)] = node
+            visible = self._filter_rows(files)
+
+            first = len(node.subdirs) + len(node.visible)
+            node.files = np.concatenate([node.files, files])
+            if len(visible):
+                self.beginInsertRows(parent, first, first + len(visible) - 1)
+                node.visible = np.concatenate([node.visible, visible])
+                self.endInsertRows()
+
+    def finish_node(self, node: _DirNode):
+        """目录读取完成：子目录和文件各自按自然顺序重新排列（只做一次）"""
+        table = self.table
+        old_subdirs = node.subdirs
+        subdirs = natsort.os_sorted(old_subdirs, key=lambda n: n.name)
+        rows = node.files.tolist()
+        names = [table.name(row) for row in rows]
+        order = natsort.os_sorted(range(len(names)), key=lambda i: names[i])
+        if subdirs == old_subdirs and order == list(range(len(rows))):
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        self._invalidate_display_order()
+        old_indexes = self.persistentIndexList()
+        old_targets = []
+        for index in old_indexes:
+            if index.internalPointer() is not node:
+                old_targets.append(None)  # 其他目录下的行位置不变
+            elif index.row() < len(old_subdirs):
+                old_targets.append(old_subdirs[index.row()])
+            else:
+                old_targets.append(table[self.global_row(index)])
+
+        for i, subdir in enumerate(subdirs):
+            subdir.row = i
+        node.subdirs = subdirs
+
+        if rows:
+            new_paths = [table[rows[i]] for i in order]
+            checked = [self._checked[rows[i]] for i in order]
+            table.replace_rows(rows, new_paths)
+            for row, value in zip(rows, checked):
+                self._checked[row] = value
+            self._rebuild_dir_map()
+            node.visible = self._filter_rows(node.files)
+
+        from_list, to_list = [], []
+        for index, target in zip(old_indexes, old_targets):
+            if target is None:
+                continue
+            from_list.append(index)
+            if isinstance(target, _DirNode):
+                to_list.append(self.createIndex(target.row, 0, node))
+            else:
+                to_list.append(self.index_of_row(table.index(target)))
+        self.changePersistentIndexList(from_list, to_list)
+        self.layoutChanged.emit()
+
+    def refilter(self):
+        """按 file_filter 重新计算所有已加载目录的可见文件"""
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_rows = [self.global_row(index) for index in old_indexes]
+
+        for node in self.loaded_nodes():
+            node.visible = self._filter_rows(node.files)
+        self._invalidate_display_order()
+
+        from_list, to_list = [], []
+        for index, row in zip(old_indexes, old_rows):
+            if row < 0:  # 目录行的位置不受过滤影响
+                continue
+            from_list.append(index)
+            to_list.append(self.index_of_row(row))
+        self.changePersistentIndexList(from_list, to_list)
+        self.layoutChanged.emit()
+
+    def remove_paths(self, paths):
+        """从模型中移除文件"""
+        rows = sorted({self.table.get(p) for p in paths} - {-1})
+        if not rows:
+            return
+
+        for row in reversed(rows):
+            node = self._node_by_dir_id.get(self.table.dir_id(row))
+            if node is None:
+                continue
+            index = self.index_of_row(row)
+            if index.isValid():
+                self.beginRemoveRows(index.parent(), index.row(), index.row())
+                node.visible = node.visible[node.visible != row]
+                node.files = node.files[node.files != row]
+                self.endRemoveRows()
+            else:
+                node.files = node.files[node.files != row]
+
+        # 压缩行号：PathTable 重建后同步各节点的行号与勾选数组
+        mapping = self.table.remove_rows(rows)
+        self._checked = bytearray(
+            np.frombuffer(self._checked, dtype=np.uint8)[mapping >= 0]
+        )
+        for node in self._node_by_dir_id.values():
+            node.files = mapping[node.files]
+            node.visible = mapping[node.visible]
+        self._rebuild_dir_map()
+        self._invalidate_display_order()
+
+    def _rebuild_dir_map(self):
+        """PathTable 重建后目录 id 可能变化，重新建立目录 id -> 节点的映射"""
+        nodes = list(self._node_by_dir_id.values())
+        self._node_by_dir_id = {
+            self.table.dir_id(int(node.files[0])): node
+            for node in nodes
+            if len(node.files)
+        }
+
+    # endregion
+
+    # region 显示顺序
+    def _invalidate_display_order(self):
+        self._display_rows = None
+        self._display_pos = None
+
+    def _build_display_order(self):
+        parts = []
+        # 与树中一致：先依次是各子目录的内容，再是本目录的文件
+        stack = [(self._root, False)]
+        while stack:
+            node, subdirs_done = stack.pop()
+            if subdirs_done:
+                parts.append(node.visible)
+                continue
+            stack.append((node, True))
+            stack.extend((subdir, False) for subdir in reversed(node.subdirs))
+        rows = np.concatenate(parts) if parts else _EMPTY_ROWS
+        pos = np.full(len(self.table), -1, dtype=np.int64)
+        pos[rows] = np.arange(len(rows), dtype=np.int64)
+        self._display_rows = rows
+        self._display_pos = pos
+
+    def display_rows(self) -> np.ndarray:
+        """已加载目录中可见文件的全局行号，按树中的显示顺序排列"""
+        if self._display_rows is None:
+            self._build_display_order()
+        return self._display_rows
+
+    def display_position(self, row: int) -> int:
+        """全局行号在显示顺序中的位置，未加载或被过滤隐藏时返回 -1"""
+        if self._display_pos is None:
+            self._build_display_order()
+        if row < 0 or row >= len(self._display_pos):
+            return -1
+        return int(self._display_pos[row])
 
-    def setCheckState(self, state):
-        super().setCheckState(0, state)
+    def next_unchecked_row(self, row: int) -> int:
+        """按显示顺序在 row 之后查找第一个未勾选的可见文件，到末尾后从头开始
 
+        Args:
+            row: 起始全局行号，-1 或不可见时从头开始查找
 
-class _FileTreeWidget(QtWidgets.QTreeWidget):
+        Returns:
+            int: 找到的全局行号，没有时返回 -1
+        """
+        rows = self.display_rows()
+        start = self.display_position(row) + 1
+        checked = np.frombuffer(self._checked, dtype=np.uint8)
+        # 先从 start 向后、再从头到 start 分块查找，找到即停止，通常只看很少的行
+        for lo, hi in ((start, len(rows)), (0, start)):
+            for chunk_start in range(lo, hi, _SEARCH_CHUNK):
+                chunk = rows[chunk_start:min(chunk_start + _SEARCH_CHUNK, hi)]
+                hits = np.flatnonzero(checked[chunk] == 0)
+                if len(hits):
+                    found = int(chunk[hits[0]])
+                    return -1 if found == row else found
+        return -1
+
+    # endregion
+
+    # region QAbstractItemModel 接口
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        node = self.node(parent)
+        if node is None or column != 0 or row < 0:
+            return QtCore.QModelIndex()
+        if row >= len(node.subdirs) + len(node.visible):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, node)
+
+    def parent(self, index=None):
+        if index is None:  # QObject.parent()
+            return super().parent()
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.index_of_node(index.internalPointer())
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self.node(parent)
+        if node is None:
+            return 0
+        return len(node.subdirs) + len(node.visible)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        node = self.node(parent)
+        if node is None:
+            return False
+        if not node.loaded:
+            return node.path is not None
+        return len(node.subdirs) + len(node.visible) > 0
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return node is not None and node.path is not None and not node.loaded
+
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if node is not None:
+            self.load_node(node)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        parent = index.internalPointer()
+        row = index.row()
+        if row < len(parent.subdirs):
+            node = parent.subdirs[row]
+            if role == Qt.DisplayRole:
+                return node.name
+            if role == Qt.UserRole:
+                return node.path
+            if role == Qt.DecorationRole:
+                return self._folder_icon
+            return None
+
+        global_row = int(parent.visible[row - len(parent.subdirs)])
+        if role == Qt.DisplayRole:
+            return self.table.name(global_row)
+        if role == Qt.UserRole:
+            return self.table[global_row]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._checked[global_row] else Qt.Unchecked
+        return None
+
+    # endregion
+
+
+class _FileTreeWidget(QtWidgets.QTreeView):
     """文件树控件，用于显示和管理标注文件
-    
-    这个控件继承自QTreeWidget，实现了一个支持懒加载的文件树。
-    主要用于显示和管理图片文件及其对应的标注文件。
-    支持文件夹展开时动态加载内容，提高大型目录的加载性能。
+
+    基于 QTreeView + FileTreeModel 的虚拟化文件树：只有可见行会被绘制，
+    文件不再对应常驻的 item 对象，大目录展开时也不会卡顿。
+    对 app.py 保持原 QTreeWidget 版本的接口（currentRow / setCurrentRow /
+    findItems / count / item / selectedItems / itemSelectionChanged 等）。
     """
 
     sig_file_selected = QtCore.Signal(str)  # 文件选中信号
     sig_delete_requested = QtCore.Signal(object)  # 删除请求信号，参数为 list[str]
+    itemSelectionChanged = QtCore.Signal()  # 兼容 QTreeWidget 的选中变化信号
+    sig_scan_batch = QtCore.Signal(object)  # 后台扫描线程 -> GUI 线程，参数见 _scan_worker
 
     def __init__(self, parent=None):
         """初始化文件树控件
-        
+
         Args:
             parent: 父窗口对象
         """
         super().__init__(parent)
-        self.setHeaderLabels(["文件"])
         self.setHeaderHidden(True)
-        self.setColumnCount(1)
+        self.setUniformRowHeights(True)  # 行高一致，滚动时无需逐行测量
         self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
 
         # 属性
         self._root_dir = None
-        self._file_items = {}  # 存储文件路径到树item的映射
-        self.image_list = OrderedSet()  # 存储所有图片文件的路径列表，使用有序集合.为 as_posix 格式
         self._extensions = None  # 存储所有图片文件的扩展名 [".jpg", ".png", ".jpeg", ".bmp", ".tif", ".tiff", ".dng", ".webp"]
+        self._annotation_index = AnnotationIndex()  # 标注文件存在性索引
+        self._hidden_current_path = None  # 当前文件被过滤隐藏时记录其路径
 
-        # 设置图标
-        self._folder_icon = self.style().standardIcon(
-            QtWidgets.QStyle.SP_DirIcon)
-        self._file_icon = self.style().standardIcon(
-            QtWidgets.QStyle.SP_FileIcon)
+        # 后台扫描：切换目录时递增 generation 并取消旧任务，丢弃过期结果
+        self._scan_generation = 0
+        self._scan_cancel = threading.Event()
+        self._expand_all_nodes = set()  # 需要递归展开的目录节点
+
+        self._model = FileTreeModel(self)
+        self._model.loader = self._start_scan
+        self.setModel(self._model)
+        self.sig_scan_batch.connect(self._on_scan_batch)
 
         # 连接信号
-        self.itemClicked.connect(self._on_item_clicked)
-        self.itemExpanded.connect(self._on_item_expanded)
+        self.clicked.connect(self._on_item_clicked)
+        self.expanded.connect(self._on_item_expanded)
+        self.selectionModel().selectionChanged.connect(
+            lambda *_: self.itemSelectionChanged.emit())
 
     @property
     def extensions(self):
@@ -76,132 +629,167 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
                 for fmt in QtGui.QImageReader.supportedImageFormats())
         return self._extensions
 
-    def _on_item_clicked(self, item, column):
-        """处理项目点击事件
+    @property
+    def image_list(self) -> PathTable:
+        """所有已加载图片的路径表，为 as_posix 格式"""
+        return self._model.table
 
-        当用户点击文件节点时，发出文件选中信号。
-        只处理文件节点（没有子节点的项目），忽略文件夹节点。
+    def _on_item_clicked(self, index):
+        """处理项目点击事件
 
-        Args:
-            item: 被点击的树节点
-            column: 被点击的列索引
+        当用户点击文件节点时，发出文件选中信号，忽略文件夹节点。
         """
-        if item.childCount() == 0:  # 只处理文件节点
-            file_path = item.data(0, Qt.UserRole)
-            if file_path:
-                self.sig_file_selected.emit(file_path)
-
-    # ----------- 处理项目展开事件 -------------
-    def _on_item_expanded(self, item):
-        """处理项目展开事件
-
-        当用户展开文件夹节点时，加载该文件夹的内容。
-        通过检查是否存在占位符节点来判断是否需要加载内容。
+        file_path = index.data(Qt.UserRole)
+        if file_path and self._model.node(index) is None:
+            self.sig_file_selected.emit(file_path)
+
+    def _on_item_expanded(self, index):
+        """展开文件夹时加载其内容（视图不可见时 QTreeView 不会自动 fetchMore）"""
+        if self._model.canFetchMore(index):
+            self._model.fetchMore(index)
+
+    # ----------- item 句柄 -------------
+    def _item_from_index(self, index) -> Optional[FileTreeItem]:
+        if not index.isValid():
+            return None
+        return FileTreeItem(self, index.data(Qt.UserRole),
+                            self._model.node(index) is not None)
+
+    def index_of(self, item: FileTreeItem) -> QtCore.QModelIndex:
+        """句柄对应的 index（文件被过滤隐藏时无效）"""
+        path = item.get_path()
+        if not item.is_dir():
+            row = self.image_list.get(path)
+            if row < 0:
+                return QtCore.QModelIndex()
+            return self._model.index_of_row(row)
+        node = self._model.find_node(path)
+        if node is None:
+            return QtCore.QModelIndex()
+        return self._model.index_of_node(node)
+
+    def get_item(self, file_path: str) -> Optional[FileTreeItem]:
+        """根据文件路径获取句柄，路径不在列表中时返回 None"""
+        if file_path not in self.image_list:
+            return None
+        return FileTreeItem(self, file_path)
+
+    def itemAt(self, pos) -> Optional[FileTreeItem]:
+        return self._item_from_index(self.indexAt(pos))
+
+    def currentItem(self) -> Optional[FileTreeItem]:
+        return self._item_from_index(self.currentIndex())
+
+    def setCurrentItem(self, item: Optional[FileTreeItem]):
+        if item is None:
+            return
+        index = self.index_of(item)
+        if index.isValid():
+            self.setCurrentIndex(index)
+
+    def selectedItems(self) -> list[FileTreeItem]:
+        return [
+            self._item_from_index(index)
+            for index in self.selectionModel().selectedRows()
+        ]
 
-        Args:
-            item: 被展开的树节点
+    # ----------- 目录加载 -------------
+    def _start_scan(self, node: _DirNode):
+        """在后台线程中读取目录，结果分批回到 GUI 线程，不阻塞界面"""
+        threading.Thread(
+            target=self._scan_worker,
+            args=(node, self._scan_generation, self._scan_cancel,
+                  self.extensions),
+            daemon=True,
+        ).start()
+
+    def _scan_worker(self, node: _DirNode, generation: int,
+                     cancel: threading.Event, extensions: tuple):
+        """扫描目录（后台线程，只访问文件系统）
+
+        一次 scandir 同时拿到子目录、图片和 json 文件名，每攒够一批或间隔一段时间
+        就通过 sig_scan_batch 发出 (generation, node, dir_items, img_items, json_names, done)。
         """
-        if item.childCount() == 1:  # 可能是占位符节点
-            child_item = item.child(0)
-            # 检查子节点是否为占位符（兼容FileTreeItem和QTreeWidgetItem两种类型）
-            child_text = ""
-            if isinstance(child_item, FileTreeItem):
-                child_text = child_item.super_text(0)
-            else:  # QTreeWidgetItem
-                child_text = child_item.text(0)
-
-            if child_text == "":  # 确认是占位符节点
-                item.takeChild(0)  # 移除占位符
-                dir_path = item.data(0, Qt.UserRole)
-                self._load_directory_contents(dir_path, item)
-
-    def _load_directory_contents(self, dir_path: str,
-                                 parent_item: FileTreeItem):
-        """加载指定目录的内容
-
-        加载指定目录下的所有子文件夹和图片文件。
-        为每个文件夹添加占位符节点，实现递归的懒加载。
-        检查图片文件是否有对应的标注文件，并设置复选框状态。
+        dir_posix = Path(node.path).absolute().as_posix().rstrip("/")  # 使用 linux 路径
+        dir_items, img_items, json_names = [], [], []
+        last_emit = time.monotonic()
+        try:
+            with os.scandir(node.path) as it:
+                for entry in it:
+                    if cancel.is_set():
+                        return
+                    item_name = entry.name
+                    lower_name = item_name.lower()
+                    if entry.is_dir():
+                        dir_items.append((item_name, f"{dir_posix}/{item_name}"))
+                    elif lower_name.endswith(".json"):
+                        if entry.is_file():
+                            json_names.append(item_name)
+                    elif lower_name.endswith(extensions) and entry.is_file():
+                        img_items.append((item_name, f"{dir_posix}/{item_name}"))
+
+                    if len(dir_items) + len(img_items) >= _SCAN_BATCH_SIZE or (
+                        (dir_items or img_items)
+                        and time.monotonic() - last_emit > _SCAN_BATCH_INTERVAL
+                    ):
+                        self.sig_scan_batch.emit(
+                            (generation, node, dir_items, img_items, json_names, False))
+                        dir_items, img_items, json_names = [], [], []
+                        last_emit = time.monotonic()
+        except OSError:
+            pass
+        if not cancel.is_set():
+            self.sig_scan_batch.emit(
+                (generation, node, dir_items, img_items, json_names, True))
+
+    def _on_scan_batch(self, batch):
+        """把一批扫描结果加入模型（GUI 线程）"""
+        generation, node, dir_items, img_items, json_names, done = batch
+        if generation != self._scan_generation:
+            return
 
-        Args:
-            dir_path: 要加载的目录路径
-            parent_item: 父节点对象
-        """
-        dir_items = []  # #type: list[tuple["file_name", "file_path"]]
-        file_items = [
-        ]  # #type: list[tuple["file_name", "file_path", "checked"]]
-
-        for item_name in os.listdir(dir_path):
-            item_path = os.path.join(dir_path, item_name)
-            item_path = str(
-                Path(item_path).absolute().as_posix())  # 使用 linux 路径
-
-            if os.path.isdir(item_path):
-                dir_items.append([item_name, item_path])
-            elif os.path.isfile(item_path) and item_name.lower().endswith(
-                    self.extensions):
-                json_path = STORE.main_window.proj_manager.get_json_path(
-                    item_path)
-                checked = os.path.exists(json_path)
-                file_items.append([item_name, item_path, checked])
-
-        # 对收集的项目进行自然排序
+        self._annotation_index.add_dir_labels(node.path, json_names)
+        main_window = STORE.main_window
+        if main_window is not None and main_window.is_2_5d:
+            # 新出现的图片加入 2.5D 分组（已在分组中的图片直接跳过）
+            self.sync_2_5d_groups(
+                main_window.proj_manager.o2_5d_manager.add_images,
+                [item_path for _, item_path in img_items],
+            )
         dir_items = natsort.os_sorted(dir_items, key=lambda x: x[0])
-        file_items = natsort.os_sorted(file_items, key=lambda x: x[0])
-
-        # 添加排序后的文件夹
-        for item, item_path in dir_items:
-            dir_item = FileTreeItem(parent_item)
-            dir_item.setText(0, item)
-            dir_item.setData(0, Qt.UserRole, item_path)
-
-            dir_item.setIcon(0, self._folder_icon)
-            # 添加占位符子节点
-            QtWidgets.QTreeWidgetItem(dir_item)
+        file_items = [
+            (item_name, item_path, self.is_annotated(item_path))
+            for item_name, item_path in natsort.os_sorted(img_items, key=lambda x: x[0])
+        ]
+        first_new_dir = len(node.subdirs)
+        self._model.append_contents(node, dir_items, file_items)
 
-        # 添加排序后的文件
-        for file, file_path, checked in file_items:
-            self._add_file(file_path, checked, parent_item)
+        if node in self._expand_all_nodes and dir_items:
+            parent = self._model.index_of_node(node)
+            for row in range(first_new_dir, len(node.subdirs)):
+                self._expand_recursively(self._model.index(row, 0, parent))
 
-    def _add_file(self,
-                  file_path: str,
-                  checked: bool = False,
-                  parent_item: FileTreeItem = None):
-        """添加文件到树中
+        if done:
+            self._model.finish_node(node)
+            # json 可能排在图片之后才被读到，目录读完后再刷新一次该目录的勾选状态
+            self._model.reset_checked(self.is_annotated, node)
 
-        创建文件节点并设置其属性，包括文本、图标、复选框状态等。
-        如果文件已有对应的标注文件，则设置复选框为选中状态。
+    def sync_2_5d_groups(self, update: Callable, img_paths: list[str]):
+        """图片增删后更新 2.5D 分组，并刷新 JSON 文件名变化了的图片的勾选状态
 
         Args:
-            file_path: 文件路径
-            checked: 是否选中复选框
-            parent_item: 父节点对象，如果为None则自动创建
+            update: Proj2_5DManager.add_images / remove_images
+            img_paths: 新出现或已删除的图片
         """
-        if file_path in self._file_items:
+        if not img_paths:
             return
-
-        assert parent_item is not None
-
-        file_name = Path(file_path).name
-
-        # 创建文件节点
-        file_item = FileTreeItem(parent_item)
-        file_item.setText(0, file_name)
-        file_item.setData(0, Qt.UserRole, file_path)
-        file_item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
-        # file_item.setIcon(0, self._file_icon)
-
-        # 存储映射关系
-        self._file_items[file_path] = file_item
-        self.image_list.add(file_path)  # 使用 add 方法添加元素到有序集合
-
-    # ----------- 处理项目展开事件 End ----------
+        for img_path in update(img_paths):
+            self._model.set_checked(img_path, self.is_annotated(img_path))
 
     def set_root_dir(self, root_dir: str):
-        """设置根目录路径，只加载目录结构
+        """设置根目录路径
 
-        设置文件树的根目录，并只加载根目录下的文件夹结构。
-        使用懒加载机制，初始只显示文件夹，不加载文件。
+        设置文件树的根目录，只加载根目录这一层，子文件夹展开时再懒加载。
 
         Args:
             root_dir: 根目录的路径
@@ -212,73 +800,60 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
         self.clear()
 
         self._root_dir = root_dir  # 保存根目录路径
-        # 只加载根目录下的文件夹
-        root_item = self.invisibleRootItem()
-        self._load_directory_contents(root_dir, root_item)
+        self._model.set_root(root_dir)
 
     def get_root_dir(self) -> str:
         """获取当前根目录路径"""
         return self._root_dir
 
     def clear(self):
-        """清空文件树
-
-        清空所有节点和文件映射。
-        """
-        super().clear()
-        self._file_items.clear()
-        self.image_list.clear()  # 清空有序集合
+        """清空文件树"""
+        self._scan_cancel.set()
+        self._scan_cancel = threading.Event()
+        self._scan_generation += 1
+        self._expand_all_nodes.clear()
+
+        self._model.set_root(None)
+        self._annotation_index.clear()
+        self._hidden_current_path = None
         self._root_dir = None
 
-    def currentItem(self) -> FileTreeItem:
-        return super().currentItem()
+    def is_annotated(self, img_path: str) -> bool:
+        """图片是否已有标注文件（查索引，不访问磁盘）"""
+        json_path = STORE.main_window.proj_manager.get_json_path(img_path)
+        return self._annotation_index.exists(json_path)
+
+    def set_label_file_exists(self, json_path: str, exists: bool):
+        """保存 / 删除标注文件后同步索引"""
+        self._annotation_index.set_exists(json_path, exists)
 
     def update_state(self):
-        """更新所有文件项的勾选状态"""
-        for img_path, file_item in self._file_items.items():
-            img_path = file_item.get_path()
-            json_path = STORE.main_window.proj_manager.get_json_path(img_path)
-            checked = os.path.exists(json_path)
-            file_item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+        """更新所有文件项的勾选状态（刷新时重新扫描磁盘，每个目录扫描一次）"""
+        self._annotation_index.clear()
+        self._model.reset_checked(self.is_annotated)
 
     def delete_item(self, items: list[FileTreeItem]):
-        deleted_paths = set()
-        for item in items:
-            if item is None:
-                continue
-            file_path = item.get_path()
-            if not file_path:
-                continue
-            deleted_paths.add(file_path)
-
-            self._file_items.pop(file_path, None)
-            parent_item = item.parent()
-            if parent_item is not None:
-                parent_item.removeChild(item)
-            else:
-                self.invisibleRootItem().removeChild(item)
-
-        if deleted_paths:
-            self.image_list = OrderedSet(
-                [p for p in self.image_list if p not in deleted_paths]
-            )
+        paths = [item.get_path() for item in items if item is not None]
+        self._hidden_current_path = None
+        self._model.remove_paths([p for p in paths if p])
+
+    def _expand_recursively(self, index):
+        """递归展开所有子文件夹（未读取的目录读取到子文件夹后继续展开）"""
+        node = self._model.node(index)
+        if node is None:
+            return
+        self._expand_all_nodes.add(node)
+        self.expand(index)
+        for row in range(len(node.subdirs)):
+            self._expand_recursively(self._model.index(row, 0, index))
 
     def contextMenuEvent(self, event):
 
-        def context_folder_menu(item, event):
+        def context_folder_menu(index, event):
             menu = QtWidgets.QMenu(self)
 
-            def _expand_all_subfolders(item):
-                """递归展开所有子文件夹"""
-                if not item.isExpanded():
-                    item.setExpanded(True)
-                for i in range(item.childCount()):
-                    child = item.child(i)
-                    if child.childCount() > 0:
-                        _expand_all_subfolders(child)
-
             def expand_all():
-                _expand_all_subfolders(item)
+                self._expand_recursively(index)
 
             expand_action = menu.addAction(dlcv_tr("展开所有子文件夹"))
             expand_action.triggered.connect(expand_all)
@@ -315,7 +890,7 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
             def delete_images_and_labels():
                 file_paths = []
                 for file_item in items:
-                    if file_item and file_item.childCount() == 0:
+                    if file_item and not file_item.is_dir():
                         file_path = file_item.get_path()
                         if file_path:
                             file_paths.append(str(Path(file_path).absolute().as_posix()))
@@ -344,12 +919,13 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
 
             menu.exec_(self.viewport().mapToGlobal(event.pos()))
 
-        item = self.itemAt(event.pos())
+        index = self.indexAt(event.pos())
+        item = self._item_from_index(index)
         select_items = self.selectedItems()
 
         # 如果点击的是文件夹，则显示文件夹菜单
-        if item and item.childCount() > 0:
-            context_folder_menu(item, event)
+        if item and item.is_dir():
+            context_folder_menu(index, event)
 
         if len(select_items) > 0:
             context_file_nemu(select_items)
@@ -382,18 +958,15 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
         if search_text and search_text not in img_path:
             return False
 
-        json_path = STORE.main_window.proj_manager.get_json_path(img_path)
-        is_annotated = os.path.exists(json_path)
-
         # 两个都没勾 = 不筛选标注状态，全部显示
         if not show_annotated and not show_unannotated:
             return True
         # 只勾了已标注
         if show_annotated and not show_unannotated:
-            return is_annotated
+            return self.is_annotated(img_path)
         # 只勾了未标注
         if not show_annotated and show_unannotated:
-            return not is_annotated
+            return not self.is_annotated(img_path)
         # 两个都勾了 = 全部显示
         return True
 
@@ -402,17 +975,33 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
                       show_unannotated: bool = False):
         """应用过滤条件
 
-        同时根据搜索文本和标注状态过滤文件项。
+        同时根据搜索文本和标注状态过滤文件项，之后展开的目录也会沿用该条件。
 
         Args:
             search_text: 搜索关键词
             show_annotated: 是否显示已标注文件
             show_unannotated: 是否显示未标注文件
         """
-        for img_path, file_item in self._file_items.items():
-            show = self._should_show_item(
+        current_row = self.currentRow()
+        if not search_text and show_annotated == show_unannotated:
+            self._model.file_filter = None
+        else:
+            self._model.file_filter = lambda img_path: self._should_show_item(
                 img_path, search_text, show_annotated, show_unannotated)
-            file_item.setHidden(not show)
+        self._model.refilter()
+
+        # 与 QTreeWidget.setHidden 行为一致：当前文件被隐藏后仍记为当前行，重新显示时恢复选中
+        self._hidden_current_path = None
+        if current_row >= 0 and not self.currentIndex().isValid():
+            index = self._model.index_of_row(current_row)
+            if index.isValid():
+                # 仅恢复选中，不触发 itemSelectionChanged 重新加载图片
+                blocker = QtCore.QSignalBlocker(self.selectionModel())
+                self.setCurrentIndex(index)
+                del blocker
+                self.viewport().update()
+            else:
+                self._hidden_current_path = self.image_list[current_row]
 
     def search(self, text: str):
         """ 根据字符串隐藏 items
@@ -426,26 +1015,45 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
 
     def currentRow(self):
         """ load file 的时候，使用了该函数 """
-        current_item = self.currentItem()
-        if current_item is None:
+        index = self.currentIndex()
+        if index.isValid():
+            return self._model.global_row(index)
+        if self._hidden_current_path is None:
             return -1
-
-        current_path = current_item.get_path()
-        return self.image_list.index(
-            current_path) if current_path in self.image_list else -1
+        return self.image_list.get(self._hidden_current_path)
 
     def setCurrentRow(self, row):
         """ load file 的时候，使用了该函数 """
-        item_path = self.image_list[row]
-        item = self._file_items.get(item_path)
-        self.setCurrentItem(item)
+        index = self._model.index_of_row(row)
+        if index.isValid():
+            self.setCurrentIndex(index)
 
     def count(self):
         return len(self.image_list)
 
+    def select_next_unannotated(self) -> bool:
+        """选中显示顺序中当前文件之后的下一张未标注图片（到末尾后从头开始）
+
+        只在已加载且未被过滤隐藏的文件中查找，所在文件夹未展开时自动展开。
+
+        Returns:
+            bool: 是否找到
+        """
+        row = self._model.next_unchecked_row(self.currentRow())
+        if row < 0:
+            return False
+        index = self._model.index_of_row(row)
+        parent = index.parent()
+        while parent.isValid():
+            self.expand(parent)
+            parent = parent.parent()
+        self.setCurrentIndex(index)
+        self.scrollTo(index)
+        return True
+
     def item(self, row):
         """ 自动标注使用了该函数 """
-        return self._file_items.get(self.image_list[row])
+        return FileTreeItem(self, self.image_list[row])
 
     def findItems(self,
                   text,
@@ -475,11 +1083,13 @@ class _FileTreeWidget(QtWidgets.QTreeWidget):
                 depth_img_path = STORE.main_window.proj_manager.get_depth_img_path(
                     text)
 
-                gray_img_item = self._file_items.get(gray_img_path)
-                depth_img_item = self._file_items.get(depth_img_path)
+                gray_img_item = self.get_item(gray_img_path)
+                depth_img_item = self.get_item(depth_img_path)
                 return list(filter(None, [gray_img_item, depth_img_item]))
             else:
-                item = self._file_items[text]
+                item = self.get_item(text)
+                if item is None:
+                    raise KeyError(text)
                 return [item]
         except KeyError:
             from labelme.dlcv.utils_func import notification, ToastPreset
@@ -626,20 +1236,28 @@ class FileTreeWidget(QtWidgets.QWidget):
                 deleted_current = True
             try:
                 json_path = main_window.proj_manager.get_json_path(img_path_abs)
+                if json_path:
+                    # 等待该文件排队中的保存写完，避免删除后又被写出来
+                    main_window.label_writer.wait(json_path)
                 if os.path.exists(img_path_abs):
                     os.remove(img_path_abs)
                     deleted_count += 1
+                    main_window.image_prefetcher.discard(img_path_abs)
                 if json_path and os.path.exists(json_path):
                     os.remove(json_path)
+                    self.tree_widget.set_label_file_exists(json_path, False)
             except Exception as e:
                 failed.append((img_path_abs, str(e)))
 
         items_to_remove = [
-            self.tree_widget._file_items.get(path)
-            for path in file_paths
-            if path in self.tree_widget._file_items
+            self.tree_widget.get_item(path) for path in file_paths
         ]
         self.tree_widget.delete_item(items_to_remove)
+        if main_window.is_2_5d:
+            self.tree_widget.sync_2_5d_groups(
+                main_window.proj_manager.o2_5d_manager.remove_images,
+                [p for p in file_paths if not os.path.exists(p)],
+            )
 
         if deleted_current:
             _clear_current_file_state(self.tree_widget)
@@ -0,0 +1,230 @@
+"""图片预解码缓存。
+
+切图时 ``MainWindow.loadFile`` 需要在 GUI 线程里完成 ``np.fromfile`` +
+``cv2.imdecode`` + 16 位归一化 + 颜色转换，大图（20~60MP）每次要几百毫秒。
+这里用线程池提前把上一张/下一张若干图片解码成 RGB 数组放到按字节数限制的
+LRU 缓存里，``loadFile`` 命中后只需要做 ``QPixmap`` 上传。
+"""
+
+import collections
+import os
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from labelme.dlcv.utils_func import normalize_16b_gray_to_uint8
+from labelme.logger import logger
+
+# 超过该大小的文件用 PIL 读取（与 loadFile 原有逻辑一致）
+_CV_DECODE_MAX_FILE_SIZE = 100000000
+
+
+def decode_image_to_rgb(file_path: str, to_gray: bool = False) -> Optional[np.ndarray]:
+    """读取图片并转换为用于显示的 8 位 RGB 数组。
+
+    :param file_path: 图片路径
+    :param to_gray: 是否先转为灰度再转回 RGB（对应设置中的"转为灰度图"）
+    :return: HxWx3 的 uint8 数组；文件无法解码时返回 None，读取异常直接抛出
+    """
+    if os.path.getsize(file_path) < _CV_DECODE_MAX_FILE_SIZE:
+        cv_img = cv2.imdecode(
+            np.fromfile(file_path.encode("utf-8"), dtype=np.uint8),
+            cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH,
+        )
+    else:
+        image = np.array(Image.open(f"{file_path}"))
+        cv_img = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    if cv_img is None:
+        return None
+
+    cv_img = normalize_16b_gray_to_uint8(cv_img)
+    if len(cv_img.shape) == 2:
+        cv_rgb_img = cv2.cvtColor(cv_img, cv2.COLOR_GRAY2RGB)
+    else:
+        cv_rgb_img = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
+
+    if to_gray:
+        cv_rgb_img = cv2.cvtColor(cv_rgb_img, cv2.COLOR_RGB2GRAY)
+        cv_rgb_img = cv2.cvtColor(cv_rgb_img, cv2.COLOR_GRAY2RGB)
+
+    return np.ascontiguousarray(cv_rgb_img)
+
+
+def _file_signature(file_path: str) -> Tuple[int, int]:
+    """文件的 (mtime_ns, size)，用于判断缓存是否已失效。"""
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+class ImagePrefetcher:
+    """后台预解码 + 字节预算 LRU 缓存。
+
+    - ``prefetch(paths)`` 把尚未缓存的图片提交到线程池解码
+    - ``get(path)`` 返回解码好的 RGB 数组；若该图片正在解码则等待其完成，
+      未命中时在当前线程同步解码并放入缓存
+    - 缓存键包含灰度开关，并在取用时校验文件的 mtime/size
+
+    缓存中的数组被设为只读，调用方不要原地修改。
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024, max_workers: int = 2):
+        self._max_bytes = max(0, int(max_bytes))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image_prefetch"
+        )
+        # 可重入：future 已完成时 add_done_callback 会在持锁的当前线程里直接回调
+        self._lock = threading.RLock()
+        # key -> (signature, array)，按最近使用排序
+        self._cache = collections.OrderedDict()
+        self._pending: Dict[tuple, Future] = {}
+        self._cur_bytes = 0
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    # region 属性
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def cur_bytes(self) -> int:
+        return self._cur_bytes
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self._max_bytes = max(0, int(max_bytes))
+            self._evict_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._cache),
+                "bytes": self._cur_bytes,
+                "max_bytes": self._max_bytes,
+                "pending": len(self._pending),
+            }
+
+    # endregion
+
+    def get(self, file_path: str, to_gray: bool = False) -> Optional[np.ndarray]:
+        """取出解码后的 RGB 数组，异常语义与 ``decode_image_to_rgb`` 一致。"""
+        key = (file_path, bool(to_gray))
+        signature = _file_signature(file_path)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == signature:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self._pending.get(key)
+
+        if future is not None:
+            try:
+                future.result()
+            except Exception:
+                pass
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] == signature:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        array = decode_image_to_rgb(file_path, to_gray)
+        if array is not None:
+            self._put(key, signature, array)
+        return array
+
+    def prefetch(self, paths: Iterable[str], to_gray: bool = False):
+        """按顺序提交需要预解码的图片（越靠前越先解码）。"""
+        if self._max_bytes <= 0:
+            return
+        with self._lock:
+            generation = self._generation
+            for file_path in paths:
+                key = (file_path, bool(to_gray))
+                if key in self._cache or key in self._pending:
+                    continue
+                future = self._executor.submit(self._decode_task, key, generation)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, k=key: self._on_task_done(k, f))
+
+    def clear(self):
+        """清空缓存；已提交的解码任务结果会被丢弃。"""
+        with self._lock:
+            self._generation += 1
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._cache.clear()
+            self._cur_bytes = 0
+
+    def discard(self, file_path: str):
+        """移除某张图片的缓存并取消排队中的解码（文件被删除时调用）。"""
+        with self._lock:
+            for key in [k for k in self._pending if k[0] == file_path]:
+                self._pending.pop(key).cancel()
+            for key in [k for k in self._cache if k[0] == file_path]:
+                self._cur_bytes -= self._cache.pop(key)[1].nbytes
+
+    def shutdown(self):
+        self.clear()
+        self._executor.shutdown(wait=False)
+
+    # region 内部实现
+    def _decode_task(self, key: tuple, generation: int):
+        file_path, to_gray = key
+        try:
+            signature = _file_signature(file_path)
+            array = decode_image_to_rgb(file_path, to_gray)
+        except Exception as e:
+            logger.debug(f"prefetch decode failed: {file_path}, {e}")
+            return
+        if array is None:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._put(key, signature, array)
+
+    def _on_task_done(self, key: tuple, future: Future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def _put(self, key: tuple, signature: Tuple[int, int], array: np.ndarray):
+        array.flags.writeable = False
+        with self._lock:
+            if array.nbytes > self._max_bytes:
+                return
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._cur_bytes -= old[1].nbytes
+            self._cache[key] = (signature, array)
+            self._cur_bytes += array.nbytes
+            self._evict_locked()
+
+    def _evict_locked(self):
+        while self._cache and self._cur_bytes > self._max_bytes:
+            _, (_, array) = self._cache.popitem(last=False)
+            self._cur_bytes -= array.nbytes
+
+    # endregion
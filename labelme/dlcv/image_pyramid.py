@@ -0,0 +1,219 @@
+"""超大图片的分块多分辨率显示。
+
+``loadFile`` 原来把整张图转成一个 ``QPixmap``，``paintEvent`` 每次重绘都以当前缩放
+绘制整张 pixmap。100MP 以上的线扫图光 pixmap 就要几百 MB 到 GB 级内存，
+缩放、平移时每帧都要缩放整张图。
+
+``TiledPixmap`` 代替画布上的 ``QPixmap``：
+
+- 对外保持 ``width`` / ``height`` / ``size`` / ``isNull`` / ``toImage`` 接口，
+  坐标、``outOfPixmap``、``max_x_width`` 与 AI 模型看到的都是原图分辨率
+- 后台线程用 ``cv2.resize(INTER_AREA)`` 逐级生成 1/2、1/4 ... 缩小图，从最粗的一级开始，
+  缩到全图显示时最先可用
+- 绘制时按 ``scale`` 选择分辨率最接近且不低于屏幕的一级，只绘制与重绘区域相交的分块；
+  分块在首次绘制时才转为 ``QPixmap``，按字节数做 LRU 缓存
+"""
+
+import collections
+import math
+import threading
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import cv2
+import numpy as np
+from qtpy import QtCore
+from qtpy import QtGui
+
+from labelme.logger import logger
+from labelme.utils.image import numpy_to_qimage
+
+# 像素数超过该值的图片才使用分块显示，小图仍然使用单个 QPixmap
+TILED_MIN_PIXELS = 32 * 1024 * 1024
+TILE_SIZE = 512
+# 已转换为 QPixmap 的分块缓存上限
+DEFAULT_TILE_CACHE_BYTES = 256 * 1024 * 1024
+# 逐级缩小，直到最粗一级的长边不超过该值
+_MIN_LEVEL_SIZE = TILE_SIZE
+
+
+def create_pixmap(image: QtGui.QImage, array: np.ndarray = None):
+    """
+    为画布创建显示用的 pixmap：大图返回 ``TiledPixmap``，其余返回普通 ``QPixmap``
+
+    :param image: 原图 QImage
+    :param array: image 引用的 numpy 数组（``numpy_to_qimage`` 不复制数据），
+        给出时用于生成缩小图
+    """
+    if (
+        array is None
+        or image.isNull()
+        or image.width() * image.height() < TILED_MIN_PIXELS
+    ):
+        return QtGui.QPixmap.fromImage(image)
+    return TiledPixmap(image, array)
+
+
+def _level_count(width: int, height: int) -> int:
+    """缩小图级数（含原图），直到长边不超过 _MIN_LEVEL_SIZE"""
+    longest = max(width, height)
+    if longest <= _MIN_LEVEL_SIZE:
+        return 1
+    return 1 + int(math.ceil(math.log2(longest / _MIN_LEVEL_SIZE)))
+
+
+class TiledPixmap(QtCore.QObject):
+    """分块多分辨率图片，接口与画布用到的 QPixmap 方法一致"""
+
+    # 某一级缩小图生成完成
+    sig_level_ready = QtCore.Signal()
+
+    def __init__(
+        self,
+        image: QtGui.QImage,
+        array: np.ndarray,
+        tile_cache_bytes: int = DEFAULT_TILE_CACHE_BYTES,
+    ):
+        super().__init__()
+        # QImage 不会拷贝数据，需持有数组引用
+        self._array = array
+        self._image = image
+        self._width = image.width()
+        self._height = image.height()
+
+        # 级别 -> (QImage, 数组)；第 0 级即原图
+        self._levels: Dict[int, Tuple[QtGui.QImage, np.ndarray]] = {0: (image, array)}
+        self._num_levels = _level_count(self._width, self._height)
+        self._levels_lock = threading.Lock()
+
+        self._tiles = collections.OrderedDict()
+        self._tile_bytes = 0
+        self._max_tile_bytes = tile_cache_bytes
+
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._build_levels, daemon=True)
+        self._thread.start()
+
+    # region QPixmap 接口
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def size(self) -> QtCore.QSize:
+        return QtCore.QSize(self._width, self._height)
+
+    def rect(self) -> QtCore.QRect:
+        return QtCore.QRect(0, 0, self._width, self._height)
+
+    def isNull(self) -> bool:
+        return self._image.isNull()
+
+    def __bool__(self):
+        return not self.isNull()
+
+    def toImage(self) -> QtGui.QImage:
+        """原图（共享数据，写入时 QImage 会自动分离，不会改动原数组）"""
+        return QtGui.QImage(self._image)
+
+    # endregion
+
+    def close(self):
+        """停止后台生成并释放分块，切换图片时调用"""
+        self._closed.set()
+        self._tiles.clear()
+        self._tile_bytes = 0
+
+    def _build_levels(self):
+        # 从最粗的一级开始，每一级都由原图直接缩小，全图显示所需的一级最先完成
+        for level in range(self._num_levels - 1, 0, -1):
+            if self._closed.is_set():
+                return
+            factor = 2**level
+            width = max(1, self._width // factor)
+            height = max(1, self._height // factor)
+            try:
+                array = cv2.resize(
+                    self._array, (width, height), interpolation=cv2.INTER_AREA
+                )
+                if array.ndim == 2:
+                    array = array[:, :, np.newaxis]
+                array = np.ascontiguousarray(array)
+                image = numpy_to_qimage(array)
+            except Exception as e:
+                logger.warning(f"Failed to build image pyramid level {level}: {e}")
+                return
+            with self._levels_lock:
+                self._levels[level] = (image, array)
+            self.sig_level_ready.emit()
+
+    def ready_levels(self) -> List[int]:
+        with self._levels_lock:
+            return sorted(self._levels)
+
+    def level_for_scale(self, scale: float) -> int:
+        """分辨率不低于屏幕的最粗一级；该级还没生成时退回已生成的更精细一级"""
+        if scale <= 0:
+            return 0
+        wanted = max(0, int(math.floor(math.log2(1.0 / scale) + 1e-9)))
+        wanted = min(wanted, self._num_levels - 1)
+        with self._levels_lock:
+            while wanted > 0 and wanted not in self._levels:
+                wanted -= 1
+        return wanted
+
+    def _tile(self, level: int, image: QtGui.QImage, tx: int, ty: int):
+        key = (level, tx, ty)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        rect = QtCore.QRect(tx * TILE_SIZE, ty * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        pixmap = QtGui.QPixmap.fromImage(image.copy(rect.intersected(image.rect())))
+        self._tiles[key] = pixmap
+        self._tile_bytes += pixmap.width() * pixmap.height() * 4
+        while self._tile_bytes > self._max_tile_bytes and len(self._tiles) > 1:
+            _, old = self._tiles.popitem(last=False)
+            self._tile_bytes -= old.width() * old.height() * 4
+        return pixmap
+
+    def paint(self, painter: QtGui.QPainter, rect: QtCore.QRectF, scale: float):
+        """
+        绘制与 rect 相交的分块
+
+        :param painter: 已按 scale 缩放、平移到图片坐标系的 painter
+        :param rect: 需要重绘的区域（图片坐标）
+        :param scale: 画布当前缩放比例，用于选择级别
+        """
+        rect = rect.intersected(QtCore.QRectF(0, 0, self._width, self._height))
+        if rect.isEmpty():
+            return
+
+        level = self.level_for_scale(scale)
+        with self._levels_lock:
+            image = self._levels[level][0]
+        # 该级像素对应原图的像素数（宽高各自取整后不一定是 2 的整数次幂）
+        sx = self._width / image.width()
+        sy = self._height / image.height()
+
+        tx1 = max(0, int(rect.left() / sx) // TILE_SIZE)
+        ty1 = max(0, int(rect.top() / sy) // TILE_SIZE)
+        tx2 = min((image.width() - 1) // TILE_SIZE, int(rect.right() / sx) // TILE_SIZE)
+        ty2 = min(
+            (image.height() - 1) // TILE_SIZE, int(rect.bottom() / sy) // TILE_SIZE
+        )
+        for ty in range(ty1, ty2 + 1):
+            for tx in range(tx1, tx2 + 1):
+                tile = self._tile(level, image, tx, ty)
+                if level == 0:
+                    painter.drawPixmap(tx * TILE_SIZE, ty * TILE_SIZE, tile)
+                    continue
+                target = QtCore.QRectF(
+                    tx * TILE_SIZE * sx,
+                    ty * TILE_SIZE * sy,
+                    tile.width() * sx,
+                    tile.height() * sy,
+                )
+                painter.drawPixmap(target, tile, QtCore.QRectF(tile.rect()))
@@ -1,31 +1,37 @@
 from labelme.label_file import *
 import math
 
+from labelme.dlcv.mask_codec import LazyMask
+from labelme.utils import json_codec
+
+
+_KEYS = [
+    "version",
+    "imageData",
+    "imagePath",
+    "shapes",  # polygonal annotations
+    "flags",  # image level flags
+    "imageHeight",
+    "imageWidth",
+]
+_SHAPE_KEYS = [
+    "label",
+    "points",
+    "group_id",
+    "shape_type",
+    "flags",
+    "description",
+    "mask",
+]
+
 
 class LabelFile(LabelFile):
 
     def load(self, filename):
-        keys = [
-            "version",
-            "imageData",
-            "imagePath",
-            "shapes",  # polygonal annotations
-            "flags",  # image level flags
-            "imageHeight",
-            "imageWidth",
-        ]
-        shape_keys = [
-            "label",
-            "points",
-            "group_id",
-            "shape_type",
-            "flags",
-            "description",
-            "mask",
-        ]
+        keys = _KEYS
+        shape_keys = _SHAPE_KEYS
         try:
-            with open(filename, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_file(filename)
 
             flags = data.get("flags") or {}
             imagePath = data["imagePath"]
@@ -37,9 +43,8 @@ class LabelFile(LabelFile):
                     flags=s.get("flags", {}),
                     description=s.get("description"),
                     group_id=s.get("group_id"),
-                    mask=utils.img_b64_to_arr(s["mask"]).astype(bool)
-                    if s.get("mask")
-                    else None,
+                    # 使用时才解码，支持 base64 PNG 与 RLE 两种格式
+                    mask=LazyMask(s["mask"]) if s.get("mask") else None,
                     other_data={k: v for k, v in s.items() if k not in shape_keys},
                 )
                 for s in data["shapes"]
@@ -60,6 +65,41 @@ class LabelFile(LabelFile):
         self.filename = filename
         self.otherData = otherData
 
+    def set_saved_data(self, filename, shapes, imagePath, flags=None, otherData=None):
+        """
+        用即将写入 filename 的数据更新内存中的内容，结果与写完后再 load 一致，
+        保存后不必再把文件读回来
+
+        :param shapes: 同 save 的 shapes，但 mask 为数组或 LazyMask，而不是编码后的数据
+        """
+        shapes = self.saveRotationBox(shapes)
+        self.flags = dict(flags or {})
+        self.shapes = [
+            dict(
+                label=s["label"],
+                points=[[x, y] for x, y in s["points"]],
+                shape_type=s.get("shape_type", "polygon"),
+                flags=s.get("flags", {}),
+                description=s.get("description"),
+                group_id=s.get("group_id"),
+                mask=self._saved_mask(s.get("mask")),
+                other_data={k: v for k, v in s.items() if k not in _SHAPE_KEYS},
+            )
+            for s in shapes
+        ]
+        self.imagePath = imagePath
+        self.imageData = None
+        self.filename = filename
+        self.otherData = {
+            k: v for k, v in (otherData or {}).items() if k not in _KEYS
+        }
+
+    @staticmethod
+    def _saved_mask(mask):
+        if mask is None or isinstance(mask, LazyMask):
+            return mask
+        return mask.astype(bool)
+
     # 修改该函数是为了 https://bbs.dlcv.ai/t/topic/328
     @staticmethod
     def load_image_file(filename):
@@ -231,6 +271,8 @@ class LabelFile(LabelFile):
         imageData=None,
         otherData=None,
         flags=None,
+        compact=False,
+        point_decimals=None,
     ):
         # 添加处理旋转框的方向属性
         shapes = self.saveRotationBox(shapes)
@@ -244,6 +286,8 @@ class LabelFile(LabelFile):
             imageData=imageData,
             otherData=otherData,
             flags=flags,
+            compact=compact,
+            point_decimals=point_decimals,
         )
 
     def load_shapes(self, shapes, s, parsers=None):
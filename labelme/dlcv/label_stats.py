@@ -0,0 +1,311 @@
+"""文件夹标签统计。
+
+``LabelCountDock.count_labels_in_dir`` 原来在 GUI 线程里 ``os.walk`` 整个文件夹并逐个
+``json.load``，每次点击都要把所有 json 重新读一遍，文件多、在网络盘上时界面会卡住很久。
+
+现在的做法：
+
+- 每个 json 文件的标签计数与文本标记计数按 (相对路径, mtime, 大小) 缓存到磁盘，
+  默认在 ``~/.cache/labelme/label_stats`` 下，每个文件夹一个缓存文件
+- 再次统计时只重新读取 mtime 或大小变化了的文件，删除的文件从缓存中去掉
+- 遍历与读取在后台线程进行，需要读取的文件交给线程池并行解析，
+  ``LabelStatsWorker`` 定时把当前的累计结果发给界面
+"""
+
+import concurrent.futures
+import hashlib
+import os
+import os.path as osp
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from qtpy import QtCore
+
+from labelme.logger import logger
+from labelme.utils import json_codec
+
+DEFAULT_CACHE_DIR = osp.join(osp.expanduser("~"), ".cache", "labelme", "label_stats")
+_CACHE_VERSION = 1
+# 界面刷新间隔（秒）
+_PROGRESS_INTERVAL = 0.2
+
+
+def count_label_data(data: dict) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """单个标注文件的 (标签计数, 文本标记计数)，只统计值为 True 的文本标记"""
+    labels = Counter()
+    for shape in data.get("shapes", []):
+        label = shape.get("label", "")
+        if label:
+            labels[label] += 1
+
+    flags = Counter()
+    file_flags = data.get("flags", {})
+    if isinstance(file_flags, dict):
+        for flag_name, flag_value in file_flags.items():
+            if flag_value is True:
+                flags[flag_name] += 1
+    return dict(labels), dict(flags)
+
+
+def _read_counts(path: str):
+    return count_label_data(json_codec.load_file(path))
+
+
+def iter_json_files(root: str):
+    """
+    递归列出 root 下的 json 文件 (路径, os.stat_result)
+
+    与 os.walk 一样不进入目录的符号链接
+    """
+    stack = [root]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+
+class LabelStatsCache:
+    """一个文件夹的统计缓存：相对路径 -> [mtime_ns, 大小, 标签计数, 文本标记计数]"""
+
+    def __init__(self, root: str, cache_dir: Optional[str] = None):
+        self.root = osp.abspath(root)
+        key = hashlib.blake2b(
+            osp.normcase(self.root).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        self.path = osp.join(cache_dir or DEFAULT_CACHE_DIR, key + ".json")
+        self._entries: Dict[str, list] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            data = json_codec.load_file(self.path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Failed to load label stats cache {self.path}: {e}")
+            return
+        if data.get("version") == _CACHE_VERSION and data.get("root") == self.root:
+            self._entries = data.get("files", {})
+
+    def get(self, rel_path: str, stat: os.stat_result):
+        entry = self._entries.get(rel_path)
+        if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            return None
+        return entry[2], entry[3]
+
+    def put(self, rel_path: str, stat: os.stat_result, labels: dict, flags: dict):
+        self._entries[rel_path] = [stat.st_mtime_ns, stat.st_size, labels, flags]
+        self._dirty = True
+
+    def retain(self, rel_paths):
+        """去掉已经不存在的文件"""
+        rel_paths = set(rel_paths)
+        removed = [p for p in self._entries if p not in rel_paths]
+        for rel_path in removed:
+            del self._entries[rel_path]
+        if removed:
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        data = {"version": _CACHE_VERSION, "root": self.root, "files": self._entries}
+        tmp_path = "%s.%s.tmp" % (self.path, uuid.uuid4().hex)
+        try:
+            os.makedirs(osp.dirname(self.path), exist_ok=True)
+            json_codec.dump_file(data, tmp_path, compact=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Failed to save label stats cache {self.path}: {e}")
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class LabelStatsResult:
+    """累计的统计结果"""
+
+    def __init__(self):
+        self.labels = Counter()
+        self.flags = Counter()
+        self.json_count = 0  # 扫描到的 json 文件数
+        self.read_count = 0  # 实际重新读取的文件数
+        self.finished = False
+
+    def add(self, labels: dict, flags: dict):
+        self.labels.update(labels)
+        self.flags.update(flags)
+
+    def copy(self) -> "LabelStatsResult":
+        result = LabelStatsResult()
+        result.labels = Counter(self.labels)
+        result.flags = Counter(self.flags)
+        result.json_count = self.json_count
+        result.read_count = self.read_count
+        result.finished = self.finished
+        return result
+
+
+def scan_label_stats(
+    root: str,
+    cache: Optional[LabelStatsCache] = None,
+    max_workers: int = 8,
+    on_progress: Optional[Callable[[LabelStatsResult], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Optional[LabelStatsResult]:
+    """
+    统计 root 下所有 json 文件的标签与文本标记
+
+    :param cache: 统计缓存，None 时不使用缓存
+    :param on_progress: 每隔一段时间以当前累计结果调用
+    :param cancel: 置位后尽快返回 None，已读取的结果仍写入缓存
+    """
+    result = LabelStatsResult()
+    seen = []
+    last_progress = time.monotonic()
+
+    def progress():
+        nonlocal last_progress
+        now = time.monotonic()
+        if on_progress is not None and now - last_progress >= _PROGRESS_INTERVAL:
+            last_progress = now
+            on_progress(result)
+
+    def collect(future, rel_path, stat):
+        try:
+            labels, flags = future.result()
+        except Exception as e:
+            # 读取失败（例如文件损坏）不计入统计，也不缓存，下次重新读取
+            logger.debug(f"Failed to count labels in {rel_path}: {e}")
+            return
+        result.add(labels, flags)
+        if cache is not None:
+            cache.put(rel_path, stat, labels, flags)
+
+    # 读取完成的 (future, 相对路径, stat)，在本线程中累计，避免对结果加锁
+    done_queue = queue.SimpleQueue()
+    pending = 0
+
+    def drain(timeout=None):
+        nonlocal pending
+        try:
+            item = (
+                done_queue.get(timeout=timeout) if timeout else done_queue.get_nowait()
+            )
+            while True:
+                pending -= 1
+                collect(*item)
+                item = done_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for path, stat in iter_json_files(root):
+            if cancel is not None and cancel.is_set():
+                break
+            rel_path = osp.relpath(path, root)
+            seen.append(rel_path)
+            result.json_count += 1
+            cached = cache.get(rel_path, stat) if cache is not None else None
+            if cached is not None:
+                result.add(*cached)
+            else:
+                result.read_count += 1
+                pending += 1
+                future = executor.submit(_read_counts, path)
+                future.add_done_callback(
+                    lambda f, r=rel_path, st=stat: done_queue.put((f, r, st))
+                )
+                futures.append(future)
+
+            # 结果边扫描边累计
+            drain()
+            progress()
+
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for future in futures:
+                    future.cancel()
+                break
+            drain(timeout=_PROGRESS_INTERVAL)
+            progress()
+
+    cancelled = cancel is not None and cancel.is_set()
+    if cache is not None:
+        if not cancelled:
+            cache.retain(seen)
+        cache.save()
+    if cancelled:
+        return None
+    result.finished = True
+    return result
+
+
+class LabelStatsWorker(QtCore.QObject):
+    """在后台线程统计文件夹，结果通过信号发给界面"""
+
+    # LabelStatsResult（累计结果的副本，finished 为 True 时是最终结果）
+    sig_progress = QtCore.Signal(object)
+
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 8):
+        super().__init__()
+        self._cache_dir = cache_dir
+        self._max_workers = max_workers
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, root: str):
+        """开始统计 root，正在进行的统计会被取消"""
+        self.cancel()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(root, self._cancel), daemon=True
+        )
+        self._thread.start()
+
+    def cancel(self, wait: bool = False):
+        self._cancel.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def _run(self, root: str, cancel: threading.Event):
+        try:
+            cache = LabelStatsCache(root, self._cache_dir)
+            result = scan_label_stats(
+                root,
+                cache,
+                max_workers=self._max_workers,
+                on_progress=lambda r: (
+                    cancel.is_set() or self.sig_progress.emit(r.copy())
+                ),
+                cancel=cancel,
+            )
+        except Exception as e:
+            logger.error(f"Failed to count labels in {root}: {e}")
+            return
+        if result is not None and not cancel.is_set():
+            self.sig_progress.emit(result)
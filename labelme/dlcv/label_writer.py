@@ -0,0 +1,153 @@
+"""标注文件的后台保存。
+
+原来的 ``MainWindow.saveLabels`` 在 GUI 线程里把 mask 编码成 base64 PNG、
+写带缩进的 json，写完还要 ``labelFile.load`` 把刚写的文件重新读一遍
+（包括再解码一遍 mask）。
+``loadFile`` 切图时会调用 ``setDirty`` 触发自动保存，所以每次切图都要付出这些开销。
+
+现在的流程：
+
+1. GUI 线程用 ``snapshot_shape`` 复制保存需要的数据（点坐标、属性、mask 数组）
+2. 内存中的 ``LabelFile`` 直接由快照更新（``LabelFile.set_saved_data``），不再读回文件
+3. ``LabelFileWriter`` 的写线程编码 mask 并写文件；
+   ``LabelFile.save`` 先写临时文件再改名，其他程序不会读到写了一半的 json
+4. 同一个文件还没开始写的保存会被后一次保存替换，只写最新的内容
+
+读取标注文件之前用 ``LabelFileWriter.wait(filename)`` 等待该文件写完。
+"""
+
+import collections
+import copy
+import os.path as osp
+import threading
+from typing import Callable
+from typing import Optional
+
+import numpy as np
+from qtpy import QtCore
+
+from labelme.dlcv.label_file import LabelFile
+from labelme.dlcv.mask_codec import MASK_ENCODING_PNG
+from labelme.dlcv.mask_codec import encode_mask
+from labelme.logger import logger
+
+
+def snapshot_shape(shape) -> dict:
+    """
+    复制图形保存所需的数据，格式与 json 中的 shape 一致，只是 mask 仍为 uint8 数组；
+    从文件读取后没有用过的 mask 保持为 LazyMask，不解码
+
+    在 GUI 线程调用，之后画布上的修改不会影响快照
+    """
+    data = copy.deepcopy(shape.other_data)
+    mask = shape.raw_mask
+    if isinstance(mask, np.ndarray):
+        mask = mask.astype(np.uint8)
+    data.update(
+        dict(
+            label=shape.label,
+            points=[(p.x(), p.y()) for p in shape.points],
+            group_id=shape.group_id,
+            description=shape.description,
+            shape_type=shape.shape_type,
+            flags=copy.deepcopy(shape.flags),
+            mask=mask,
+        )
+    )
+    # 如果是旋转框，保存direction属性
+    if shape.shape_type == "rotation":
+        data["direction"] = shape.direction
+    return data
+
+
+def write_label_file(
+    filename: str, shapes, mask_encoding: str = MASK_ENCODING_PNG, **kwargs
+):
+    """在写线程中编码 mask 并保存，kwargs 同 ``LabelFile.save``"""
+    shapes = [
+        dict(
+            shape,
+            mask=None
+            if shape.get("mask") is None
+            else encode_mask(shape["mask"], mask_encoding),
+        )
+        for shape in shapes
+    ]
+    LabelFile().save(filename=filename, shapes=shapes, **kwargs)
+
+
+class LabelFileWriter(QtCore.QObject):
+    """单线程按提交顺序写标注文件，同一文件尚未开始的写入会被新的提交替换"""
+
+    # 写入失败：(文件路径, 错误信息)
+    sig_save_failed = QtCore.Signal(str, str)
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        # 规范化路径 -> (文件路径, 写入函数)，按提交顺序排列
+        self._pending = collections.OrderedDict()
+        self._running: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @staticmethod
+    def _key(filename: str) -> str:
+        return osp.normcase(osp.abspath(filename))
+
+    def submit(self, filename: str, job: Callable[[], None]):
+        key = self._key(filename)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("LabelFileWriter is shut down")
+            # 替换尚未开始的同一文件的写入，新的写入排在最后
+            self._pending.pop(key, None)
+            self._pending[key] = (filename, job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def is_pending(self, filename: str) -> bool:
+        """该文件是否还有未写完的保存"""
+        key = self._key(filename)
+        with self._cond:
+            return key in self._pending or self._running == key
+
+    def wait(self, filename: Optional[str] = None):
+        """等待指定文件（不指定时为全部文件）写完"""
+        key = None if filename is None else self._key(filename)
+        with self._cond:
+            while (
+                (self._pending or self._running is not None)
+                if key is None
+                else (key in self._pending or self._running == key)
+            ):
+                self._cond.wait()
+
+    def shutdown(self):
+        """写完所有排队的文件后停止写线程"""
+        self.wait()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                key, (filename, job) = self._pending.popitem(last=False)
+                self._running = key
+
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"Failed to save label file {filename!r}: {e}")
+                self.sig_save_failed.emit(filename, str(e))
+            finally:
+                with self._cond:
+                    self._running = None
+                    self._cond.notify_all()
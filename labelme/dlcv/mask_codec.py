@@ -0,0 +1,160 @@
+"""标注文件中 mask 的编码。
+
+原来 json 中的 mask 只有一种格式：base64 编码的 PNG 字符串。``LabelFile.load`` 读文件时
+就把每个 mask 解码成数组（base64 -> PNG -> PIL -> numpy），mask 多的文件打开很慢。
+
+这里增加 COCO RLE 格式，保存时可选：
+
+    {"size": [高, 宽], "counts": "压缩后的游程字符串"}
+
+游程按列优先（Fortran 顺序）统计，第一段是 0 的个数；``counts`` 的压缩方式与
+pycocotools 的 ``mask.encode`` 相同，可以直接用 ``pycocotools.mask.decode`` 读取。
+读取时也接受非压缩的整数列表。游程统计与解码都是向量化的 numpy 运算，不经过 PNG。
+
+读取时两种格式都支持，并用 ``LazyMask`` 延迟解码：只有在图形绘制或编辑、
+第一次访问 ``Shape.mask`` 时才解码；没有动过的 mask 保存时直接写回原来的编码。
+"""
+
+from typing import Union
+
+import numpy as np
+
+from labelme import utils
+
+MASK_ENCODING_PNG = "png"
+MASK_ENCODING_RLE = "rle"
+MASK_ENCODINGS = [MASK_ENCODING_PNG, MASK_ENCODING_RLE]
+
+
+def mask_encoding_of(data) -> str:
+    """json 中 mask 数据的编码格式"""
+    if isinstance(data, dict):
+        return MASK_ENCODING_RLE
+    return MASK_ENCODING_PNG
+
+
+def _counts_to_string(counts: np.ndarray) -> str:
+    """游程 -> COCO 压缩字符串（与 pycocotools 的 rleToString 相同）"""
+    deltas = counts.astype(np.int64)
+    # 从第 4 段起存与前面第二段（同为 0 或同为 1）的差值
+    deltas[3:] -= counts[1:-2]
+    chars = []
+    for x in deltas.tolist():
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            if more:
+                c |= 0x20
+            chars.append(c + 48)
+    return bytes(chars).decode("ascii")
+
+
+def _string_to_counts(text: str) -> np.ndarray:
+    """COCO 压缩字符串 -> 游程，向量化实现"""
+    chars = np.frombuffer(text.encode("ascii"), dtype=np.uint8).astype(np.int64) - 48
+    if chars.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    # 每个数值占若干字符，最后一个字符没有 0x20 标志位
+    ends = np.flatnonzero((chars & 0x20) == 0)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    shift = 5 * (np.arange(chars.size) - np.repeat(starts, lengths))
+    values = np.add.reduceat((chars & 0x1F) << shift, starts)
+    # 符号扩展
+    negative = (chars[ends] & 0x10) != 0
+    values[negative] -= np.left_shift(1, 5 * lengths[negative])
+    # 还原差值：偶数段、奇数段分别从第 3、第 2 段开始累加
+    counts = values.copy()
+    counts[2::2] = np.cumsum(values[2::2])
+    counts[1::2] = np.cumsum(values[1::2])
+    return counts
+
+
+def rle_encode(mask: np.ndarray) -> dict:
+    """bool 数组 -> COCO 压缩 RLE"""
+    mask = np.asarray(mask)
+    height, width = mask.shape[:2]
+    flat = mask.ravel(order="F") != 0
+    if flat.size == 0:
+        counts = np.zeros(0, dtype=np.int64)
+    else:
+        change = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+        counts = np.diff(np.concatenate(([0], change, [flat.size])))
+        if flat[0]:
+            # 第一段固定为 0 的个数
+            counts = np.concatenate(([0], counts))
+    return {"size": [int(height), int(width)], "counts": _counts_to_string(counts)}
+
+
+def rle_decode(rle: dict) -> np.ndarray:
+    """COCO RLE（压缩字符串或非压缩的整数列表）-> bool 数组"""
+    height, width = (int(v) for v in rle["size"])
+    counts = rle["counts"]
+    if isinstance(counts, str):
+        counts = _string_to_counts(counts)
+    else:
+        counts = np.asarray(counts, dtype=np.int64)
+    if counts.sum() != height * width or (counts < 0).any():
+        raise ValueError(
+            f"RLE counts do not match mask size {height}x{width}: {counts.sum()}"
+        )
+    values = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    return np.repeat(values, counts).reshape((height, width), order="F")
+
+
+def encode_mask(mask, encoding: str = MASK_ENCODING_PNG) -> Union[str, dict]:
+    """
+    编码 mask 用于写入 json
+
+    :param mask: 数组或 ``LazyMask``；格式相同的 ``LazyMask`` 直接返回原来的编码
+    :param encoding: ``MASK_ENCODING_PNG`` 或 ``MASK_ENCODING_RLE``
+    """
+    if isinstance(mask, LazyMask):
+        if mask.encoding == encoding:
+            return mask.data
+        mask = mask.decode()
+    if encoding == MASK_ENCODING_RLE:
+        return rle_encode(mask)
+    if encoding == MASK_ENCODING_PNG:
+        return utils.img_arr_to_b64(np.asarray(mask).astype(np.uint8))
+    raise ValueError(f"Unknown mask encoding: {encoding}")
+
+
+def decode_mask(data) -> np.ndarray:
+    """json 中的 mask（两种格式均可）-> bool 数组"""
+    if mask_encoding_of(data) == MASK_ENCODING_RLE:
+        return rle_decode(data)
+    return utils.img_b64_to_arr(data).astype(bool)
+
+
+class LazyMask:
+    """
+    尚未解码的 mask，保存 json 中的原始数据
+
+    对象不可变，复制（撤销快照、``Shape.copy``）时共用同一个对象
+    """
+
+    __slots__ = ("data", "encoding")
+
+    def __init__(self, data):
+        self.data = data
+        self.encoding = mask_encoding_of(data)
+
+    def decode(self) -> np.ndarray:
+        return decode_mask(self.data)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.decode()
+        return array if dtype is None else array.astype(dtype)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"LazyMask({self.encoding})"
@@ -0,0 +1,205 @@
+"""紧凑的有序路径表。
+
+文件树里的图片路径原来用 ``OrderedSet[str]`` 保存，每个文件都是一个 Python
+字符串对象外加哈希表槽位，十万级文件时内存和构建时间都很可观。
+``PathTable`` 把路径拆成"目录前缀 id + 文件名字节"存进连续数组，
+并用排好序的哈希数组做路径 -> 行号查找，对外保持与 ``OrderedSet``
+一致的常用接口（``index`` / ``in`` / 下标 / 迭代 / ``len`` / ``add``）。
+"""
+
+from array import array
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import numpy as np
+
+# 文件名里可能含有无法解码的字节（surrogateescape），用 surrogatepass 保证可逆
+_ENCODING_ERRORS = "surrogatepass"
+
+
+class PathTable:
+    """有序、去重的路径表，行号即插入顺序。"""
+
+    def __init__(self, paths: Optional[Iterable[str]] = None):
+        self._dirs: List[str] = []  # 目录前缀（含结尾的 /）
+        self._dir_ids = {}  # 目录前缀 -> id
+        self._dir_of = array("I")  # 每行所属目录 id
+        self._names = bytearray()  # 所有文件名的 utf-8 字节拼接
+        self._name_offsets = array("Q", [0])  # 第 i 行文件名为 _names[off[i]:off[i+1]]
+        self._hashes = array("q")  # 每行完整路径的 hash
+
+        # 查找索引：前 _indexed 行的哈希已排序，其余行线性扫描
+        self._indexed = 0
+        self._sorted_hashes = None
+        self._sorted_rows = None
+
+        if paths is not None:
+            for path in paths:
+                self.add(path)
+
+    # region 写入
+    def _append(self, path: str) -> int:
+        prefix, _, name = path.rpartition("/")
+        if _:
+            prefix += "/"
+        dir_id = self._dir_ids.get(prefix)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(prefix)
+            self._dir_ids[prefix] = dir_id
+
+        self._dir_of.append(dir_id)
+        self._names += name.encode("utf-8", _ENCODING_ERRORS)
+        self._name_offsets.append(len(self._names))
+        self._hashes.append(hash(path))
+        return len(self._dir_of) - 1
+
+    def add(self, path: str) -> int:
+        """追加路径并返回行号；已存在时返回原行号。"""
+        row = self._find(path)
+        if row >= 0:
+            return row
+        return self._append(path)
+
+    def extend(self, paths: Iterable[str]) -> range:
+        """批量追加调用方保证不重复的路径（如同一目录首次扫描的结果），返回新增的行号范围。"""
+        start = len(self)
+        for path in paths:
+            self._append(path)
+        return range(start, len(self))
+
+    def remove_rows(self, rows: Iterable[int]) -> np.ndarray:
+        """删除若干行，返回旧行号到新行号的映射数组（被删除的行映射为 -1）。"""
+        n = len(self)
+        keep = np.ones(n, dtype=bool)
+        keep[np.fromiter(rows, dtype=np.int64)] = False
+        mapping = np.full(n, -1, dtype=np.int64)
+        mapping[keep] = np.arange(int(keep.sum()), dtype=np.int64)
+
+        paths = [self[i] for i in np.flatnonzero(keep)]
+        self.clear()
+        self.extend(paths)
+        return mapping
+
+    def replace_rows(self, rows: Iterable[int], paths: List[str]):
+        """把升序的 rows 各行依次替换为 paths（目录扫描完成后重新排序时使用）。"""
+        rows = [int(r) for r in rows]
+        if not rows:
+            return
+        start, stop = rows[0], rows[-1] + 1
+        if stop - start == len(rows):
+            # 连续区间（通常就是表尾）：只重写该区间及其后的行
+            tail = [self[i] for i in range(stop, len(self))]
+            self.truncate(start)
+            self.extend(paths)
+            self.extend(tail)
+        else:
+            all_paths = list(self)
+            for row, path in zip(rows, paths):
+                all_paths[row] = path
+            self.clear()
+            self.extend(all_paths)
+
+    def truncate(self, n: int):
+        """只保留前 n 行。"""
+        if n >= len(self):
+            return
+        self._names = self._names[: self._name_offsets[n]]
+        self._dir_of = self._dir_of[:n]
+        self._name_offsets = self._name_offsets[: n + 1]
+        self._hashes = self._hashes[:n]
+        if self._indexed > n:
+            self._indexed = 0
+            self._sorted_hashes = None
+            self._sorted_rows = None
+
+    def clear(self):
+        self._dirs.clear()
+        self._dir_ids.clear()
+        self._dir_of = array("I")
+        self._names = bytearray()
+        self._name_offsets = array("Q", [0])
+        self._hashes = array("q")
+        self._indexed = 0
+        self._sorted_hashes = None
+        self._sorted_rows = None
+
+    # endregion
+
+    # region 读取
+    def name(self, row: int) -> str:
+        """第 row 行的文件名（不含目录）。"""
+        off = self._name_offsets
+        return self._names[off[row] : off[row + 1]].decode("utf-8", _ENCODING_ERRORS)
+
+    def dir_id(self, row: int) -> int:
+        return self._dir_of[row]
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        return self._dirs[self._dir_of[row]] + self.name(row)
+
+    def __len__(self) -> int:
+        return len(self._dir_of)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def __contains__(self, path) -> bool:
+        return isinstance(path, str) and self._find(path) >= 0
+
+    def index(self, path: str) -> int:
+        """路径对应的行号，不存在时抛出 KeyError（与 OrderedSet 一致）。"""
+        row = self._find(path)
+        if row < 0:
+            raise KeyError(path)
+        return row
+
+    def get(self, path: str, default: int = -1) -> int:
+        row = self._find(path)
+        return default if row < 0 else row
+
+    # endregion
+
+    # region 查找索引
+    def _rebuild_index(self):
+        hashes = np.array(self._hashes, dtype=np.int64)
+        order = np.argsort(hashes, kind="stable")
+        self._sorted_hashes = hashes[order]
+        self._sorted_rows = order
+        self._indexed = len(hashes)
+
+    def _find(self, path: str) -> int:
+        n = len(self)
+        tail = n - self._indexed
+        if tail > 1024 and tail > self._indexed // 8:
+            self._rebuild_index()
+            tail = 0
+
+        h = hash(path)
+        if self._sorted_hashes is not None:
+            lo = int(np.searchsorted(self._sorted_hashes, h, side="left"))
+            hi = int(np.searchsorted(self._sorted_hashes, h, side="right"))
+            for i in range(lo, hi):
+                row = int(self._sorted_rows[i])
+                if self[row] == path:
+                    return row
+
+        if tail:
+            tail_hashes = np.frombuffer(
+                self._hashes, dtype=np.int64, offset=self._indexed * 8
+            )
+            candidates = np.flatnonzero(tail_hashes == h)
+            del tail_hashes  # 释放 buffer 引用，否则 array 无法继续 append
+            for i in candidates:
+                row = self._indexed + int(i)
+                if self[row] == path:
+                    return row
+        return -1
+
+    # endregion
@@ -3,6 +3,7 @@ from typing import List
 import math
 
 from labelme.dlcv.store import STORE
+from labelme.dlcv.mask_codec import LazyMask
 from labelme.shape import *
 
 
@@ -69,6 +70,11 @@ class ShapeType:
 class Shape(Shape):
     points: List[QtCore.QPointF]
 
+    # 点被修改时递增，外接矩形 / 中心点 / 标签绘制点缓存据此失效
+    _geometry_version = 0
+    # (points 列表, 版本, 点数, shape_type, 外接矩形, {中心点 / 各标签位置的绘制点})
+    _cache_label_geometry = None
+
     def __init__(
         self,
         label=None,
@@ -117,10 +123,70 @@ class Shape(Shape):
 
             self.points.append(point)
             self.point_labels.append(label)
-
-    def paint(self, painter):
+            self._geometry_version += 1
+
+    # region 修改点的方法，同时使几何缓存失效
+    def popPoint(self):
+        self._geometry_version += 1
+        return super().popPoint()
+
+    def insertPoint(self, i, point, label=1):
+        super().insertPoint(i, point, label)
+        self._geometry_version += 1
+
+    def removePoint(self, i):
+        super().removePoint(i)
+        self._geometry_version += 1
+
+    def moveBy(self, offset):
+        super().moveBy(offset)
+        self._geometry_version += 1
+
+    def moveVertexBy(self, i, offset):
+        super().moveVertexBy(i, offset)
+        self._geometry_version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._geometry_version += 1
+
+    def mark_geometry_changed(self):
+        """直接修改 points 中的点（``points[i] = ...`` / ``setX`` 等）之后调用"""
+        self._geometry_version += 1
+
+    # endregion
+
+    # region mask 延迟解码
+    @property
+    def mask(self):
+        mask = self._mask
+        if isinstance(mask, LazyMask):
+            # 第一次使用时才解码（从标注文件读取的 mask 为 LazyMask）
+            mask = self._mask = mask.decode()
+        return mask
+
+    @mask.setter
+    def mask(self, value):
+        self._mask = value
+
+    @property
+    def raw_mask(self):
+        """不触发解码的 mask：数组、尚未解码的 LazyMask 或 None"""
+        return self._mask
+
+    # endregion
+
+    def paint(self, painter, draw_vertices=True, simplify=False, draw_label=True):
+        """
+        :param draw_vertices: 是否绘制顶点标记（画布缩小、图形很小时关闭）
+        :param simplify: 是否按屏幕像素合并相邻顶点绘制轮廓（顶点过密时开启）
+        :param draw_label: 是否绘制标签
+        """
         if self.mask is None and not self.points:
             return
+        if self.shape_type in (ShapeType.POINT, ShapeType.POINTS):
+            # 点标注的顶点就是图形本身
+            draw_vertices = True
 
         color = self.select_line_color if self.selected else self.line_color
         pen = QtGui.QPen(color)
@@ -129,34 +195,7 @@ class Shape(Shape):
         painter.setPen(pen)
 
         if self.mask is not None:
-            image_to_draw = np.zeros(self.mask.shape + (4,), dtype=np.uint8)
-            fill_color = (
-                self.select_fill_color.getRgb()
-                if self.selected
-                else self.fill_color.getRgb()
-            )
-            image_to_draw[self.mask] = fill_color
-            qimage = QtGui.QImage.fromData(labelme.utils.img_arr_to_data(image_to_draw))
-            qimage = qimage.scaled(
-                qimage.size() * self.scale,
-                QtCore.Qt.IgnoreAspectRatio,
-                QtCore.Qt.SmoothTransformation,
-            )
-
-            painter.drawImage(self._scale_point(point=self.points[0]), qimage)
-
-            line_path = QtGui.QPainterPath()
-            contours = skimage.measure.find_contours(np.pad(self.mask, pad_width=1))
-            for contour in contours:
-                contour += [self.points[0].y(), self.points[0].x()]
-                line_path.moveTo(
-                    self._scale_point(QtCore.QPointF(contour[0, 1], contour[0, 0]))
-                )
-                for point in contour[1:]:
-                    line_path.lineTo(
-                        self._scale_point(QtCore.QPointF(point[1], point[0]))
-                    )
-            painter.drawPath(line_path)
+            self._paint_mask(painter)
 
         if self.points:
             line_path = QtGui.QPainterPath()
@@ -172,7 +211,7 @@ class Shape(Shape):
                         self._scale_point(self.points[1]),
                     )
                     line_path.addRect(rectangle)
-                if self.shape_type == "rectangle":
+                if self.shape_type == "rectangle" and draw_vertices:
                     for i in range(len(self.points)):
                         self.drawVertex(vrtx_path, i)
             elif self.shape_type == "rotation":
@@ -186,8 +225,9 @@ class Shape(Shape):
                     line_path.lineTo(self._scale_point(self.points[i % 4]))
 
                 # 顶点
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
+                if draw_vertices:
+                    for i in range(len(self.points)):
+                        self.drawVertex(vrtx_path, i)
 
                 # 箭头
                 if getattr(STORE, 'canvas_display_rotation_arrow', True):
@@ -254,11 +294,12 @@ class Shape(Shape):
                 painter.setPen(pen)
             
                 # 显示Label（如果有）- 优化旋转框标签显示
-                if self.label and STORE.canvas_display_shape_label:
+                if self.label and draw_label and STORE.canvas_display_shape_label:
                     try:
                         # 之前没有对字体进行缩放， 现在对字体进行中心缩放
                         label = self.label
-                        center = self.get_label_paint_point()
+                        label_position = getattr(STORE, 'canvas_shape_label_position', 'center')
+                        center = self.get_label_paint_point(label_position)
                         scaled_center = self._scale_point(center)
             
                         # 设置粗体
@@ -276,7 +317,6 @@ class Shape(Shape):
                         bg_rect = QtCore.QRectF(scaled_center, scaled_center)
                         bg_rect.setWidth(text_width + padding * 2)
                         bg_rect.setHeight(text_height + padding * 2)
-                        label_position = getattr(STORE, 'canvas_shape_label_position', 'center')
                         if label_position == 'top_left':
                             bg_rect.moveTopLeft(scaled_center)
                         elif label_position == 'bottom_right':
@@ -307,13 +347,17 @@ class Shape(Shape):
                     line_path.addEllipse(
                         self._scale_point(self.points[0]), raidus, raidus
                     )
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
+                if draw_vertices:
+                    for i in range(len(self.points)):
+                        self.drawVertex(vrtx_path, i)
             elif self.shape_type == "linestrip":
-                line_path.moveTo(self._scale_point(self.points[0]))
-                for i, p in enumerate(self.points):
+                outline = self._simplified_points() if simplify else self.points
+                line_path.moveTo(self._scale_point(outline[0]))
+                for p in outline:
                     line_path.lineTo(self._scale_point(p))
-                    self.drawVertex(vrtx_path, i)
+                if draw_vertices:
+                    for i in range(len(self.points)):
+                        self.drawVertex(vrtx_path, i)
             elif self.shape_type == "points":
                 assert len(self.points) == len(self.point_labels)
                 for i, point_label in enumerate(self.point_labels):
@@ -335,15 +379,18 @@ class Shape(Shape):
                     # 绘制圆形（默认）
                     self.drawVertex(vrtx_path, 0)
             else:
-                line_path.moveTo(self._scale_point(self.points[0]))
+                outline = self._simplified_points() if simplify else self.points
+                line_path.moveTo(self._scale_point(outline[0]))
                 # Uncommenting the following line will draw 2 paths
                 # for the 1st vertex, and make it non-filled, which
                 # may be desirable.
                 # self.drawVertex(vrtx_path, 0)
 
-                for i, p in enumerate(self.points):
+                for p in outline:
                     line_path.lineTo(self._scale_point(p))
-                    self.drawVertex(vrtx_path, i)
+                if draw_vertices:
+                    for i in range(len(self.points)):
+                        self.drawVertex(vrtx_path, i)
                 if self.isClosed():
                     line_path.lineTo(self._scale_point(self.points[0]))
 
@@ -360,7 +407,7 @@ class Shape(Shape):
                 painter.drawPath(center_cross_path)
 
             # extra 显示顶点
-            if STORE.canvas_highlight_start_point:
+            if draw_vertices and STORE.canvas_highlight_start_point:
                 # 第一个顶点显示为红色，第二个顶点显示为蓝色，其他顶点使用原来的颜色
                 if len(self.points) >= 1:
                     # 绘制第一个顶点（红色）
@@ -390,7 +437,7 @@ class Shape(Shape):
                     painter.drawPath(other_vertices_path)
                     painter.fillPath(other_vertices_path, self._vertex_fill_color)
 
-            elif vrtx_path.length() > 0:
+            elif not vrtx_path.isEmpty():
                 painter.drawPath(vrtx_path)
                 painter.fillPath(vrtx_path, self._vertex_fill_color)
             # extra end
@@ -404,10 +451,12 @@ class Shape(Shape):
                 if (
                     ShapeType.can_display_label(self.shape_type)
                     and self.label
+                    and draw_label
                     and STORE.canvas_display_shape_label
                 ):
                     label = self.label
-                    center = self.get_label_paint_point()
+                    label_position = getattr(STORE, 'canvas_shape_label_position', 'center')
+                    center = self.get_label_paint_point(label_position)
                     scaled_center = self._scale_point(center)
 
                     # 设置粗体
@@ -425,7 +474,6 @@ class Shape(Shape):
                     bg_rect = QtCore.QRectF(scaled_center, scaled_center)
                     bg_rect.setWidth(text_width + padding * 2)
                     bg_rect.setHeight(text_height + padding * 2)
-                    label_position = getattr(STORE, 'canvas_shape_label_position', 'center')
                     if label_position == 'top_left':
                         bg_rect.moveTopLeft(scaled_center)
                     elif label_position == 'bottom_right':
@@ -452,12 +500,65 @@ class Shape(Shape):
 
     """额外函数"""
 
+    def _simplified_points(self, tolerance: float = 1.0) -> List[QtCore.QPointF]:
+        """按屏幕像素合并相邻顶点：落在同一个 tolerance 像素格子里的连续点只保留第一个"""
+        if len(self.points) < 3:
+            return self.points
+        polygon = QtGui.QPolygonF(self.points)
+        data = polygon.data()
+        data.setsize(len(self.points) * 2 * np.dtype(np.float64).itemsize)
+        xy = np.frombuffer(data, dtype=np.float64).reshape(-1, 2)
+        grid = np.floor(xy * (self.scale / tolerance))
+        keep = np.ones(len(xy), dtype=bool)
+        keep[1:] = (grid[1:] != grid[:-1]).any(axis=1)
+        keep[-1] = True
+        return [self.points[i] for i in np.flatnonzero(keep)]
+
     def clear_points(self):
         while self.points:
             self.points.pop()
+        self._geometry_version += 1
+
+    def _label_geometry(self):
+        """外接矩形与中心点 / 标签绘制点的缓存，点未修改时直接复用"""
+        cache = self._cache_label_geometry
+        if (
+            cache is None
+            or cache[0] is not self.points
+            or cache[1] != self._geometry_version
+            or cache[2] != len(self.points)
+            or cache[3] != self.shape_type
+        ):
+            bbox = None
+            if self.points:
+                xs = [p.x() for p in self.points]
+                ys = [p.y() for p in self.points]
+                bbox = (min(xs), min(ys), max(xs), max(ys))
+            cache = (
+                self.points,
+                self._geometry_version,
+                len(self.points),
+                self.shape_type,
+                bbox,
+                {},
+            )
+            self._cache_label_geometry = cache
+        return cache
+
+    def get_bounding_box(self):
+        """点的外接矩形 (x_min, y_min, x_max, y_max)，没有点时返回 None"""
+        return self._label_geometry()[4]
 
     # 获取中心点， 用于绘制标签
     def get_center_point(self) -> QtCore.QPointF:
+        points = self._label_geometry()[5]
+        # 标签位置以字符串为键，中心点用 None 作键
+        center = points.get(None)
+        if center is None:
+            center = points[None] = QtCore.QPointF(self._compute_center_point())
+        return QtCore.QPointF(center)
+
+    def _compute_center_point(self) -> QtCore.QPointF:
         if self.shape_type == ShapeType.RECTANGLE:
             center_x = (self.points[0].x() + self.points[1].x()) / 2
             center_y = (self.points[0].y() + self.points[1].y()) / 2
@@ -501,15 +602,23 @@ class Shape(Shape):
             return self.points[0]
 
     # 获取标签绘制点， 用于绘制标签
-    def get_label_paint_point(self) -> QtCore.QPointF:
-        position = getattr(STORE, 'canvas_shape_label_position', 'center')
+    def get_label_paint_point(self, position=None) -> QtCore.QPointF:
+        """:param position: 标签位置，默认读取 STORE.canvas_shape_label_position"""
+        if position is None:
+            position = getattr(STORE, 'canvas_shape_label_position', 'center')
+        points = self._label_geometry()[5]
+        point = points.get(position)
+        if point is None:
+            point = points[position] = QtCore.QPointF(
+                self._compute_label_paint_point(position)
+            )
+        return QtCore.QPointF(point)
 
+    def _compute_label_paint_point(self, position) -> QtCore.QPointF:
         # 计算形状的边界框
-        if self.points:
-            xs = [p.x() for p in self.points]
-            ys = [p.y() for p in self.points]
-            x_min, x_max = min(xs), max(xs)
-            y_min, y_max = min(ys), max(ys)
+        bbox = self.get_bounding_box()
+        if bbox is not None:
+            x_min, y_min, x_max, y_max = bbox
         else:
             return self.get_center_point()
 
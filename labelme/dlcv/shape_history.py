@@ -0,0 +1,301 @@
+"""画布撤销历史。
+
+原来的 ``Canvas.storeShapes`` 每次编辑后对全部 ``Shape`` 做 ``copy.deepcopy``，
+几千个多边形的图片上拖动一个顶点也要复制全部图形，撤销栈越长内存越大。
+
+这里的快照采用结构共享：
+
+- 快照只是"冻结图形"的元组，未修改的图形在相邻快照之间共用同一个冻结对象
+- 每个图形记录冻结时的属性字典：点列表与 mask 记录对象本身（原地修改点时
+  ``_geometry_version`` 会变化），其余属性记录冻结的副本；push 时与图形当前的
+  ``__dict__`` 直接比较，未修改的图形不用逐点、逐像素比较
+- 修改过的图形按属性比较，只复制变化的属性（points / mask / flags ...），
+  其余属性仍引用上一版本的对象，所以一次编辑只记录了增删改的那部分
+- 按引用计数统计所有快照实际占用的内存，超过上限时丢弃最早的快照
+
+冻结对象不会被修改：撤销时 ``thaw`` 只复制被撤销的编辑涉及的图形。
+"""
+
+import copy
+import sys
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+from qtpy import QtCore
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 每个 QPointF 的 Python 包装对象大致占用的字节数
+_POINT_BYTES = 72
+
+# 按对象比较的大属性：点列表随 _geometry_version 变化，mask 只会被整体替换
+_GEOMETRY_ATTRS = ("points", "point_labels")
+_MASK_ATTR = "_mask"
+
+
+def _tracked_state(shape) -> dict:
+    """图形需要记录的属性；``_cache_`` 开头的是可重建的绘制缓存，不记录"""
+    return {
+        name: value
+        for name, value in shape.__dict__.items()
+        if not name.startswith("_cache_")
+    }
+
+
+def _probe(shape, frozen) -> dict:
+    """
+    下次 push 时判断 shape 是否修改过用的字典，与 ``shape.__dict__`` 直接比较：
+    点列表与 mask 为对象本身（比较时只比较引用），其余属性为冻结的副本
+    """
+    probe = dict(shape.__dict__)
+    frozen_state = frozen.__dict__
+    for name in probe.keys() - {_MASK_ATTR, *_GEOMETRY_ATTRS}:
+        if name in frozen_state:
+            probe[name] = frozen_state[name]
+    return probe
+
+
+def _unchanged(shape, probe: Optional[dict]) -> bool:
+    if probe is None:
+        return False
+    try:
+        return shape.__dict__ == probe
+    except Exception:
+        # 替换过的 numpy 数组无法直接比较，交给 _freeze 逐个属性处理
+        return False
+
+
+def _unchanged_attrs(shape, probe: Optional[dict]) -> set:
+    """与上次冻结时是同一对象、不需要再比较内容的大属性"""
+    if probe is None:
+        return set()
+    state = shape.__dict__
+    unchanged = set()
+    if state.get("_geometry_version") == probe.get("_geometry_version") and all(
+        state.get(name) is probe.get(name) for name in _GEOMETRY_ATTRS
+    ):
+        unchanged.update(_GEOMETRY_ATTRS)
+    if state.get(_MASK_ATTR) is probe.get(_MASK_ATTR):
+        unchanged.add(_MASK_ATTR)
+    return unchanged
+
+
+def _value_equal(a, b) -> bool:
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        if not (isinstance(a, np.ndarray) and isinstance(b, np.ndarray)):
+            return False
+        return a.shape == b.shape and a.dtype == b.dtype and np.array_equal(a, b)
+    if type(a) is not type(b):
+        return False
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def _copy_value(value):
+    """复制属性值；点列表与数组单独处理，比 deepcopy 快得多"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, list) and all(isinstance(p, QtCore.QPointF) for p in value):
+        return [QtCore.QPointF(p) for p in value]
+    return copy.deepcopy(value)
+
+
+def _value_bytes(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, list):
+        return sys.getsizeof(value) + len(value) * _POINT_BYTES
+    return sys.getsizeof(value)
+
+
+class ShapeHistory:
+    """
+    撤销快照栈，接口与原来的 ``shapesBackups`` 列表保持一致：
+    ``len()`` / ``[-1][index]`` / ``pop()`` / ``clear()``
+    """
+
+    def __init__(self, max_snapshots: int = 10, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_snapshots = max_snapshots
+        self._max_bytes = max(0, int(max_bytes))
+        self._snapshots: List[tuple] = []
+        # id(画布上的图形) -> 最近一次快照中对应的冻结图形
+        self._frozen_of = {}
+        # id(画布上的图形) -> 最近一次冻结时的 _probe()
+        self._probe_of = {}
+        # 引用计数：id(冻结图形) -> [冻结图形, 引用数]，
+        # id(属性值) -> [属性值, 引用数, 字节数]
+        self._shape_refs = {}
+        self._value_refs = {}
+        self._total_bytes = 0
+
+    # region 列表接口
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __getitem__(self, index):
+        return self._snapshots[index]
+
+    def pop(self, index=-1) -> List:
+        snapshot = self._snapshots.pop(index)
+        self._release(snapshot)
+        return list(snapshot)
+
+    def clear(self):
+        self._snapshots = []
+        self._frozen_of = {}
+        self._probe_of = {}
+        self._shape_refs = {}
+        self._value_refs = {}
+        self._total_bytes = 0
+
+    # endregion
+
+    @property
+    def total_bytes(self) -> int:
+        """所有快照去重后占用的内存估算值"""
+        return self._total_bytes
+
+    def set_max_bytes(self, max_bytes: int):
+        self._max_bytes = max(0, int(max_bytes))
+        self._trim()
+
+    def push(self, shapes: Sequence):
+        """记录画布当前的全部图形（编辑完成后调用）"""
+        frozen_of = {}
+        probe_of = {}
+        snapshot = []
+        for shape in shapes:
+            frozen = self._frozen_of.get(id(shape))
+            probe = self._probe_of.get(id(shape))
+            if frozen is None or not _unchanged(shape, probe):
+                frozen = self._freeze(shape, frozen, probe)
+                probe = _probe(shape, frozen)
+            frozen_of[id(shape)] = frozen
+            probe_of[id(shape)] = probe
+            snapshot.append(frozen)
+        snapshot = tuple(snapshot)
+
+        self._frozen_of = frozen_of
+        self._probe_of = probe_of
+        self._snapshots.append(snapshot)
+        self._retain(snapshot)
+        self._trim()
+
+    def thaw(self, snapshot: Sequence, current: Sequence = ()) -> List:
+        """
+        把快照复制为可编辑的图形，撤销时作为画布的新图形
+
+        current 为画布上现有的图形：自上次快照以来没有修改、且在目标快照中
+        也没有变化的图形直接沿用，只有被撤销的编辑涉及的图形才需要复制
+        """
+        reusable = {}
+        for shape in current:
+            frozen = self._frozen_of.get(id(shape))
+            if frozen is None:
+                continue
+            probe = self._probe_of.get(id(shape))
+            if _unchanged(shape, probe) or self._freeze(shape, frozen, probe) is frozen:
+                reusable[id(frozen)] = shape
+
+        shapes = []
+        frozen_of = {}
+        probe_of = {}
+        for frozen in snapshot:
+            shape = reusable.pop(id(frozen), None)
+            if shape is None:
+                shape = object.__new__(type(frozen))
+                shape.__dict__.update(
+                    (name, _copy_value(value))
+                    for name, value in frozen.__dict__.items()
+                )
+            frozen_of[id(shape)] = frozen
+            probe_of[id(shape)] = _probe(shape, frozen)
+            shapes.append(shape)
+        self._frozen_of = frozen_of
+        self._probe_of = probe_of
+        return shapes
+
+    # region 冻结 / 引用计数
+    @staticmethod
+    def _freeze(shape, previous: Optional[object], probe: Optional[dict] = None):
+        """
+        生成 shape 的冻结版本：与 previous 相同的属性直接共用，
+        完全没有变化时返回 previous 本身
+
+        probe 为生成 previous 时记录的 ``_probe()``，点列表与 mask 仍是同一对象时
+        直接沿用，不再逐点、逐像素比较
+        """
+        state = _tracked_state(shape)
+        if previous is not None and type(previous) is type(shape):
+            previous_state = previous.__dict__
+            unchanged = _unchanged_attrs(shape, probe)
+        else:
+            previous_state = {}
+            unchanged = set()
+
+        def same(name, value):
+            return name in previous_state and (
+                name in unchanged or _value_equal(previous_state[name], value)
+            )
+
+        same_attrs = {name for name, value in state.items() if same(name, value)}
+        if previous_state and len(same_attrs) == len(state) == len(previous_state):
+            return previous
+
+        frozen_state = {}
+        for name, value in state.items():
+            if name in same_attrs:
+                frozen_state[name] = previous_state[name]
+            else:
+                frozen_state[name] = _copy_value(value)
+        frozen = object.__new__(type(shape))
+        frozen.__dict__.update(frozen_state)
+        return frozen
+
+    def _retain(self, snapshot):
+        for frozen in snapshot:
+            ref = self._shape_refs.get(id(frozen))
+            if ref is not None:
+                ref[1] += 1
+                continue
+            self._shape_refs[id(frozen)] = [frozen, 1]
+            for value in frozen.__dict__.values():
+                value_ref = self._value_refs.get(id(value))
+                if value_ref is not None:
+                    value_ref[1] += 1
+                    continue
+                size = _value_bytes(value)
+                self._value_refs[id(value)] = [value, 1, size]
+                self._total_bytes += size
+
+    def _release(self, snapshot):
+        for frozen in snapshot:
+            ref = self._shape_refs[id(frozen)]
+            ref[1] -= 1
+            if ref[1]:
+                continue
+            del self._shape_refs[id(frozen)]
+            for value in frozen.__dict__.values():
+                value_ref = self._value_refs[id(value)]
+                value_ref[1] -= 1
+                if not value_ref[1]:
+                    del self._value_refs[id(value)]
+                    self._total_bytes -= value_ref[2]
+
+    def _trim(self):
+        # 至少保留 当前 + 上一步 两个快照，保证最近一次编辑可以撤销
+        while len(self._snapshots) > 2 and (
+            len(self._snapshots) > self.max_snapshots + 1
+            or self._total_bytes > self._max_bytes
+        ):
+            self._release(self._snapshots.pop(0))
+
+    # endregion
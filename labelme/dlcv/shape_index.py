@@ -0,0 +1,192 @@
+"""画布图形的空间索引。
+
+编辑模式下鼠标悬停时，``Canvas.mouseMoveEvent`` 原来要对每个图形依次调用
+``nearestVertex`` / ``nearestEdge`` / ``containsPoint``，几千个多边形时明显跟不上鼠标。
+这里把图形外接矩形放进均匀网格，查询时只取鼠标附近网格里的图形，
+框选也用同一个索引筛选候选图形。
+
+索引按需重建：``invalidate()`` 之后（每次编辑保存撤销快照时调用）或
+``canvas.shapes`` 列表被替换、长度变化时，下一次查询会重新建立索引。
+拖动、键盘移动图形时不会保存快照，``refresh()`` 按图形的几何版本号
+（``Shape._geometry_version``）只重新登记位置变化了的图形。
+"""
+
+import math
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from qtpy import QtCore
+from qtpy import QtGui
+
+from labelme.dlcv.shape import ShapeType
+
+# 单个图形最多登记的网格数，更大的图形放进 _large 列表，每次查询都作为候选
+_MAX_CELLS_PER_SHAPE = 256
+# 网格边长下限（像素）
+_MIN_CELL_SIZE = 16.0
+
+
+def shape_bounds(shape) -> Optional[Tuple[float, float, float, float]]:
+    """图形在图片坐标系下的外接矩形 (x1, y1, x2, y2)，没有点时返回 None"""
+    points = shape.points
+    if not points:
+        return None
+    if shape.shape_type == ShapeType.CIRCLE and len(points) == 2:
+        center = points[0]
+        radius = math.hypot(points[1].x() - center.x(), points[1].y() - center.y())
+        return (
+            center.x() - radius,
+            center.y() - radius,
+            center.x() + radius,
+            center.y() + radius,
+        )
+    rect = QtGui.QPolygonF(points).boundingRect()
+    return rect.left(), rect.top(), rect.right(), rect.bottom()
+
+
+class ShapeGridIndex:
+    """图形外接矩形的均匀网格索引，查询结果按图形在列表中的顺序返回"""
+
+    def __init__(self):
+        self._shapes_list = None  # 建立索引时的 canvas.shapes 列表对象
+        self._shapes_len = -1
+        self._shapes: List = []
+        self._bounds: List[Tuple[float, float, float, float]] = []
+        self._versions: List[int] = []  # 登记时的几何版本号
+        self._positions: Dict[int, int] = {}  # id(shape) -> 在 _shapes 中的位置
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._large: List[int] = []
+        self._cell_size = _MIN_CELL_SIZE
+
+    def invalidate(self):
+        self._shapes_list = None
+
+    def _ensure(self, shapes: List):
+        if shapes is self._shapes_list and len(shapes) == self._shapes_len:
+            return
+        self._build(shapes)
+
+    def _build(self, shapes: List):
+        self._shapes_list = shapes
+        self._shapes_len = len(shapes)
+        self._shapes = []
+        self._bounds = []
+        self._versions = []
+        self._positions = {}
+        self._cells = {}
+        self._large = []
+
+        for shape in shapes:
+            if shape is None:
+                continue
+            bounds = shape_bounds(shape)
+            if bounds is None:
+                continue
+            self._positions[id(shape)] = len(self._shapes)
+            self._shapes.append(shape)
+            self._bounds.append(bounds)
+            self._versions.append(getattr(shape, "_geometry_version", 0))
+        if not self._shapes:
+            return
+
+        # 网格边长取图形平均尺寸，使每个图形大致只落在少数几个网格里
+        mean_size = sum(max(x2 - x1, y2 - y1) for x1, y1, x2, y2 in self._bounds) / len(
+            self._bounds
+        )
+        self._cell_size = max(_MIN_CELL_SIZE, mean_size)
+
+        for i in range(len(self._shapes)):
+            self._register(i)
+
+    def _cell_range(self, i: int):
+        x1, y1, x2, y2 = self._bounds[i]
+        cell = self._cell_size
+        return int(x1 // cell), int(y1 // cell), int(x2 // cell), int(y2 // cell)
+
+    def _register(self, i: int):
+        cx1, cy1, cx2, cy2 = self._cell_range(i)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > _MAX_CELLS_PER_SHAPE:
+            self._large.append(i)
+            return
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                self._cells.setdefault((cx, cy), []).append(i)
+
+    def _unregister(self, i: int):
+        cx1, cy1, cx2, cy2 = self._cell_range(i)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > _MAX_CELLS_PER_SHAPE:
+            self._large.remove(i)
+            return
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                indices = self._cells[(cx, cy)]
+                indices.remove(i)
+                if not indices:
+                    del self._cells[(cx, cy)]
+
+    def refresh(self, shapes: List, changed_shapes):
+        """
+        重新登记 changed_shapes 中几何版本号变化了的图形
+
+        索引需要重建时不做任何事，下一次查询会整体重建
+        """
+        if shapes is not self._shapes_list or len(shapes) != self._shapes_len:
+            return
+        for shape in changed_shapes:
+            i = self._positions.get(id(shape))
+            if i is None or self._shapes[i] is not shape:
+                continue
+            version = getattr(shape, "_geometry_version", 0)
+            if version == self._versions[i]:
+                continue
+            bounds = shape_bounds(shape)
+            if bounds is None:
+                # 点被清空，等下一次重建时移出索引
+                continue
+            self._unregister(i)
+            self._bounds[i] = bounds
+            self._versions[i] = version
+            self._register(i)
+
+    def query(self, shapes: List, x1: float, y1: float, x2: float, y2: float) -> List:
+        """外接矩形与 (x1, y1, x2, y2) 相交的图形，按 shapes 中的顺序返回"""
+        return [shape for shape, _ in self.query_items(shapes, x1, y1, x2, y2)]
+
+    def query_items(
+        self, shapes: List, x1: float, y1: float, x2: float, y2: float
+    ) -> List[Tuple[object, Tuple[float, float, float, float]]]:
+        """同 query，同时返回每个图形的外接矩形"""
+        self._ensure(shapes)
+        if not self._shapes:
+            return []
+
+        cell = self._cell_size
+        cx1, cy1 = int(x1 // cell), int(y1 // cell)
+        cx2, cy2 = int(x2 // cell), int(y2 // cell)
+        candidates = set(self._large)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self._cells):
+            # 查询范围比索引本身还大（例如框选整张图），直接遍历已有网格
+            for (cx, cy), indices in self._cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    candidates.update(indices)
+        else:
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    indices = self._cells.get((cx, cy))
+                    if indices:
+                        candidates.update(indices)
+
+        result = []
+        for i in sorted(candidates):
+            bounds = self._bounds[i]
+            bx1, by1, bx2, by2 = bounds
+            if bx1 <= x2 and x1 <= bx2 and by1 <= y2 and y1 <= by2:
+                result.append((self._shapes[i], bounds))
+        return result
+
+    def query_point(self, shapes: List, point: QtCore.QPointF, radius: float) -> List:
+        """距离 point 不超过 radius 的外接矩形所属图形"""
+        x, y = point.x(), point.y()
+        return self.query(shapes, x - radius, y - radius, x + radius, y + radius)
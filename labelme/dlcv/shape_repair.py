@@ -0,0 +1,264 @@
+"""不依赖 Qt 的标注修复工具。
+
+``MainWindow.fix_shape`` 的裁剪与多边形修复逻辑放在这里（``fix_points``），
+这样无界面的批量自动标注也能对纯坐标列表做同样的处理。
+"""
+
+import threading
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import cv2
+import numpy as np
+import shapely
+from shapely import Polygon
+from shapely.validation import explain_validity
+
+from labelme.dlcv.shape import ShapeType
+
+# 与 MainWindow.max_x_width / max_y_height 一致：坐标最大值比图片宽高小 0.001
+_EDGE_EPSILON = 0.001
+
+
+def select_valid_polygon(geometry):
+    """从 make_valid 的结果中挑出面积最大的合法多边形，没有时返回 None"""
+    if geometry is None or geometry.is_empty:
+        return None
+
+    geometry_type = getattr(geometry, "geom_type", "")
+    if geometry_type == "Polygon":
+        candidate_polygons = [geometry]
+    elif geometry_type == "MultiPolygon":
+        candidate_polygons = list(geometry.geoms)
+    else:
+        candidate_polygons = []
+        for child in getattr(geometry, "geoms", []):
+            polygon = select_valid_polygon(child)
+            if polygon is not None:
+                candidate_polygons.append(polygon)
+
+    valid_polygons = []
+    for polygon in candidate_polygons:
+        if polygon.is_empty:
+            continue
+        if not polygon.is_valid:
+            continue
+        if polygon.area <= 0:
+            continue
+        if len(polygon.exterior.coords) < 4:
+            continue
+        valid_polygons.append(polygon)
+
+    if not valid_polygons:
+        return None
+    return max(valid_polygons, key=lambda item: item.area)
+
+
+def polygons_valid(points_list) -> np.ndarray:
+    """
+    批量判断多边形是否合法，结果与逐个 ``Polygon(points).is_valid`` 一致
+
+    :param points_list: 每个多边形的 (N, 2) 坐标，N >= 3
+    :return: bool 数组
+    """
+    if not len(points_list):
+        return np.zeros(0, dtype=bool)
+    try:
+        coords = np.concatenate(
+            [
+                np.asarray(points, dtype=np.float64).reshape(-1, 2)
+                for points in points_list
+            ]
+        )
+        indices = np.repeat(
+            np.arange(len(points_list)), [len(points) for points in points_list]
+        )
+        polygons = shapely.polygons(shapely.linearrings(coords, indices=indices))
+        return shapely.is_valid(polygons)
+    except (ValueError, shapely.errors.GEOSException):
+        # 首尾重复导致坐标不足等情况，退回逐个构造
+        valid = np.zeros(len(points_list), dtype=bool)
+        for i, points in enumerate(points_list):
+            try:
+                valid[i] = Polygon(points).is_valid
+            except Exception:
+                valid[i] = False
+        return valid
+
+
+def invalid_polygon_reason(points_pos) -> Optional[str]:
+    """多边形不合法的原因，合法时返回 None；点数不足或无法构造多边形也视为不合法"""
+    if len(points_pos) < 3:
+        return f"polygon points < 3 ({len(points_pos)})"
+    try:
+        polygon = Polygon(points_pos)
+        if polygon.is_valid:
+            return None
+        return explain_validity(polygon)
+    except Exception as e:
+        return str(e)
+
+
+class PolygonValidityCache:
+    """
+    画布多边形合法性的增量检查
+
+    每个多边形记录上次检查时的 points 列表、几何版本号（``Shape._geometry_version``）
+    与点数，三者都没变的直接沿用上次结果；其余多边形作为一批交给 ``polygons_valid``
+    向量化判断，只有不合法的才逐个 ``explain_validity`` 取原因。
+    拖动一个图形后的检查只涉及这一个图形，而不是画布上的全部多边形。
+    """
+
+    def __init__(self):
+        # id(shape) -> (shape, points 列表, 几何版本, 点数, 不合法原因或 None)
+        self._entries = {}
+
+    def clear(self):
+        self._entries = {}
+
+    @staticmethod
+    def _is_current(entry, shape) -> bool:
+        return (
+            entry[0] is shape
+            and entry[1] is shape.points
+            and entry[2] == getattr(shape, "_geometry_version", 0)
+            and entry[3] == len(shape.points)
+        )
+
+    def check(self, shapes) -> List[Tuple[int, object, str]]:
+        """
+        :param shapes: 画布上的全部图形（非多边形会被跳过）
+        :return: 不合法多边形的 [(在 shapes 中的下标, shape, 原因)]
+        """
+        entries = {}
+        dirty = []
+        for shape in shapes:
+            if shape.shape_type != ShapeType.POLYGON:
+                continue
+            entry = self._entries.get(id(shape))
+            if entry is not None and self._is_current(entry, shape):
+                entries[id(shape)] = entry
+            else:
+                dirty.append(shape)
+
+        if dirty:
+            points_list = [[(p.x(), p.y()) for p in shape.points] for shape in dirty]
+            checkable = [i for i, points in enumerate(points_list) if len(points) >= 3]
+            valid = np.zeros(len(dirty), dtype=bool)
+            valid[checkable] = polygons_valid([points_list[i] for i in checkable])
+            for shape, points, is_valid in zip(dirty, points_list, valid):
+                reason = None if is_valid else invalid_polygon_reason(points)
+                entries[id(shape)] = (
+                    shape,
+                    shape.points,
+                    getattr(shape, "_geometry_version", 0),
+                    len(shape.points),
+                    reason,
+                )
+        self._entries = entries
+
+        return [
+            (index, shape, entries[id(shape)][4])
+            for index, shape in enumerate(shapes)
+            if shape.shape_type == ShapeType.POLYGON
+            and entries[id(shape)][4] is not None
+        ]
+
+
+# 每个线程一块可复用的栅格化缓冲区（批量自动标注会在线程池中调用修复）
+_scratch = threading.local()
+
+
+def _scratch_mask(height: int, width: int) -> np.ndarray:
+    """清零的 (height, width) uint8 缓冲区，按需增大后复用"""
+    size = height * width
+    buffer = getattr(_scratch, "buffer", None)
+    if buffer is None or buffer.size < size:
+        buffer = np.empty(size, dtype=np.uint8)
+        _scratch.buffer = buffer
+    mask = buffer[:size].reshape(height, width)
+    mask.fill(0)
+    return mask
+
+
+def repair_polygon_points_from_mask(points_pos, image_width: int, image_height: int):
+    """
+    把自相交等不合法的多边形栅格化后重新提取轮廓，失败时返回 None
+
+    只在多边形外接框（四周各留 1 像素空白，不超出图片）内栅格化，
+    得到的轮廓与在整张图片大小的 mask 上计算的结果相同。
+    """
+    if image_width <= 0 or image_height <= 0:
+        return None
+
+    polygon_points = np.rint(np.asarray(points_pos, dtype=np.float32)).astype(np.int32)
+    polygon_points[:, 0] = np.clip(polygon_points[:, 0], 0, image_width - 1)
+    polygon_points[:, 1] = np.clip(polygon_points[:, 1], 0, image_height - 1)
+
+    if len(np.unique(polygon_points, axis=0)) < 3:
+        return None
+
+    x0, y0 = np.maximum(polygon_points.min(axis=0) - 1, 0)
+    x1 = min(int(polygon_points[:, 0].max()) + 2, image_width)
+    y1 = min(int(polygon_points[:, 1].max()) + 2, image_height)
+    mask = _scratch_mask(y1 - y0, x1 - x0)
+    cv2.fillPoly(
+        mask, [polygon_points.reshape(-1, 1, 2)], 1, offset=(-int(x0), -int(y0))
+    )
+    if not mask.any():
+        return None
+
+    from labelme.ai._utils import compute_polygon_from_mask
+
+    repaired_points = compute_polygon_from_mask(
+        mask=mask.astype(bool),
+        offset=(y0, x0),
+        shape=(image_height, image_width),
+    )
+    if len(repaired_points) < 3:
+        return None
+    return repaired_points.tolist()
+
+
+def fix_points(
+    shape_type: str, points, image_width: int, image_height: int
+) -> Optional[List[List[float]]]:
+    """
+    裁剪越界的点并修复不合法多边形，``MainWindow.fix_shape`` 与批量自动标注共用
+
+    :param points: [[x, y], ...]
+    :return: 修复后的坐标；多边形无法修复时返回 None
+    """
+    max_x = image_width - _EDGE_EPSILON
+    max_y = image_height - _EDGE_EPSILON
+    points = [
+        [min(max(float(x), 0.0), max_x), min(max(float(y), 0.0), max_y)]
+        for x, y in points
+    ]
+
+    if shape_type != ShapeType.POLYGON:
+        return points
+
+    if len(points) < 3:
+        return None
+
+    polygon = Polygon(points)
+    if polygon.is_valid:
+        return points
+
+    repaired_points = repair_polygon_points_from_mask(points, image_width, image_height)
+    if repaired_points is not None:
+        repaired_polygon = Polygon(repaired_points)
+        if repaired_polygon.is_valid and repaired_polygon.area > 0:
+            return repaired_points
+
+    from shapely.validation import make_valid
+
+    max_polygon = select_valid_polygon(make_valid(polygon))
+    if max_polygon is None:
+        return None
+    points = [[x, y] for x, y in max_polygon.exterior.coords[:-1]]
+    if len(points) < 3 or not Polygon(points).is_valid:
+        return None
+    return points
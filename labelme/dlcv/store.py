@@ -87,10 +87,34 @@ class Store:
     def canvas_shape_center_cross_length(self) -> int:
         return self._param("other_setting", "shape_center_cross_length").value()
 
+    @property
+    def prefetch_count(self) -> int:
+        return self._param("other_setting", "prefetch_count").value()
+
+    @property
+    def prefetch_cache_bytes(self) -> int:
+        return self._param("other_setting", "prefetch_cache_mb").value() * 1024 * 1024
+
+    @property
+    def mask_encoding(self) -> str:
+        return self._param("other_setting", "mask_encoding").value()
+
+    @property
+    def json_compact(self) -> bool:
+        return self._param("other_setting", "json_compact").value()
+
+    @property
+    def json_point_decimals(self) -> int:
+        return self._param("other_setting", "json_point_decimals").value()
+
     @property
     def ai_polygon_simplify_epsilon(self):
         return self._param("label_setting", "ai_polygon_simplify_epsilon").value()
 
+    @property
+    def ai_precompute_count(self) -> int:
+        return self._param("label_setting", "ai_precompute_count").value()
+
     # ---------- 保留的 setter（有额外逻辑或反向同步） ----------
 
     def set_edit_label_name(self, edit_label: callable):
@@ -148,7 +148,7 @@ QLineEdit#fileSearch:focus {{
     border-color: {accent};
 }}
 
-QTreeWidget#fileTree {{
+QTreeView#fileTree {{
     background: #FFFFFF;
     border: 1px solid #E5E7EB;
     border-radius: 6px;
@@ -156,14 +156,14 @@ QTreeWidget#fileTree {{
     /* 让选中高亮覆盖整行（含 checkbox/缩进），避免“选中项右移”的观感 */
     show-decoration-selected: 1;
 }}
-QTreeWidget#fileTree::item {{
+QTreeView#fileTree::item {{
     /* 左侧文件列表：行距尽量贴近原版 */
     padding: 2px 6px;
     color: #111827;
 }}
-QTreeWidget#fileTree::item:selected,
-QTreeWidget#fileTree::item:selected:active,
-QTreeWidget#fileTree::item:selected:!active {{
+QTreeView#fileTree::item:selected,
+QTreeView#fileTree::item:selected:active,
+QTreeView#fileTree::item:selected:!active {{
     /* 选中态：跟随系统高亮，更接近原版表现 */
     background: palette(highlight);
     color: palette(highlighted-text);
@@ -173,14 +173,14 @@ QTreeWidget#fileTree::item:selected:!active {{
 }}
 
 /* 关键：缩进/分支区域由 branch 子控件绘制，选中时也一起涂底色，避免“选中行从文字处才开始变色” */
-QTreeWidget#fileTree::branch:selected,
-QTreeWidget#fileTree::branch:selected:active,
-QTreeWidget#fileTree::branch:selected:!active {{
+QTreeView#fileTree::branch:selected,
+QTreeView#fileTree::branch:selected:active,
+QTreeView#fileTree::branch:selected:!active {{
     background: palette(highlight);
 }}
 
 /* 固定 item view 里的复选框尺寸/边距，避免选中态导致文本视觉位移 */
-QTreeWidget#fileTree::indicator {{
+QTreeView#fileTree::indicator {{
     width: 14px;
     height: 14px;
     margin: 0px 6px 0px 2px;
@@ -190,11 +190,11 @@ QTreeWidget#fileTree::indicator {{
     background: #FFFFFF;
 }}
 
-QTreeWidget#fileTree::indicator:unchecked:hover {{
+QTreeView#fileTree::indicator:unchecked:hover {{
     border-color: {accent};
 }}
 
-QTreeWidget#fileTree::indicator:checked {{
+QTreeView#fileTree::indicator:checked {{
     /* 用资源里的 done.png 作为对勾，避免依赖平台默认绘制 */
     image: url(:/done.png);
 }}
@@ -2,6 +2,9 @@ import numpy as np
 import cv2
 
 from pyqttoast import Toast, ToastPreset, ToastPosition
+from qtpy import QtGui
+
+import labelme.utils
 
 Toast.setPosition(ToastPosition.TOP_MIDDLE)
 
@@ -30,6 +33,17 @@ def notification(title=None, text=None, preset: ToastPreset = ToastPreset.INFORM
     toast.show()
 
 
+def qimage_to_ai_input(image: QtGui.QImage) -> np.ndarray:
+    """
+    QImage 转为 AI 模型 set_image 的输入数组
+
+    画布和后台嵌入预计算都走这里，统一转成 RGB32，保证同一张图得到逐字节相同的数组，
+    否则嵌入缓存按内容哈希查找时会对不上
+    """
+    image = image.convertToFormat(QtGui.QImage.Format_RGB32)
+    return labelme.utils.img_qt_to_arr(image)
+
+
 def normalize_16b_gray_to_uint8(bgr_img: np.ndarray) -> np.ndarray:
     """
     归一化16位图像到8位显示
@@ -4,9 +4,9 @@ from openpyxl.styles.builtins import total
 from labelme.dlcv.shape import Shape
 from labelme.dlcv import dlcv_tr
 from labelme.utils.qt import newIcon
+from labelme.dlcv.label_stats import LabelStatsResult, LabelStatsWorker
 from collections import Counter
 import os
-import json
 
 
 class LabelCountDock(QtWidgets.QDockWidget):
@@ -41,6 +41,10 @@ class LabelCountDock(QtWidgets.QDockWidget):
 
         self.setWidget(main_widget)
 
+        # 后台统计文件夹
+        self._stats_worker = LabelStatsWorker()
+        self._stats_worker.sig_progress.connect(self._on_dir_stats_progress)
+
         # 按钮点击事件
         self.label_count_btn.clicked.connect(self.count_labels_in_dir)
 
@@ -48,6 +52,8 @@ class LabelCountDock(QtWidgets.QDockWidget):
     def count_labels_in_dir(self):
         """
         递归统计当前文件夹及所有子文件夹下json文件中的标签/文本标记数量，并在文本框中显示结果
+
+        统计在后台进行，结果随读取进度刷新；只重新读取上次统计之后有变化的文件
         """
         # 假设parent有lastOpenDir属性
         parent = self.parent()
@@ -57,38 +63,27 @@ class LabelCountDock(QtWidgets.QDockWidget):
                 dlcv_tr("未检测到有效的图片文件夹，请先导入文件夹。")
             )
             return
+        # 等待后台保存写完，统计的是磁盘上最新的内容
+        label_writer = getattr(parent, "label_writer", None)
+        if label_writer is not None:
+            label_writer.wait()
 
-        # 递归遍历文件夹下所有json文件
-        json_files_count = 0
-        label_counter = Counter()
-        flag_counter = Counter()
-        for root, _, files in os.walk(dir_path):
-            for file in files:
-                if file.endswith(".json"):
-                    json_path = os.path.join(root, file)
-                    json_files_count += 1
-                    try:
-                        with open(json_path, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                        shapes = data.get("shapes", [])
-                        flags = data.get("flags", {})
-
-                        # 统计标签
-                        for shape in shapes:
-                            label = shape.get("label", "")
-                            if label:
-                                label_counter[label] += 1
-
-                        # 统计文本标记（只统计值为True的flag文本）
-                        if isinstance(flags, dict):
-                            for flag_name, flag_value in flags.items():
-                                if flag_value is True:
-                                    flag_counter[flag_name] += 1
-                    except Exception as e:
-                        continue
+        self.label_count_text.setText(dlcv_tr("正在统计..."))
+        self._stats_worker.start(dir_path)
+
+    def _on_dir_stats_progress(self, result: LabelStatsResult):
+        label_counter = result.labels
+        flag_counter = result.flags
+        json_files_count = result.json_count
 
         if not label_counter and not flag_counter:
-            if json_files_count == 0:
+            if not result.finished:
+                self.label_count_text.setText(
+                    dlcv_tr("正在统计...（已扫描 {count} 个JSON文件）").format(
+                        count=json_files_count
+                    )
+                )
+            elif json_files_count == 0:
                 self.label_count_text.setText(dlcv_tr("未找到任何JSON文件，请先进行标注。"))
             else:
                 self.label_count_text.setText(
@@ -97,26 +92,31 @@ class LabelCountDock(QtWidgets.QDockWidget):
                     )
                 )
         else:
-            result = dlcv_tr("统计结果（共扫描 {count} 个JSON文件）：\n").format(
-                count=json_files_count
-            )
+            if result.finished:
+                result_text = dlcv_tr("统计结果（共扫描 {count} 个JSON文件）：\n").format(
+                    count=json_files_count
+                )
+            else:
+                result_text = dlcv_tr("正在统计...（已扫描 {count} 个JSON文件）\n").format(
+                    count=json_files_count
+                )
             if flag_counter:
-                result += dlcv_tr("\n文本标记统计:\n")
+                result_text += dlcv_tr("\n文本标记统计:\n")
                 total_flags = sum(flag_counter.values())
                 for flag, count in flag_counter.most_common():
-                    result += f"{flag}: {count}\n"
-                result += dlcv_tr("文本标记总数: {count}\n").format(count=total_flags)
+                    result_text += f"{flag}: {count}\n"
+                result_text += dlcv_tr("文本标记总数: {count}\n").format(count=total_flags)
             if label_counter:
-                result += dlcv_tr("\n标签统计:\n")
+                result_text += dlcv_tr("\n标签统计:\n")
                 total_labels = sum(label_counter.values())
                 # 使用most_common()方法按数量降序排列， 返回从高到低排序的元组列表
                 for label, count in label_counter.most_common():
-                    result += f"{label}: {count}\n"
-                result += dlcv_tr("标签总数: {count}").format(count=total_labels)
+                    result_text += f"{label}: {count}\n"
+                result_text += dlcv_tr("标签总数: {count}").format(count=total_labels)
 
             total = sum(label_counter.values()) + sum(flag_counter.values())
-            result += dlcv_tr("\n\n总数: {count}").format(count=total)
-            self.label_count_text.setText(result)
+            result_text += dlcv_tr("\n\n总数: {count}").format(count=total)
+            self.label_count_text.setText(result_text)
 
     # 统计当前文件的标签/标记数量; 在画布的save函数中调用
     def count_labels_in_file(self, shapes: list[Shape], flags: dict):
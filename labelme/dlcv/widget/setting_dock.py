@@ -9,6 +9,7 @@ from labelme.dlcv.ai import MODELS
 from labelme.dlcv.store import STORE
 from labelme.dlcv.utils_func import notification
 from labelme.dlcv.shape import Shape
+from labelme.dlcv.mask_codec import MASK_ENCODING_PNG, MASK_ENCODINGS
 
 logger = logging.getLogger(__name__)
 
@@ -156,6 +157,67 @@ class SettingDock(QtWidgets.QDockWidget):
                         "max": 100,
                         "step": 1,
                     },
+                    {
+                        "name": "prefetch_count",
+                        "title": dlcv_tr("图片预加载数量"),
+                        "type": "int",
+                        "value": 2,
+                        "default": 2,
+                        "min": 0,
+                        "max": 10,
+                        "step": 1,
+                        "tip": dlcv_tr("切图时在后台预先解码前后各N张图片，0表示关闭"),
+                    },
+                    {
+                        "name": "prefetch_cache_mb",
+                        "title": dlcv_tr("图片预加载缓存(MB)"),
+                        "type": "int",
+                        "value": 1024,
+                        "default": 1024,
+                        "min": 0,
+                        "max": 16384,
+                        "step": 256,
+                        "tip": dlcv_tr("预加载图片占用的最大内存，超出后淘汰最久未使用的图片"),
+                    },
+                    {
+                        "name": "undo_history_mb",
+                        "title": dlcv_tr("撤销历史内存(MB)"),
+                        "type": "int",
+                        "value": 256,
+                        "default": 256,
+                        "min": 16,
+                        "max": 4096,
+                        "step": 16,
+                        "tip": dlcv_tr("撤销快照占用的最大内存，超出后丢弃最早的快照"),
+                    },
+                    {
+                        "name": "mask_encoding",
+                        "title": dlcv_tr("mask 保存格式"),
+                        "type": "list",
+                        "limits": MASK_ENCODINGS,
+                        "value": MASK_ENCODING_PNG,
+                        "default": MASK_ENCODING_PNG,
+                        "tip": dlcv_tr("png 兼容旧版本与其他工具；rle 文件更小、读写更快"),
+                    },
+                    {
+                        "name": "json_compact",
+                        "title": dlcv_tr("json 紧凑保存"),
+                        "type": "bool",
+                        "value": False,
+                        "default": False,
+                        "tip": dlcv_tr("启用后，json 不缩进，点坐标按设置的小数位数保存"),
+                    },
+                    {
+                        "name": "json_point_decimals",
+                        "title": dlcv_tr("点坐标小数位数"),
+                        "type": "int",
+                        "value": 2,
+                        "default": 2,
+                        "min": 0,
+                        "max": 10,
+                        "step": 1,
+                        "tip": dlcv_tr("json 紧凑保存时点坐标保留的小数位数"),
+                    },
                 ],
             },
             {
@@ -230,6 +292,17 @@ class SettingDock(QtWidgets.QDockWidget):
                             "简化程度说明：\n0.001: 轻微简化\n0.005: 默认简化\n0.01: 较多简化\n0.05: 大量简化\n0.1: 极度简化"
                         ),
                     },
+                    {
+                        "name": "ai_precompute_count",
+                        "title": dlcv_tr("AI嵌入预计算数量"),
+                        "type": "int",
+                        "value": 3,
+                        "default": 3,
+                        "min": 0,
+                        "max": 20,
+                        "step": 1,
+                        "tip": dlcv_tr("AI标注模式下，在后台预先计算后面N张图片的嵌入，0表示关闭"),
+                    },
                 ],
             },
             {
@@ -382,6 +455,8 @@ class SettingDock(QtWidgets.QDockWidget):
                     self._canvas.two_points_distance = new_value
                 elif param_name == "brush_size":
                     self._canvas.brush_size = new_value
+                elif param_name == "ai_precompute_count":
+                    mw._precompute_ai_embeddings()
 
             elif len(parent_path) == 1 and parent_path[0] == "other_setting":
                 if param_name in (
@@ -393,6 +468,10 @@ class SettingDock(QtWidgets.QDockWidget):
                     "shape_center_cross_length",
                 ):
                     self._canvas.update()
+                elif param_name == "prefetch_cache_mb":
+                    mw.image_prefetcher.set_max_bytes(new_value * 1024 * 1024)
+                elif param_name == "undo_history_mb":
+                    self._canvas.shapesBackups.set_max_bytes(new_value * 1024 * 1024)
                 elif param_name == "scale_option":
                     if new_value == dlcv_tr(ScaleEnum.KEEP_PREV_SCALE):
                         mw.enableKeepPrevScale(True)
@@ -441,6 +520,12 @@ class SettingDock(QtWidgets.QDockWidget):
         self._parameter.child("other_setting", "shape_center_cross_length").setValue(
             setting_store.get("canvas_shape_center_cross_length", 10)
         )
+        self._parameter.child("other_setting", "prefetch_count").setValue(
+            setting_store.get("prefetch_count", 2)
+        )
+        self._parameter.child("other_setting", "prefetch_cache_mb").setValue(
+            setting_store.get("prefetch_cache_mb", 1024)
+        )
         self._parameter.child("label_setting", "highlight_start_point").setValue(
             setting_store.get("highlight_start_point", False)
         )
@@ -456,6 +541,21 @@ class SettingDock(QtWidgets.QDockWidget):
         self._parameter.child(
             "label_setting", "ai_polygon_simplify_epsilon"
         ).setValue(setting_store.get("ai_polygon_simplify_epsilon", 0.005))
+        self._parameter.child("label_setting", "ai_precompute_count").setValue(
+            setting_store.get("ai_precompute_count", 3)
+        )
+        self._parameter.child("other_setting", "undo_history_mb").setValue(
+            setting_store.get("undo_history_mb", 256)
+        )
+        self._parameter.child("other_setting", "mask_encoding").setValue(
+            setting_store.get("mask_encoding", MASK_ENCODING_PNG)
+        )
+        self._parameter.child("other_setting", "json_compact").setValue(
+            setting_store.get("json_compact", False)
+        )
+        self._parameter.child("other_setting", "json_point_decimals").setValue(
+            setting_store.get("json_point_decimals", 2)
+        )
 
     def save_settings(self):
         """返回需要从 QSettings 保存的参数值字典。"""
@@ -466,6 +566,21 @@ class SettingDock(QtWidgets.QDockWidget):
             "ai_polygon_simplify_epsilon": self._parameter.child(
                 "label_setting", "ai_polygon_simplify_epsilon"
             ).value(),
+            "ai_precompute_count": self._parameter.child(
+                "label_setting", "ai_precompute_count"
+            ).value(),
+            "undo_history_mb": self._parameter.child(
+                "other_setting", "undo_history_mb"
+            ).value(),
+            "mask_encoding": self._parameter.child(
+                "other_setting", "mask_encoding"
+            ).value(),
+            "json_compact": self._parameter.child(
+                "other_setting", "json_compact"
+            ).value(),
+            "json_point_decimals": self._parameter.child(
+                "other_setting", "json_point_decimals"
+            ).value(),
         }
 
     # endregion
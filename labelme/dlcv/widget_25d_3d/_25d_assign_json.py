@@ -1,5 +1,29 @@
+"""2.5D 模式：按文件夹与文件名前缀给图片分组，每组共用一个 JSON 文件。
+
+分组只取决于同一文件夹内的文件名，所以 ``assign_json`` 按文件夹缓存结果：
+缓存记录每个文件夹的 mtime、子文件夹和其中图片的 JSON 文件名，
+默认在 ``~/.cache/labelme/assign_json`` 下，每个根目录一个缓存文件。
+再次打开时 mtime 没变的文件夹只做一次 stat，不再列目录；
+新增、删除或改名过文件的文件夹才重新读取和分组，这些文件夹在线程池中并行处理。
+"""
+
+import concurrent.futures
+import hashlib
 import os
-import json
+import os.path as osp
+import time
+import uuid
+from pathlib import Path
+
+from labelme.logger import logger
+from labelme.utils import json_codec
+
+DEFAULT_CACHE_DIR = osp.join(osp.expanduser("~"), ".cache", "labelme", "assign_json")
+_CACHE_VERSION = 1
+# mtime 与读取时间相差不到该值（纳秒）的文件夹下次仍重新读取：
+# mtime 精度有限（FAT 为 2 秒），读取之后紧接着的改动可能不会改变 mtime
+_RACY_NS = 2_000_000_000
+
 
 def get_lcp(str_list):
     """计算一组字符串的最长公共前缀"""
@@ -15,74 +39,188 @@ def get_lcp(str_list):
             return s1[:i]
     return s1
 
-def process_product_data(file_list):
-    # 1. 第一步：按文件夹和文件名前缀分组
-    groups = {}  # key: (dir_path, product_id), value: [file_paths]
+# 参与分组的图片格式
+GROUP_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def group_key(file_path):
+    """图片所属分组 (目录路径, 文件名前 6 个字符)，不参与分组的文件返回 None"""
+    file_name = os.path.basename(file_path)
+    if not file_name.lower().endswith(GROUP_EXTENSIONS):
+        return None
+    product_id = file_name[:6]  # 提取 SXXXXX 作为分组键
+    # 使用 (目录路径, product_id) 作为分组键，确保不同文件夹的文件分开处理
+    return os.path.dirname(file_path), product_id
+
+
+def group_files(file_list):
+    """按文件夹和文件名前缀分组，返回 {(目录路径, product_id): [完整路径]}"""
+    groups = {}
     for f in file_list:
-        # f 现在是完整路径
-        file_name = os.path.basename(f)
-        if not file_name.lower().endswith(('.jpg', '.jpeg', '.png')):
-            continue
-        product_id = file_name[:6]  # 提取 SXXXXX 作为分组键
-        dir_path = os.path.dirname(f)  # 获取文件所在目录
-        
-        # 使用 (目录路径, product_id) 作为分组键，确保不同文件夹的文件分开处理
-        group_key = (dir_path, product_id)
-        if group_key not in groups:
-            groups[group_key] = []
-        groups[group_key].append(f)  # 保存完整路径
-    
+        key = group_key(f)
+        if key is not None:
+            groups.setdefault(key, []).append(f)  # 保存完整路径
+    return groups
+
+
+def group_json_name(files):
+    """一组图片共用的 JSON 文件名：去掉扩展名后文件名的最长公共前缀"""
+    # 提取文件名列表（去除扩展名）用于计算lcp
+    file_names_without_ext = [
+        os.path.splitext(os.path.basename(f))[0] for f in files
+    ]
+
+    # 获取该组图片的最长公共前缀（基于去除扩展名后的文件名）
+    lcp = get_lcp(file_names_without_ext)
+
+    # 优化命名：去除末尾可能残余的特殊符号（如 _ 或 -）
+    json_base_name = lcp.rstrip('_-. ')
+
+    # 确保不会为空
+    if not json_base_name:
+        # 如果为空，使用第一个文件名的前缀部分
+        json_base_name = file_names_without_ext[0].rsplit('_', 1)[0] if '_' in file_names_without_ext[0] else file_names_without_ext[0]
+
+    return f"{json_base_name}.json"
+
+
+def process_product_data(file_list):
+    """返回 {JSON 文件名: [完整路径]}"""
     results = {}
-    
-    # 2. 第二步：计算每组的 LCP 并生成 JSON 名
-    for (dir_path, pid), files in groups.items():
-        # 提取文件名列表（去除扩展名）用于计算lcp
-        file_names_without_ext = []
-        for f in files:
-            file_name = os.path.basename(f)
-            # 去除扩展名
-            file_name_without_ext = os.path.splitext(file_name)[0]
-            file_names_without_ext.append(file_name_without_ext)
-        
-        # 获取该组图片的最长公共前缀（基于去除扩展名后的文件名）
-        lcp = get_lcp(file_names_without_ext)
-        
-        # 3. 优化命名：去除末尾可能残余的特殊符号（如 _ 或 -）
-        json_base_name = lcp.rstrip('_-. ')
-        
-        # 确保不会为空
-        if not json_base_name:
-            # 如果为空，使用第一个文件名的前缀部分
-            json_base_name = file_names_without_ext[0].rsplit('_', 1)[0] if '_' in file_names_without_ext[0] else file_names_without_ext[0]
-        
-        json_filename = f"{json_base_name}.json"
-        results[json_filename] = files  # 保存完整路径列表
-    
+    for files in group_files(file_list).values():
+        results[group_json_name(files)] = files  # 保存完整路径列表
     return results
 
-def assign_json(input_dir):
-    """分配JSON文件，返回文件路径到JSON文件名的映射"""
-    from pathlib import Path
-
-    file_paths = []
-    image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif')
-
-    for root,dirs,files in os.walk(input_dir):
-        for file in files:
-            if file.lower().endswith(image_extensions):
-                # 统一路径格式为 linux风格
-                file_path = str(Path(os.path.join(root, file)).absolute().as_posix())
-                file_paths.append(file_path)
-                
-    output = process_product_data(file_paths)
-    
+
+def _cache_path(root_posix: str, cache_dir: str) -> str:
+    key = hashlib.blake2b(
+        osp.normcase(root_posix).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return osp.join(cache_dir, key + ".json")
+
+
+def _load_cache(path: str, root_posix: str) -> dict:
+    """{相对目录: {"mtime_ns", "dirs", "files"}}，缓存不存在或无效时为空"""
+    try:
+        data = json_codec.load_file(path)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Failed to load 2.5D json assignment cache {path}: {e}")
+        return {}
+    if data.get("version") != _CACHE_VERSION or data.get("root") != root_posix:
+        return {}
+    return data.get("dirs", {})
+
+
+def _save_cache(path: str, root_posix: str, dirs: dict):
+    data = {"version": _CACHE_VERSION, "root": root_posix, "dirs": dirs}
+    tmp_path = "%s.%s.tmp" % (path, uuid.uuid4().hex)
+    try:
+        os.makedirs(osp.dirname(path), exist_ok=True)
+        json_codec.dump_file(data, tmp_path, compact=True)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to save 2.5D json assignment cache {path}: {e}")
+        if osp.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _scan_dir(dir_path: str, dir_prefix: str, cached):
+    """
+    读取一个文件夹（不递归）并给其中的图片分组
+
+    :param dir_prefix: 文件夹的 as_posix 路径，不带末尾的 /
+    :param cached: 该文件夹的缓存，mtime 相同时直接返回
+    :return: (缓存项, 是否重新读取)，文件夹无法访问时返回 None
+    """
+    scan_ns = time.time_ns()
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return None
+    if cached is not None and cached.get("mtime_ns") == mtime_ns:
+        return cached, False
+
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return None
+    subdirs = []
+    img_paths = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # 与 os.walk 一样不进入目录的符号链接
+            if not entry.is_symlink():
+                subdirs.append(entry.name)
+        elif entry.name.lower().endswith(GROUP_EXTENSIONS):
+            img_paths.append(f"{dir_prefix}/{entry.name}")
+
+    files = {}
+    for group in group_files(img_paths).values():
+        json_name = group_json_name(group)
+        for img_path in group:
+            files[osp.basename(img_path)] = json_name
+    if scan_ns - mtime_ns < _RACY_NS:
+        mtime_ns = None
+    return {"mtime_ns": mtime_ns, "dirs": subdirs, "files": files}, True
+
+
+def assign_json(input_dir, cache_dir=DEFAULT_CACHE_DIR, max_workers=8):
+    """
+    分配JSON文件，返回文件路径到JSON文件名的映射
+
+    :param input_dir: 根目录，递归处理所有子文件夹
+    :param cache_dir: 缓存目录，None 时不使用缓存
+    :param max_workers: 并行读取文件夹的线程数
+    """
+    # 统一路径格式为 linux风格
+    root_posix = Path(input_dir).absolute().as_posix()
+    root_prefix = root_posix.rstrip("/")
+    cache_path = _cache_path(root_posix, cache_dir) if cache_dir else None
+    cached_dirs = _load_cache(cache_path, root_posix) if cache_path else {}
+
+    dirs = {}
+    changed = False
     # 创建文件路径到JSON文件名的映射
     file_to_json = {}
-    for json_name, img_paths in output.items():
-        for img_path in img_paths:
-            file_to_json[img_path] = json_name
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit(rel_dir):
+            dir_prefix = f"{root_prefix}/{rel_dir}" if rel_dir else root_prefix
+            dir_path = osp.join(input_dir, rel_dir) if rel_dir else input_dir
+            future = executor.submit(
+                _scan_dir, dir_path, dir_prefix, cached_dirs.get(rel_dir))
+            pending[future] = (rel_dir, dir_prefix)
+
+        pending = {}
+        submit("")
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                rel_dir, dir_prefix = pending.pop(future)
+                result = future.result()
+                if result is None:
+                    continue
+                entry, rescanned = result
+                changed = changed or rescanned
+                dirs[rel_dir] = entry
+                for name, json_name in entry["files"].items():
+                    file_to_json[f"{dir_prefix}/{name}"] = json_name
+                for name in entry["dirs"]:
+                    submit(f"{rel_dir}/{name}" if rel_dir else name)
+
+    if cache_path and (changed or dirs.keys() != cached_dirs.keys()):
+        _save_cache(cache_path, root_posix, dirs)
     return file_to_json
-    
+
+
 if __name__ == "__main__":
     # 测试数据
     json_files = assign_json('test', 'outputJson')
@@ -3,7 +3,10 @@ import os
 from abc import ABC, abstractmethod
 
 from labelme.dlcv.store import STORE
+from labelme.dlcv.widget_25d_3d._25d_assign_json import DEFAULT_CACHE_DIR
 from labelme.dlcv.widget_25d_3d._25d_assign_json import assign_json
+from labelme.dlcv.widget_25d_3d._25d_assign_json import group_json_name
+from labelme.dlcv.widget_25d_3d._25d_assign_json import group_key
 from labelme.dlcv.app import ProjEnum
 
 
@@ -78,26 +81,141 @@ class Proj3DManager(ProjManagerBase):
 
 
 class Proj2_5DManager(ProjManagerBase):
-    """2.5D模式管理器"""
+    """2.5D模式管理器
 
-    def __init__(self):
-        self._file_to_json = {}
+    除了 图片 -> JSON 文件名 的映射，还维护分组索引：
+    (目录, 文件名前缀) -> 图片列表，以及 (目录, JSON 文件名) -> 分组。
+    查找共用同一个 JSON 的图片只访问该组；图片增删时只重新计算所在的组。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self._cache_dir = cache_dir  # assign_json 的缓存目录，None 时不缓存
+        self._file_to_json = {}  # 图片路径 -> JSON 文件名
+        self._groups = {}  # (目录, 前缀) -> [图片路径]
+        self._group_json = {}  # (目录, 前缀) -> JSON 文件名
+        self._json_groups = {}  # (目录, JSON 文件名) -> [(目录, 前缀)]
+        self._assigned_root = None  # 已分配过的根目录，映射为空时不重复遍历
+
+    # region 分组索引
+    def _link_group(self, key, json_name: str):
+        self._group_json[key] = json_name
+        self._json_groups.setdefault((key[0], json_name), []).append(key)
+        for img_path in self._groups[key]:
+            self._file_to_json[img_path] = json_name
+
+    def _unlink_group(self, key):
+        json_name = self._group_json.pop(key, None)
+        if json_name is None:
+            return
+        json_key = (key[0], json_name)
+        keys = self._json_groups.get(json_key, [])
+        if key in keys:
+            keys.remove(key)
+        if not keys:
+            self._json_groups.pop(json_key, None)
+
+    def _rebuild_index(self):
+        """由 _file_to_json 重建分组索引"""
+        self._groups = {}
+        self._group_json = {}
+        self._json_groups = {}
+        for img_path, json_name in self._file_to_json.items():
+            key = group_key(img_path)
+            if key is None:
+                continue
+            if key not in self._groups:
+                self._groups[key] = []
+                self._group_json[key] = json_name
+                self._json_groups.setdefault((key[0], json_name), []).append(key)
+            self._groups[key].append(img_path)
+
+    def _update_groups(self, keys) -> list[str]:
+        """重新计算这些组的 JSON 文件名，返回 JSON 文件名变化了的图片"""
+        changed = []
+        for key in keys:
+            old_name = self._group_json.get(key)
+            self._unlink_group(key)
+            files = self._groups.get(key)
+            if not files:
+                self._groups.pop(key, None)
+                continue
+            json_name = group_json_name(files)
+            self._link_group(key, json_name)
+            if json_name != old_name:
+                changed.extend(files)
+        return changed
+
+    def add_images(self, img_paths) -> list[str]:
+        """新出现的图片加入所在分组
+
+        Returns:
+            JSON 文件名发生变化的图片（包括新加入的图片）
+        """
+        keys = set()
+        added = {}
+        for img_path in img_paths:
+            # 已在映射中的路径无需再规范化（文件树扫描到的路径已是 as_posix 格式）
+            if img_path in self._file_to_json:
+                continue
+            img_path = str(Path(img_path).absolute().as_posix())
+            if img_path in self._file_to_json or img_path in added:
+                continue
+            key = group_key(img_path)
+            if key is None:
+                continue
+            self._groups.setdefault(key, []).append(img_path)
+            keys.add(key)
+            added[img_path] = None
+        changed = self._update_groups(keys)
+        changed_set = set(changed)
+        return changed + [p for p in added if p not in changed_set]
+
+    def remove_images(self, img_paths) -> list[str]:
+        """从分组中移除已删除的图片
+
+        Returns:
+            同组剩余图片中 JSON 文件名发生变化的图片
+        """
+        keys = set()
+        for img_path in img_paths:
+            img_path = str(Path(img_path).absolute().as_posix())
+            if self._file_to_json.pop(img_path, None) is None:
+                continue
+            key = group_key(img_path)
+            files = self._groups.get(key)
+            if files is not None and img_path in files:
+                files.remove(img_path)
+                keys.add(key)
+        return self._update_groups(keys)
+
+    def get_group_img_paths(self, json_path: str) -> list[str]:
+        """同一目录下使用该 JSON 的所有图片路径"""
+        json_key = (os.path.dirname(json_path), os.path.basename(json_path))
+        img_paths = []
+        for key in self._json_groups.get(json_key, []):
+            img_paths.extend(self._groups[key])
+        return img_paths
+
+    # endregion
 
     def assign_json_files(self, root_path: str) -> dict:
         """分配JSON文件"""
         if not root_path or not os.path.exists(root_path):
             return {}
+        self._assigned_root = root_path
         try:
-            self._file_to_json = assign_json(root_path)
-            return self._file_to_json
+            self._file_to_json = assign_json(root_path, cache_dir=self._cache_dir)
         except Exception:
             return {}
+        self._rebuild_index()
+        return self._file_to_json
 
     def get_json_path(self, img_path: str) -> str:
         if not self._file_to_json:
             if STORE.main_window and hasattr(STORE.main_window, 'lastOpenDir'):
                 root_path = STORE.main_window.lastOpenDir
-                if root_path and os.path.exists(root_path):
+                if (root_path and root_path != self._assigned_root
+                        and os.path.exists(root_path)):
                     self.assign_json_files(root_path)
 
         img_path = str(Path(img_path).absolute().as_posix())
@@ -113,19 +231,18 @@ class Proj2_5DManager(ProjManagerBase):
         """获取使用指定JSON的所有图片名列表（参数是图片路径）"""
         # 通过图片路径获取对应的JSON路径
         json_path = self.get_json_path(img_path)
-        json_name = os.path.basename(json_path)
-        json_dir = os.path.dirname(json_path)  # 获取JSON文件所在目录
 
         # 只返回同一目录下使用该JSON的文件名
         return [
-            os.path.basename(img_path)
-            for img_path, json_file in self._file_to_json.items()
-            if json_file == json_name and os.path.dirname(img_path) == json_dir
+            os.path.basename(path)
+            for path in self.get_group_img_paths(json_path)
         ]
 
     def clear(self):
         """清空映射"""
         self._file_to_json = {}
+        self._assigned_root = None
+        self._rebuild_index()
 
     @property
     def file_to_json(self) -> dict:
@@ -134,6 +251,7 @@ class Proj2_5DManager(ProjManagerBase):
     @file_to_json.setter
     def file_to_json(self, value: dict):
         self._file_to_json = value.copy() if value else {}
+        self._rebuild_index()
 
 
 # 项目管理器
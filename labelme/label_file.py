@@ -1,8 +1,9 @@
 import base64
 import contextlib
 import io
-import json
+import os
 import os.path as osp
+import uuid
 
 import PIL.Image
 
@@ -11,6 +12,7 @@ from labelme import QT4
 from labelme import __version__
 from labelme import utils
 from labelme.logger import logger
+from labelme.utils import json_codec
 
 PIL.Image.MAX_IMAGE_PIXELS = None
 
@@ -88,8 +90,7 @@ class LabelFile(object):
             "mask",
         ]
         try:
-            with open(filename, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_file(filename)
 
             if data["imageData"] is not None:
                 imageData = base64.b64decode(data["imageData"])
@@ -164,7 +165,15 @@ class LabelFile(object):
         imageData=None,
         otherData=None,
         flags=None,
+        compact=False,
+        point_decimals=None,
     ):
+        """
+        compact: write without indentation
+        point_decimals: round point coordinates to this many decimals
+        """
+        if point_decimals is not None:
+            shapes = self.round_points(shapes, point_decimals)
         if imageData is not None:
             imageData = base64.b64encode(imageData).decode("utf-8")
             imageHeight, imageWidth = self._check_image_height_and_width(
@@ -186,13 +195,30 @@ class LabelFile(object):
         for key, value in otherData.items():
             assert key not in data
             data[key] = value
+        # write to a temporary file first so readers never see a partial json
+        tmp_filename = "%s.%s.tmp" % (filename, uuid.uuid4().hex)
         try:
-            with open(filename, "w") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            json_codec.dump_file(data, tmp_filename, compact=compact)
+            os.replace(tmp_filename, filename)
             self.filename = filename
         except Exception as e:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_filename)
             raise LabelFileError(e)
 
+    @staticmethod
+    def round_points(shapes, decimals):
+        """Copy of shapes with point coordinates rounded to ``decimals``."""
+        return [
+            dict(
+                shape,
+                points=[
+                    [round(x, decimals), round(y, decimals)] for x, y in shape["points"]
+                ],
+            )
+            for shape in shapes
+        ]
+
     @staticmethod
     def is_label_file(filename):
         return osp.splitext(filename)[1].lower() == LabelFile.suffix
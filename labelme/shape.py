@@ -38,6 +38,17 @@ class Shape(object):
     point_size = 12
     scale = 1.0
 
+    # Attributes prefixed with "_cache_" hold derived render data. They are
+    # rebuilt on demand and never copied (see __getstate__).
+    _cache_mask_contour = None  # (mask, contour path in mask coordinates)
+    _cache_mask_render = None  # (mask, key, image, whether image is pre-scaled)
+    _cache_mask_path = None  # (mask, key, contour path in canvas coordinates)
+
+    # Scaled mask images larger than this (in pixels) are drawn through the
+    # painter instead of being cached, so zooming in on a big mask cannot
+    # allocate hundreds of megabytes.
+    MASK_CACHE_MAX_PIXELS = 4096 * 4096
+
     def __init__(
         self,
         label=None,
@@ -184,34 +195,7 @@ class Shape(object):
         painter.setPen(pen)
 
         if self.mask is not None:
-            image_to_draw = np.zeros(self.mask.shape + (4,), dtype=np.uint8)
-            fill_color = (
-                self.select_fill_color.getRgb()
-                if self.selected
-                else self.fill_color.getRgb()
-            )
-            image_to_draw[self.mask] = fill_color
-            qimage = QtGui.QImage.fromData(labelme.utils.img_arr_to_data(image_to_draw))
-            qimage = qimage.scaled(
-                qimage.size() * self.scale,
-                QtCore.Qt.IgnoreAspectRatio,
-                QtCore.Qt.SmoothTransformation,
-            )
-
-            painter.drawImage(self._scale_point(point=self.points[0]), qimage)
-
-            line_path = QtGui.QPainterPath()
-            contours = skimage.measure.find_contours(np.pad(self.mask, pad_width=1))
-            for contour in contours:
-                contour += [self.points[0].y(), self.points[0].x()]
-                line_path.moveTo(
-                    self._scale_point(QtCore.QPointF(contour[0, 1], contour[0, 0]))
-                )
-                for point in contour[1:]:
-                    line_path.lineTo(
-                        self._scale_point(QtCore.QPointF(point[1], point[0]))
-                    )
-            painter.drawPath(line_path)
+            self._paint_mask(painter)
 
         if self.points:
             line_path = QtGui.QPainterPath()
@@ -278,6 +262,79 @@ class Shape(object):
             painter.drawPath(negative_vrtx_path)
             painter.fillPath(negative_vrtx_path, QtGui.QColor(255, 0, 0, 255))
 
+    def _mask_contour_path(self):
+        """Contour of the mask as a path in mask pixel coordinates."""
+        cache = self._cache_mask_contour
+        if cache is not None and cache[0] is self.mask:
+            return cache[1]
+
+        path = QtGui.QPainterPath()
+        for contour in skimage.measure.find_contours(np.pad(self.mask, pad_width=1)):
+            path.moveTo(contour[0, 1], contour[0, 0])
+            for y, x in contour[1:]:
+                path.lineTo(x, y)
+        self._cache_mask_contour = (self.mask, path)
+        return path
+
+    def _paint_mask(self, painter):
+        """Draw the mask fill and contour.
+
+        The RGBA image is rebuilt only when the mask object, the fill color
+        (which includes the selection state) or the scale changes, and the
+        contour path only when the mask, the scale or the position changes.
+        """
+        fill_color = (
+            self.select_fill_color.getRgb()
+            if self.selected
+            else self.fill_color.getRgb()
+        )
+        origin = self.points[0]
+
+        key = (fill_color, self.scale)
+        cache = self._cache_mask_render
+        if cache is None or cache[0] is not self.mask or cache[1] != key:
+            height, width = self.mask.shape[:2]
+            image_to_draw = np.zeros((height, width, 4), dtype=np.uint8)
+            image_to_draw[self.mask] = fill_color
+            qimage = QtGui.QImage(
+                image_to_draw.data,
+                width,
+                height,
+                width * 4,
+                QtGui.QImage.Format_RGBA8888,
+            ).copy()  # detach from the numpy buffer
+            scaled_size = qimage.size() * self.scale
+            scaled_pixels = scaled_size.width() * scaled_size.height()
+            scaled = scaled_pixels <= self.MASK_CACHE_MAX_PIXELS
+            if scaled:
+                qimage = qimage.scaled(
+                    scaled_size,
+                    QtCore.Qt.IgnoreAspectRatio,
+                    QtCore.Qt.SmoothTransformation,
+                )
+            cache = (self.mask, key, qimage, scaled)
+            self._cache_mask_render = cache
+        _, _, qimage, scaled = cache
+
+        top_left = self._scale_point(point=origin)
+        if scaled:
+            painter.drawImage(top_left, qimage)
+        else:
+            painter.drawImage(
+                QtCore.QRectF(top_left, QtCore.QSizeF(qimage.size()) * self.scale),
+                qimage,
+            )
+
+        key = (self.scale, origin.x(), origin.y())
+        cache = self._cache_mask_path
+        if cache is None or cache[0] is not self.mask or cache[1] != key:
+            transform = QtGui.QTransform(
+                self.scale, 0, 0, self.scale, top_left.x(), top_left.y()
+            )
+            cache = (self.mask, key, transform.map(self._mask_contour_path()))
+            self._cache_mask_path = cache
+        painter.drawPath(cache[2])
+
     def drawVertex(self, path, i):
         d = self.point_size
         shape = self.point_type
@@ -382,6 +439,14 @@ class Shape(object):
     def copy(self):
         return copy.deepcopy(self)
 
+    def __getstate__(self):
+        # render caches hold Qt objects that cannot be copied; rebuild instead
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if not name.startswith("_cache_")
+        }
+
     def __len__(self):
         return len(self.points)
 
@@ -0,0 +1,159 @@
+"""JSON encoding and decoding for label files.
+
+The fastest available backend is used: ``orjson``, then ``ujson``, then the
+standard library ``json``. All backends produce the same data: values the
+faster backends cannot serialize exactly (integers wider than 64 bits, and
+NaN / infinity, which ``orjson`` would silently write as ``null``) are
+encoded with ``json`` instead, and text they cannot parse (the ``NaN`` /
+``Infinity`` literals written by ``json``) is decoded with ``json``.
+
+Label files are written with 2-space indentation by default. With
+``compact=True`` indentation is dropped.
+"""
+
+import json
+import math
+import os
+import time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+CODEC_ORJSON = "orjson"
+CODEC_UJSON = "ujson"
+CODEC_JSON = "json"
+
+
+def available_codecs():
+    codecs = []
+    if orjson is not None:
+        codecs.append(CODEC_ORJSON)
+    if ujson is not None:
+        codecs.append(CODEC_UJSON)
+    codecs.append(CODEC_JSON)
+    return codecs
+
+
+_codec = available_codecs()[0]
+
+
+def get_codec():
+    return _codec
+
+
+def set_codec(name):
+    """Select the backend; ``None`` selects the fastest available one."""
+    global _codec
+    if name is None:
+        name = available_codecs()[0]
+    if name not in available_codecs():
+        raise ValueError("JSON codec is not available: {}".format(name))
+    _codec = name
+
+
+def _has_non_finite(obj):
+    """Whether ``obj`` contains a NaN or infinite float."""
+    obj_type = type(obj)
+    if obj_type is float:
+        return not math.isfinite(obj)
+    if obj_type is dict:
+        return any(map(_has_non_finite, obj.values()))
+    if obj_type is list or obj_type is tuple:
+        return any(map(_has_non_finite, obj))
+    return False
+
+
+def loads(data, codec=None):
+    """Decode ``str`` or UTF-8 ``bytes``."""
+    codec = codec or _codec
+    try:
+        if codec == CODEC_ORJSON:
+            return orjson.loads(data)
+        if codec == CODEC_UJSON:
+            return ujson.loads(data)
+    except ValueError:
+        # e.g. NaN / Infinity literals; json raises its own error if the
+        # text is really malformed
+        pass
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def dumps(obj, compact=False, codec=None):
+    """Encode to UTF-8 ``bytes`` without escaping non-ASCII characters."""
+    codec = codec or _codec
+    if codec == CODEC_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        try:
+            data = orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            # NaN / infinity are written as null; only walk obj when they may be
+            if b"null" not in data or not _has_non_finite(obj):
+                return data
+    elif codec == CODEC_UJSON:
+        try:
+            if not _has_non_finite(obj):
+                return ujson.dumps(
+                    obj,
+                    ensure_ascii=False,
+                    escape_forward_slashes=False,
+                    indent=0 if compact else 2,
+                ).encode("utf-8")
+        except (TypeError, OverflowError):
+            pass
+    if compact:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return text.encode("utf-8")
+
+
+def load_file(filename, codec=None):
+    with open(filename, "rb") as f:
+        return loads(f.read(), codec=codec)
+
+
+def dump_file(obj, filename, compact=False, codec=None):
+    data = dumps(obj, compact=compact, codec=codec)
+    with open(filename, "wb") as f:
+        f.write(data)
+
+
+def benchmark(obj, compact=False, repeat=5):
+    """Time saving and loading ``obj`` with every available backend.
+
+    Returns ``{codec: (load_seconds, save_seconds, size_bytes)}``; times are
+    per file.
+    """
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for codec in available_codecs():
+            out = os.path.join(tmp_dir, "{}.json".format(codec))
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                dump_file(obj, out, compact=compact, codec=codec)
+            save_seconds = (time.perf_counter() - start) / repeat
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                loaded = load_file(out, codec=codec)
+            load_seconds = (time.perf_counter() - start) / repeat
+            assert loaded == load_file(out, codec=CODEC_JSON)
+
+            results[codec] = (load_seconds, save_seconds, os.path.getsize(out))
+    return results
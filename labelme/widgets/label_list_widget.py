@@ -95,11 +95,43 @@ class LabelListWidgetItem(QtGui.QStandardItem):
 class StandardItemModel(QtGui.QStandardItemModel):
     itemDropped = QtCore.Signal()
 
+    def __init__(self, *args, **kwargs):
+        super(StandardItemModel, self).__init__(*args, **kwargs)
+        self._removingRuns = False
+
     def removeRows(self, *args, **kwargs):
         ret = super().removeRows(*args, **kwargs)
-        self.itemDropped.emit()
+        if not self._removingRuns:
+            self.itemDropped.emit()
         return ret
 
+    def removeRowSet(self, rows):
+        """Remove rows with one removeRows call per contiguous run.
+
+        itemDropped is emitted once instead of once per run.
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        self._removingRuns = True
+        try:
+            for first, last in reversed(_contiguousRuns(rows)):
+                super(StandardItemModel, self).removeRows(first, last - first + 1)
+        finally:
+            self._removingRuns = False
+        self.itemDropped.emit()
+
+
+def _contiguousRuns(rows):
+    """Sorted rows -> [(first, last)] of contiguous runs."""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
 
 class LabelListWidget(QtWidgets.QListView):
     itemDoubleClicked = QtCore.Signal(LabelListWidgetItem)
@@ -108,6 +140,9 @@ class LabelListWidget(QtWidgets.QListView):
     def __init__(self):
         super(LabelListWidget, self).__init__()
         self._selectedItems = []
+        # shape -> item; None means stale (rows inserted by drag and drop)
+        self._itemsByShape = {}
+        self._addingItem = False
 
         self.setWindowFlags(Qt.Window)
         self.setModel(StandardItemModel())
@@ -119,6 +154,9 @@ class LabelListWidget(QtWidgets.QListView):
 
         self.doubleClicked.connect(self.itemDoubleClickedEvent)
         self.selectionModel().selectionChanged.connect(self.itemSelectionChangedEvent)
+        self.model().rowsInserted.connect(self._onRowsInserted)
+        self.model().rowsAboutToBeRemoved.connect(self._onRowsAboutToBeRemoved)
+        self.model().modelReset.connect(self._onModelReset)
 
     def __len__(self):
         return self.model().rowCount()
@@ -155,23 +193,72 @@ class LabelListWidget(QtWidgets.QListView):
     def addItem(self, item):
         if not isinstance(item, LabelListWidgetItem):
             raise TypeError("item must be LabelListWidgetItem")
-        self.model().setItem(self.model().rowCount(), 0, item)
+        self._addingItem = True
+        try:
+            self.model().setItem(self.model().rowCount(), 0, item)
+        finally:
+            self._addingItem = False
+        if self._itemsByShape is not None:
+            self._itemsByShape[item.shape()] = item
         item.setSizeHint(self.itemDelegate().sizeHint(None, None))
 
     def removeItem(self, item):
         index = self.model().indexFromItem(item)
         self.model().removeRows(index.row(), 1)
 
+    def _rowsOf(self, items):
+        rows = {self.model().indexFromItem(item).row() for item in items}
+        return sorted(row for row in rows if row >= 0)
+
+    def _selectionOf(self, rows):
+        selection = QtCore.QItemSelection()
+        for first, last in _contiguousRuns(rows):
+            selection.select(self.model().index(first, 0), self.model().index(last, 0))
+        return selection
+
+    def removeItems(self, items):
+        """Remove items; each contiguous run of rows is removed at once."""
+        rows = self._rowsOf(items)
+        # Deselect in one update, otherwise every removed run emits its own
+        # selection change
+        self.selectionModel().select(
+            self._selectionOf(rows), QtCore.QItemSelectionModel.Deselect
+        )
+        self.model().removeRowSet(rows)
+
     def selectItem(self, item):
         index = self.model().indexFromItem(item)
         self.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
 
+    def selectItems(self, items):
+        """Select items with a single selection model update."""
+        self.selectionModel().select(
+            self._selectionOf(self._rowsOf(items)), QtCore.QItemSelectionModel.Select
+        )
+
     def findItemByShape(self, shape):
-        for row in range(self.model().rowCount()):
+        if self._itemsByShape is None:
+            self._itemsByShape = {item.shape(): item for item in self}
+        try:
+            return self._itemsByShape[shape]
+        except KeyError:
+            raise ValueError("cannot find shape: {}".format(shape))
+
+    def _onRowsInserted(self, parent, first, last):
+        # Dropped rows get their data only after insertion, so rebuild lazily
+        if not self._addingItem:
+            self._itemsByShape = None
+
+    def _onRowsAboutToBeRemoved(self, parent, first, last):
+        if self._itemsByShape is None:
+            return
+        for row in range(first, last + 1):
             item = self.model().item(row, 0)
-            if item.shape() == shape:
-                return item
-        raise ValueError("cannot find shape: {}".format(shape))
+            if item is not None and self._itemsByShape.get(item.shape()) is item:
+                del self._itemsByShape[item.shape()]
+
+    def _onModelReset(self):
+        self._itemsByShape = {}
 
     def clear(self):
         self.model().clear()
@@ -0,0 +1,73 @@
+import numpy as np
+
+from labelme.ai._embedding_cache import EmbeddingCache
+from labelme.ai._embedding_cache import compute_image_key
+
+
+def test_compute_image_key():
+    image = np.zeros((4, 5, 3), dtype=np.uint8)
+    assert compute_image_key(image) == compute_image_key(image.copy())
+    assert compute_image_key(image) != compute_image_key(image.reshape(5, 4, 3))
+    image2 = image.copy()
+    image2[0, 0, 0] = 1
+    assert compute_image_key(image) != compute_image_key(image2)
+
+
+def test_embedding_cache(tmp_path):
+    embedding = np.random.rand(1, 8, 4, 4).astype(np.float32)
+    cache = EmbeddingCache(model_id="model", cache_dir=str(tmp_path))
+    assert cache.get("a") is None
+    cache.put("a", embedding)
+
+    # a new instance (i.e. after restart) reads the embedding back from disk
+    cache = EmbeddingCache(model_id="model", cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(cache.get("a"), embedding)
+    assert EmbeddingCache(model_id="other", cache_dir=str(tmp_path)).get("a") is None
+
+    # keep only two entries; "a" was used recently so "b" is evicted first
+    cache.set_max_bytes(cache.total_bytes * 2 + 1)
+    cache.put("b", embedding)
+    cache.get("a")
+    cache.put("c", embedding)
+    assert "b" not in cache
+    assert "a" in cache
+    assert "c" in cache
+
+
+def test_embedding_scheduler(tmp_path):
+    import threading
+
+    from labelme.ai._embedding_cache import EmbeddingScheduler
+
+    started = threading.Event()
+    release = {1: threading.Event(), 2: threading.Event()}
+    order = []
+
+    def encode(image):
+        value = int(image[0, 0])
+        order.append(value)
+        if value == 1:
+            started.set()
+        if value in release:
+            release[value].wait(5)
+        return np.full((1, 2), image[0, 0], dtype=np.float32)
+
+    cache = EmbeddingCache(model_id="model", cache_dir=str(tmp_path))
+    scheduler = EmbeddingScheduler(encode=encode, cache=cache, max_workers=1)
+
+    images = [np.full((2, 2), i, dtype=np.uint8) for i in range(5)]
+    scheduler.precompute([lambda i=i: images[i] for i in (1, 2, 3)])
+    assert started.wait(5)
+    # image 1 is being encoded; the current image goes before images 2 and 3
+    future = scheduler.submit(images[4])
+    release[1].set()
+    assert future.result(5)[0, 0] == 4
+
+    # precompute again replaces the pending queue and skips cached images
+    done = threading.Event()
+    scheduler.precompute([lambda: images[2], lambda: done.set()])
+    release[2].set()
+    assert done.wait(5)
+    assert order == [1, 4, 2]
+    assert compute_image_key(images[2]) in cache
+    assert compute_image_key(images[3]) not in cache
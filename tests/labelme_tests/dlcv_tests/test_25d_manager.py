@@ -0,0 +1,85 @@
+import os
+import time
+from pathlib import Path
+
+from labelme.dlcv.widget_25d_3d._25d_assign_json import assign_json
+from labelme.dlcv.widget_25d_3d.manager import Proj2_5DManager
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+
+
+def test_2_5d_group_index(tmp_path):
+    for name in ["S00001_a_1.png", "S00001_a_2.png", "S00002_b.png"]:
+        _touch(tmp_path / name)
+    # 不同文件夹中同名的 JSON 互不影响
+    _touch(tmp_path / "sub" / "S00001_a_3.png")
+
+    manager = Proj2_5DManager(cache_dir=None)
+    manager.assign_json_files(str(tmp_path))
+    root = Path(tmp_path).absolute().as_posix()
+    json_path = f"{root}/S00001_a.json"
+    assert manager.get_json_path(f"{root}/S00001_a_2.png").endswith("S00001_a.json")
+    assert sorted(manager.get_img_name_list(f"{root}/S00001_a_1.png")) == [
+        "S00001_a_1.png",
+        "S00001_a_2.png",
+    ]
+    assert manager.get_group_img_paths(f"{root}/sub/S00001_a_3.json") == [
+        f"{root}/sub/S00001_a_3.png"
+    ]
+
+    # 新图片改变分组的公共前缀，整组改用新的 JSON
+    _touch(tmp_path / "S00001_c.png")
+    changed = manager.add_images([str(tmp_path / "S00001_c.png")])
+    assert sorted(changed) == [
+        f"{root}/S00001_a_1.png",
+        f"{root}/S00001_a_2.png",
+        f"{root}/S00001_c.png",
+    ]
+    assert manager.get_group_img_paths(json_path) == []
+    assert len(manager.get_group_img_paths(f"{root}/S00001.json")) == 3
+    assert manager.file_to_json == assign_json(str(tmp_path), cache_dir=None)
+
+    (tmp_path / "S00001_c.png").unlink()
+    changed = manager.remove_images([f"{root}/S00001_c.png"])
+    assert sorted(changed) == [f"{root}/S00001_a_1.png", f"{root}/S00001_a_2.png"]
+    assert sorted(manager.get_img_name_list(f"{root}/S00001_a_1.png")) == [
+        "S00001_a_1.png",
+        "S00001_a_2.png",
+    ]
+    assert manager.file_to_json == assign_json(str(tmp_path), cache_dir=None)
+
+
+def _set_dir_mtimes(root, mtime):
+    for dir_path in [root] + [p for p in root.rglob("*") if p.is_dir()]:
+        os.utime(str(dir_path), (mtime, mtime))
+
+
+def test_assign_json_cache(tmp_path):
+    root = tmp_path / "images"
+    for name in ["S00001_a_1.png", "S00001_a_2.png", "sub/S00002_b_1.jpg", "c.bmp"]:
+        _touch(root / name)
+    cache_dir = str(tmp_path / "cache")
+    # 刚修改过的文件夹不使用缓存，先把 mtime 调早
+    old_mtime = time.time() - 3600
+    _set_dir_mtimes(root, old_mtime)
+
+    expected = assign_json(str(root), cache_dir=None)
+    assert len(expected) == 3
+    assert assign_json(str(root), cache_dir=cache_dir) == expected
+
+    # mtime 没变的文件夹直接使用缓存
+    (root / "S00001_a_2.png").unlink()
+    _set_dir_mtimes(root, old_mtime)
+    assert assign_json(str(root), cache_dir=cache_dir) == expected
+
+    # 内容变化（mtime 改变）的文件夹重新分组
+    _touch(root / "sub" / "S00002_c.jpg")
+    _touch(root / "new" / "S00003_d.png")
+    os.utime(str(root), None)
+    expected = assign_json(str(root), cache_dir=None)
+    assert expected[Path(root / "sub" / "S00002_c.jpg").as_posix()] == "S00002.json"
+    assert Path(root / "S00001_a_2.png").as_posix() not in expected
+    assert assign_json(str(root), cache_dir=cache_dir) == expected
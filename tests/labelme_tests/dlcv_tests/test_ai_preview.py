@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+from qtpy import QtCore
+
+from labelme.dlcv.ai import preview
+from labelme.dlcv.ai.preview import AiPreviewWorker
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict_polygon_from_points(self, points, point_labels):
+        self.calls.append(points[-1])
+        time.sleep(0.05)
+        x, y = points[-1]
+        return np.array([[x, y], [x + 1, y], [x + 1, y + 1]])
+
+
+def test_ai_preview_worker():
+    model = _FakeModel()
+    worker = AiPreviewWorker()
+    base = [QtCore.QPointF(0, 0)]
+    for i in range(10):
+        worker.request(model, "ai_polygon", [[0, 0], [i, 0]], [1, 1])
+
+    for _ in range(100):
+        geometry = worker.result(model, "ai_polygon", base)
+        if geometry is not None and geometry[0][0] == 9:
+            break
+        time.sleep(0.02)
+    else:
+        raise AssertionError("preview result not ready")
+
+    # intermediate positions are coalesced instead of decoded one by one
+    assert len(model.calls) < 10
+    assert worker.result(model, "ai_polygon", [QtCore.QPointF(1, 1)]) is None
+    assert worker.result(model, "ai_mask", base) is None
+
+    worker.clear()
+    assert worker.result(model, "ai_polygon", base) is None
+
+
+def test_ai_preview_worker_debounce(monkeypatch):
+    monkeypatch.setattr(preview, "_DEBOUNCE_MS", 100)
+    model = _FakeModel()
+    worker = AiPreviewWorker()
+    # the burst lasts longer than the debounce interval, but no gap reaches it
+    for i in range(20):
+        worker.request(model, "ai_polygon", [[0, 0], [i, 0]], [1, 1])
+        time.sleep(0.01)
+
+    base = [QtCore.QPointF(0, 0)]
+    for _ in range(100):
+        if worker.result(model, "ai_polygon", base) is not None:
+            break
+        time.sleep(0.02)
+    else:
+        raise AssertionError("preview result not ready")
+    assert model.calls == [[19, 0]]
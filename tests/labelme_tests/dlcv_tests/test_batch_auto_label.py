@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import PIL.Image
+
+from labelme.dlcv.batch_auto_label import JOURNAL_NAME
+from labelme.dlcv.batch_auto_label import BatchAutoLabelRunner
+from labelme.dlcv.batch_auto_label import first_image_per_json
+from labelme.dlcv.batch_auto_label import list_images
+from labelme.dlcv.batch_auto_label import make_json_path_fns
+
+
+def test_batch_auto_label(tmp_path):
+    for name in ("1.png", "2.png", "10.png"):
+        PIL.Image.fromarray(np.zeros((20, 30, 3), dtype=np.uint8)).save(tmp_path / name)
+
+    calls = []
+
+    def predict(img_path):
+        calls.append(img_path)
+        if img_path.endswith("2.png"):
+            raise RuntimeError("model error")
+        return {
+            "shapes": [
+                # out of bounds polygon is clipped into the image
+                {
+                    "label": "a",
+                    "shape_type": "polygon",
+                    "points": [[-5, 0], [40, 0], [40, 30], [-5, 0]],
+                },
+                {"label": "b", "shape_type": "rectangle", "points": [[1, 1], [5, 5]]},
+            ]
+        }
+
+    image_paths = list_images(str(tmp_path))
+    assert [p.rsplit("/", 1)[1] for p in image_paths] == ["1.png", "2.png", "10.png"]
+
+    journal_path = str(tmp_path / JOURNAL_NAME)
+    runner = BatchAutoLabelRunner(
+        predict, image_paths, journal_path, workers=2, category_filter_list=["a"]
+    )
+    stats = runner.run()
+    assert stats["ok"] == 2 and stats["error"] == 1 and stats["shapes"] == 2
+
+    with open(tmp_path / "1.json") as f:
+        data = json.load(f)
+    assert data["imagePath"] == "1.png"
+    assert (data["imageWidth"], data["imageHeight"]) == (30, 20)
+    assert [s["label"] for s in data["shapes"]] == ["a"]
+    assert data["shapes"][0]["points"] == [[0, 0], [29.999, 0], [29.999, 19.999]]
+    assert data["img_name_list"] == ["1.png"]
+    assert not (tmp_path / "2.json").exists()
+
+    # resuming only retries the failed image
+    calls.clear()
+    stats = BatchAutoLabelRunner(predict, image_paths, journal_path).run()
+    assert calls == [image_paths[1]]
+    assert stats["processed"] == 1
+
+
+def test_json_path_fns(tmp_path):
+    image_dir = tmp_path / "images"
+    (image_dir / "sub").mkdir(parents=True)
+    for name in ("S00001_a_1.png", "S00001_a_2.png", "sub/S00002_b.png"):
+        PIL.Image.fromarray(np.zeros((4, 4), dtype=np.uint8)).save(image_dir / name)
+    image_paths = list_images(str(image_dir))
+
+    output_dir = tmp_path / "out"
+    json_path_fn, _ = make_json_path_fns(str(image_dir), output_dir=str(output_dir))
+    assert json_path_fn(image_paths[-1]) == str(output_dir / "sub" / "S00002_b.json")
+
+    from labelme.dlcv.widget_25d_3d.manager import Proj2_5DManager
+
+    manager = Proj2_5DManager(cache_dir=None)
+    manager.assign_json_files(str(image_dir))
+    paths = first_image_per_json(image_paths, manager.get_json_path)
+    assert [p.rsplit("/", 1)[1] for p in paths] == ["S00001_a_1.png", "S00002_b.png"]
+
+    def predict(img_path):
+        return {"shapes": [{"label": "a", "points": [[0, 0], [3, 0], [3, 3]]}]}
+
+    stats = BatchAutoLabelRunner(
+        predict,
+        paths,
+        str(tmp_path / JOURNAL_NAME),
+        json_path_fn=manager.get_json_path,
+        img_name_list_fn=manager.get_img_name_list,
+    ).run()
+    assert stats["ok"] == 2
+    with open(image_dir / "S00001_a.json") as f:
+        data = json.load(f)
+    assert sorted(data["img_name_list"]) == ["S00001_a_1.png", "S00001_a_2.png"]
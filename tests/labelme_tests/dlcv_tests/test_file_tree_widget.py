@@ -0,0 +1,187 @@
+import os
+import random
+import threading
+import time
+import types
+from pathlib import Path
+
+import natsort
+
+import labelme.dlcv.file_tree_widget as file_tree_widget
+from labelme.dlcv.file_tree_widget import AnnotationIndex
+from labelme.dlcv.file_tree_widget import FileTreeModel
+from labelme.dlcv.file_tree_widget import _FileTreeWidget
+from labelme.dlcv.store import STORE
+
+
+def test_annotation_index(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "b.png").write_bytes(b"")
+
+    index = AnnotationIndex()
+    assert index.exists(str(tmp_path / "a.json"))
+    assert not index.exists(str(tmp_path / "b.json"))
+
+    # 索引建立后不再访问磁盘，依赖 set_exists 同步
+    (tmp_path / "b.json").write_text("{}")
+    assert not index.exists(str(tmp_path / "b.json"))
+    index.set_exists(str(tmp_path / "b.json"), True)
+    assert index.exists(str(tmp_path / "b.json"))
+    index.set_exists(str(tmp_path / "a.json"), False)
+    assert not index.exists(str(tmp_path / "a.json"))
+
+    index.clear()
+    assert index.exists(str(tmp_path / "a.json"))
+
+
+def test_next_unchecked_row(qapp, monkeypatch):
+    # 每块只查一行，覆盖分块查找的边界
+    monkeypatch.setattr(file_tree_widget, "_SEARCH_CHUNK", 1)
+    model = FileTreeModel()
+    model.set_root("/r")
+    root = model.root_node()
+    root.loaded = True
+    model.append_contents(
+        root,
+        [("sub", "/r/sub")],
+        [("a.png", "/r/a.png", False), ("b.png", "/r/b.png", True)],
+    )
+    sub = root.subdirs[0]
+    sub.loaded = True
+    model.append_contents(
+        sub, [], [("c.png", "/r/sub/c.png", True), ("d.png", "/r/sub/d.png", False)]
+    )
+    table = model.table
+
+    # 显示顺序：子目录内容在前，本目录文件在后
+    assert [table[row] for row in model.display_rows()] == [
+        "/r/sub/c.png",
+        "/r/sub/d.png",
+        "/r/a.png",
+        "/r/b.png",
+    ]
+    assert table[model.next_unchecked_row(-1)] == "/r/sub/d.png"
+    assert table[model.next_unchecked_row(table.get("/r/sub/d.png"))] == "/r/a.png"
+    # 到末尾后从头开始
+    assert table[model.next_unchecked_row(table.get("/r/b.png"))] == "/r/sub/d.png"
+
+    # 过滤隐藏的文件不参与查找
+    model.file_filter = lambda path: path != "/r/sub/d.png"
+    model.refilter()
+    assert model.display_position(table.get("/r/sub/d.png")) == -1
+    assert table[model.next_unchecked_row(-1)] == "/r/a.png"
+
+    # 删除后行号压缩，索引随之重建
+    model.remove_paths(["/r/a.png"])
+    assert model.next_unchecked_row(-1) == -1
+    model.set_checked("/r/b.png", False)
+    assert table[model.next_unchecked_row(-1)] == "/r/b.png"
+    assert model.next_unchecked_row(table.get("/r/b.png")) == -1
+
+
+class _ProjManager:
+    def get_json_path(self, img_path):
+        return str(Path(img_path).with_suffix(".json"))
+
+
+def _make_images(dir_path, count):
+    dir_path.mkdir()
+    names = [f"img{i}.png" for i in range(1, count + 1)]
+    random.Random(0).shuffle(names)
+    for name in names:
+        (dir_path / name).write_bytes(b"")
+    return natsort.os_sorted(f"{dir_path.as_posix()}/{name}" for name in names)
+
+
+def _wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def test_background_scan(qapp, monkeypatch, tmp_path):
+    # 每批 10 个条目，多批才能扫完一个目录
+    monkeypatch.setattr(file_tree_widget, "_SCAN_BATCH_SIZE", 10)
+    monkeypatch.setattr(file_tree_widget, "_SCAN_BATCH_INTERVAL", 60)
+    main_window = types.SimpleNamespace(is_2_5d=False, proj_manager=_ProjManager())
+    monkeypatch.setattr(STORE, "_Store__main_window", main_window)
+
+    old_paths = _make_images(tmp_path / "old", 60)
+    new_paths = _make_images(tmp_path / "new", 35)
+    (tmp_path / "new" / "img2.json").write_text("{}")
+
+    # 旧目录扫到第 25 个条目时暂停，直到新目录打开
+    resume = threading.Event()
+    scandir = os.scandir
+
+    class _PausingScandir:
+        def __init__(self, path):
+            self._it = scandir(path)
+            self._pause = Path(path).name == "old"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            self._it.close()
+
+        def __iter__(self):
+            for i, entry in enumerate(self._it):
+                if self._pause and i == 25:
+                    resume.wait(5)
+                yield entry
+
+    monkeypatch.setattr(file_tree_widget.os, "scandir", _PausingScandir)
+
+    tree = _FileTreeWidget()
+    model = tree._model
+    batches = []
+    tree.sig_scan_batch.connect(
+        lambda batch: batches.append((batch[0], batch[1].path, len(batch[3]), batch[5]))
+    )
+    selected = []
+    tree.sig_file_selected.connect(selected.append)
+
+    tree.set_root_dir(str(tmp_path / "old"))
+    old_generation = tree._scan_generation
+    old_root = model.root_node()
+    _wait_until(qapp, lambda: len(tree.image_list) >= 20)
+
+    # 扫描结束前第一批图片已经可以打开
+    assert len(tree.image_list) < len(old_paths)
+    first = tree.image_list[0]
+    tree.setCurrentItem(tree.get_item(first))
+    tree._on_item_clicked(tree.currentIndex())
+    assert selected == [first]
+
+    # 扫描中途切换目录：旧目录的扫描被取消，迟到的结果被丢弃
+    tree.set_root_dir(str(tmp_path / "new"))
+    resume.set()
+    tree.sig_scan_batch.emit(
+        (old_generation, old_root, [], [("x.png", old_paths[0])], [], True)
+    )
+    _wait_until(
+        qapp, lambda: any(b[1] == model.root_node().path and b[3] for b in batches)
+    )
+    qapp.processEvents()
+
+    new_batches = [b for b in batches if b[0] == tree._scan_generation]
+    assert len(new_batches) == 4
+    assert sum(b[2] for b in new_batches) == len(new_paths)
+    # 旧目录只发出了暂停前的两批，取消后不再有结果
+    assert [b[2:] for b in batches if b[0] == old_generation] == [
+        (10, False),
+        (10, False),
+        (1, True),
+    ]
+
+    # 全部读完后按自然顺序重新排列，没有旧目录的图片
+    table = tree.image_list
+    assert [table[row] for row in model.display_rows()] == new_paths
+    assert sorted(table) == sorted(new_paths)
+    assert tree.count() == len(new_paths)
+    assert tree.is_annotated(new_paths[1])
+    assert model.is_checked(new_paths[1])
+    assert not model.is_checked(new_paths[0])
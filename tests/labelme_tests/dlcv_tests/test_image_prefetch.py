@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+
+from labelme.dlcv.image_prefetch import ImagePrefetcher
+from labelme.dlcv.image_prefetch import decode_image_to_rgb
+
+
+def _write_image(path, value, shape=(16, 16, 3)):
+    img = np.full(shape, value, dtype=np.uint8)
+    img[..., 0] = 0  # B 通道置 0，便于检查 BGR -> RGB
+    cv2.imencode(".png", img)[1].tofile(str(path))
+    return str(path)
+
+
+def test_decode_image_to_rgb(tmp_path):
+    path = _write_image(tmp_path / "a.png", 100)
+    rgb = decode_image_to_rgb(path)
+    assert rgb.shape == (16, 16, 3)
+    assert rgb[0, 0].tolist() == [100, 100, 0]
+
+    gray = decode_image_to_rgb(path, to_gray=True)
+    assert gray[0, 0, 0] == gray[0, 0, 1] == gray[0, 0, 2]
+
+
+def test_prefetcher_hit_miss_and_eviction(tmp_path):
+    paths = [_write_image(tmp_path / f"{i}.png", i * 10) for i in range(3)]
+    one_image_bytes = 16 * 16 * 3
+
+    prefetcher = ImagePrefetcher(max_bytes=one_image_bytes * 2, max_workers=1)
+    try:
+        assert prefetcher.get(paths[0])[0, 0, 0] == 0
+        assert prefetcher.stats()["misses"] == 1
+
+        prefetcher.prefetch(paths[1:2])
+        assert prefetcher.get(paths[1])[0, 0, 0] == 10
+        assert prefetcher.stats()["hits"] == 1
+
+        # 超出字节预算时淘汰最久未使用的图片
+        prefetcher.get(paths[2])
+        stats = prefetcher.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= one_image_bytes * 2
+        prefetcher.get(paths[0])
+        assert prefetcher.stats()["misses"] == 3
+
+        prefetcher.discard(paths[0])
+        stats = prefetcher.stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] == one_image_bytes
+    finally:
+        prefetcher.shutdown()
@@ -0,0 +1,24 @@
+import numpy as np
+
+from labelme.dlcv.image_pyramid import TiledPixmap
+from labelme.utils.image import numpy_to_qimage
+
+
+def test_tiled_pixmap_levels():
+    array = np.zeros((1000, 3000, 3), dtype=np.uint8)
+    array[:, 1500:] = 200
+    pixmap = TiledPixmap(numpy_to_qimage(array), array)
+    pixmap._thread.join()
+
+    # 对外保持原图尺寸
+    assert (pixmap.width(), pixmap.height()) == (3000, 1000)
+    assert pixmap.toImage().pixelColor(2000, 10).red() == 200
+    # 3000 -> 1500 -> 750 -> 375
+    assert pixmap.ready_levels() == [0, 1, 2, 3]
+    assert pixmap.level_for_scale(2.0) == 0
+    assert pixmap.level_for_scale(1.0) == 0
+    assert pixmap.level_for_scale(0.5) == 1
+    assert pixmap.level_for_scale(0.3) == 1
+    assert pixmap.level_for_scale(0.01) == 3
+
+    pixmap.close()
@@ -0,0 +1,42 @@
+import os
+import time
+
+from labelme.dlcv.label_stats import LabelStatsCache
+from labelme.dlcv.label_stats import scan_label_stats
+from labelme.utils import json_codec
+
+
+def _write(path, labels, flags=None):
+    json_codec.dump_file(
+        {"shapes": [{"label": label} for label in labels], "flags": flags or {}},
+        str(path),
+    )
+
+
+def test_scan_label_stats(tmp_path):
+    root = tmp_path / "images"
+    (root / "sub").mkdir(parents=True)
+    _write(root / "a.json", ["cat", "dog", "cat"], {"ok": True, "ng": False})
+    _write(root / "sub" / "b.json", ["dog"])
+    (root / "broken.json").write_text("{")
+    (root / "c.txt").write_text("")
+    cache_dir = str(tmp_path / "cache")
+
+    result = scan_label_stats(str(root), LabelStatsCache(str(root), cache_dir))
+    assert result.finished
+    assert (result.json_count, result.read_count) == (3, 3)
+    assert result.labels == {"cat": 2, "dog": 2}
+    assert result.flags == {"ok": 1}
+
+    # 只重新读取变化的文件；读取失败的文件不缓存
+    time.sleep(0.01)
+    _write(root / "sub" / "b.json", ["bird"])
+    os.remove(str(root / "a.json"))
+    result = scan_label_stats(str(root), LabelStatsCache(str(root), cache_dir))
+    assert (result.json_count, result.read_count) == (2, 2)
+    assert result.labels == {"bird": 1}
+    assert not result.flags
+
+    result = scan_label_stats(str(root), LabelStatsCache(str(root), cache_dir))
+    assert (result.json_count, result.read_count) == (2, 1)
+    assert result.labels == {"bird": 1}
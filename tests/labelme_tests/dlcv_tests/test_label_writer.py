@@ -0,0 +1,56 @@
+import os
+import threading
+
+import numpy as np
+from qtpy import QtCore
+
+from labelme.dlcv.label_file import LabelFile
+from labelme.dlcv.label_writer import LabelFileWriter
+from labelme.dlcv.label_writer import snapshot_shape
+from labelme.dlcv.label_writer import write_label_file
+from labelme.dlcv.shape import Shape
+
+
+def test_label_file_writer(tmp_path):
+    mask_shape = Shape(label="a", shape_type="mask")
+    mask_shape.points = [QtCore.QPointF(1, 2), QtCore.QPointF(5, 6)]
+    mask_shape.mask = np.eye(4, dtype=bool)
+    mask_shape.other_data = {"score": [0.5]}
+    rotation = Shape(label="b", shape_type="rotation", flags={"x": True})
+    rotation.points = [
+        QtCore.QPointF(x, y) for x, y in [(0, 0), (10, 0), (10, 4), (0, 4)]
+    ]
+    rotation.direction = 370.0
+    shapes = [snapshot_shape(mask_shape), snapshot_shape(rotation)]
+    # 快照不受之后修改的影响
+    mask_shape.other_data["score"].append(1.0)
+    mask_shape.mask[0, 1] = True
+
+    filename = str(tmp_path / "a.json")
+    kwargs = dict(imagePath="a.png", imageHeight=4, imageWidth=4, flags={"ok": True})
+    writer = LabelFileWriter()
+    release = threading.Event()
+    writer.submit(str(tmp_path / "first.json"), release.wait)
+    # 同一文件未开始的写入只保留最后一次
+    writer.submit(filename, lambda: 1 / 0)
+    writer.submit(filename, lambda: write_label_file(filename, shapes, **kwargs))
+    assert writer.is_pending(filename)
+    release.set()
+    writer.wait(filename)
+    assert not writer.is_pending(filename)
+    writer.shutdown()
+    assert os.listdir(tmp_path) == ["a.json"]
+
+    # 内存中的结果与读回文件一致
+    saved = LabelFile()
+    saved.set_saved_data(filename, shapes, "a.png", flags={"ok": True})
+    loaded = LabelFile(filename)
+    assert saved.flags == loaded.flags == {"ok": True}
+    assert saved.imagePath == loaded.imagePath
+    assert saved.otherData == loaded.otherData
+    for a, b in zip(saved.shapes, loaded.shapes):
+        mask_a, mask_b = a.pop("mask"), b.pop("mask")
+        assert a == b
+        assert (mask_a is None and mask_b is None) or np.array_equal(mask_a, mask_b)
+    assert loaded.shapes[0]["other_data"] == {"score": [0.5]}
+    assert loaded.shapes[1]["other_data"]["direction"] == 10.0
@@ -0,0 +1,42 @@
+import numpy as np
+
+from labelme import utils
+from labelme.dlcv.mask_codec import LazyMask
+from labelme.dlcv.mask_codec import decode_mask
+from labelme.dlcv.mask_codec import encode_mask
+from labelme.dlcv.shape import Shape
+
+
+def test_rle_encode_decode():
+    mask = np.array([[1, 0, 0], [1, 1, 0]], dtype=bool)
+    # 列优先，第一段为 0 的个数：游程 [0, 2, 1, 1, 2]，与 pycocotools 的结果一致
+    assert encode_mask(mask, "rle") == {"size": [2, 3], "counts": "021O1"}
+    assert np.array_equal(
+        decode_mask({"size": [2, 3], "counts": [0, 2, 1, 1, 2]}), mask
+    )
+    big = np.zeros((3000, 3000), dtype=bool)
+    big[100:2900, 50:2950] = True
+    assert np.array_equal(decode_mask(encode_mask(big, "rle")), big)
+
+    rng = np.random.default_rng(0)
+    for shape in [(1, 1), (7, 13), (64, 33)]:
+        mask = rng.random(shape) > 0.5
+        assert np.array_equal(decode_mask(encode_mask(mask, "rle")), mask)
+        assert np.array_equal(decode_mask(encode_mask(mask, "png")), mask)
+    # 旧格式
+    assert np.array_equal(
+        decode_mask(utils.img_arr_to_b64(mask.astype(np.uint8))), mask
+    )
+
+
+def test_shape_lazy_mask():
+    mask = np.eye(5, dtype=bool)
+    data = encode_mask(mask, "rle")
+    shape = Shape(label="a", shape_type="mask", mask=LazyMask(data))
+    copied = shape.copy()
+    assert isinstance(shape.raw_mask, LazyMask)
+    # 未解码的 mask 按原格式保存时直接写回原数据
+    assert encode_mask(shape.raw_mask, "rle") is data
+    assert np.array_equal(shape.mask, mask)
+    assert isinstance(shape.raw_mask, np.ndarray)
+    assert isinstance(copied.raw_mask, LazyMask)
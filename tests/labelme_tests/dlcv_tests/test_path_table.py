@@ -0,0 +1,33 @@
+import pytest
+
+from labelme.dlcv.path_table import PathTable
+
+
+def test_path_table():
+    paths = [f"C:/data/{d}/{i}.png" for d in ("a", "b") for i in range(3000)]
+    table = PathTable()
+    table.extend(paths[:10])
+    for path in paths[10:]:
+        table.add(path)
+
+    assert len(table) == len(paths)
+    assert list(table) == paths
+    assert table[-1] == paths[-1]
+    assert table[1:3] == paths[1:3]
+    assert table.name(3001) == "1.png"
+    assert table.index(paths[4500]) == 4500
+    assert table.add(paths[7]) == 7
+    assert "C:/data/c/0.png" not in table
+    with pytest.raises(KeyError):
+        table.index("C:/data/c/0.png")
+
+    mapping = table.remove_rows([0, 2])
+    assert mapping[:4].tolist() == [-1, 0, -1, 1]
+    assert table.index(paths[3]) == 1
+    assert len(table) == len(paths) - 2
+
+
+def test_path_table_non_ascii():
+    table = PathTable(["/图片/样本 1.jpg", "relative.png", "/root.png"])
+    assert list(table) == ["/图片/样本 1.jpg", "relative.png", "/root.png"]
+    assert table.index("relative.png") == 1
@@ -0,0 +1,34 @@
+from qtpy import QtCore
+
+from labelme.dlcv.shape import Shape
+
+
+def _xy(point):
+    return point.x(), point.y()
+
+
+def test_label_paint_point_cache():
+    # U 形多边形，外接矩形中心 (5, 5) 不在多边形内
+    points = [(0, 0), (10, 0), (10, 10), (8, 10), (8, 2), (2, 2), (2, 10), (0, 10)]
+    shape = Shape(label="a", shape_type="polygon", points=[list(p) for p in points])
+
+    assert shape.get_bounding_box() == (0, 0, 10, 10)
+    assert _xy(shape.get_center_point()) == (5, 5)
+    assert _xy(shape.get_label_paint_point("center")) == (8, 5)
+    assert _xy(shape.get_label_paint_point("top_left")) == (0, 0)
+    # 返回副本，修改返回值不影响缓存
+    shape.get_center_point().setX(100)
+    assert _xy(shape.get_center_point()) == (5, 5)
+
+    shape.moveBy(QtCore.QPointF(1, 1))
+    assert _xy(shape.get_label_paint_point("center")) == (9, 6)
+
+    shape.moveVertexBy(0, QtCore.QPointF(-1, 0))
+    assert shape.get_bounding_box() == (0, 1, 11, 11)
+
+    shape.points = [QtCore.QPointF(x, y) for x, y in points]
+    assert shape.get_bounding_box() == (0, 0, 10, 10)
+
+    shape.points[1].setX(20)
+    shape.mark_geometry_changed()
+    assert shape.get_bounding_box() == (0, 0, 20, 10)
@@ -0,0 +1,103 @@
+import numpy as np
+from qtpy import QtCore
+
+from labelme.dlcv import shape_history
+from labelme.dlcv.shape import Shape
+from labelme.dlcv.shape_history import ShapeHistory
+
+
+def _polygon(label, offset=0):
+    shape = Shape(label=label, shape_type="polygon")
+    for x, y in [(0, 0), (10, 0), (10, 10), (0, 10)]:
+        shape.addPoint(QtCore.QPointF(x + offset, y))
+    shape.mask = np.zeros((100, 100), dtype=bool)
+    return shape
+
+
+def test_shape_history_shares_unchanged_shapes():
+    shapes = [_polygon("a"), _polygon("b", offset=20)]
+    history = ShapeHistory(max_snapshots=10)
+    history.push(shapes)
+    first_bytes = history.total_bytes
+
+    shapes[1].points[0].setX(5)
+    shapes[1].mark_geometry_changed()
+    history.push(shapes)
+    assert len(history) == 2
+    # unchanged shape and the unchanged mask of the moved one are shared
+    assert history[-1][0] is history[-2][0]
+    assert history[-1][1].mask is history[-2][1].mask
+    assert history[-2][1].points[0].x() == 20
+    assert history[-1][1].points[0].x() == 5
+    assert history.total_bytes < first_bytes * 1.5
+
+    history.pop()
+    restored = history.thaw(history.pop(), shapes)
+    assert [s.points[0].x() for s in restored] == [0, 20]
+    # only the shape touched by the undone edit is copied
+    assert restored[0] is shapes[0]
+    assert restored[1] is not shapes[1]
+    assert shapes[1].points[0].x() == 5
+    assert len(history) == 0
+    assert history.total_bytes == 0
+
+
+def test_shape_history_limits():
+    shapes = [_polygon("a")]
+    history = ShapeHistory(max_snapshots=3)
+    for i in range(10):
+        shapes[0].label = str(i)
+        history.push(shapes)
+    assert len(history) == 4
+    assert [s[0].label for s in history] == ["6", "7", "8", "9"]
+
+    # the memory cap drops the oldest snapshots but keeps one undo step
+    history.set_max_bytes(0)
+    assert len(history) == 2
+
+
+def test_shape_history_ignores_render_caches():
+    shape = _polygon("a")
+    shape._cache_mask_contour = (shape.mask, object())
+    history = ShapeHistory()
+    history.push([shape])
+
+    # a rebuilt cache is not an edit, and caches are never copied
+    shape._cache_mask_contour = (shape.mask, object())
+    history.push([shape])
+    assert history[-1][0] is history[-2][0]
+    assert "_cache_mask_contour" not in history[-1][0].__dict__
+    assert "_cache_mask_contour" not in shape.copy().__dict__
+
+
+def test_shape_history_skips_unchanged_shapes(monkeypatch):
+    shapes = [_polygon("a", offset=i * 20) for i in range(100)]
+    history = ShapeHistory()
+    history.push(shapes)
+
+    compared = []
+    value_equal = shape_history._value_equal
+    monkeypatch.setattr(
+        shape_history,
+        "_value_equal",
+        lambda a, b: (compared.append(a), value_equal(a, b))[1],
+    )
+    # unchanged shapes are skipped without comparing attributes, and the
+    # untouched mask of the moved shape is shared without comparing pixels
+    shapes[0].moveVertexBy(0, QtCore.QPointF(1, 1))
+    history.push(shapes)
+    assert history[-1][1:] == history[-2][1:]
+    assert history[-1][0].points[0].x() == 1
+    assert history[-1][0].mask is history[-2][0].mask
+    assert len(compared) < len(shapes[0].__dict__)
+    assert not any(isinstance(v, np.ndarray) for v in compared)
+
+    # in-place edits of small attributes and replaced masks are still recorded
+    shapes[1].other_data["ok"] = True
+    shapes[2].mask = np.ones((100, 100), dtype=bool)
+    history.push(shapes)
+    assert history[-1][1].other_data == {"ok": True}
+    assert history[-2][1].other_data == {}
+    assert history[-1][2].mask.all()
+    assert not history[-2][2].mask.any()
+    assert history[-1][3] is history[-2][3]
@@ -0,0 +1,92 @@
+from qtpy import QtCore
+
+from labelme.dlcv.shape import Shape
+from labelme.dlcv.shape_index import ShapeGridIndex
+
+
+def _shape(shape_type, points):
+    return Shape(
+        label="a",
+        shape_type=shape_type,
+        points=[QtCore.QPointF(x, y) for x, y in points],
+    )
+
+
+def test_shape_grid_index():
+    square = _shape("polygon", [(0, 0), (10, 0), (10, 10), (0, 10)])
+    far = _shape("polygon", [(500, 500), (520, 500), (520, 520)])
+    circle = _shape("circle", [(100, 100), (130, 100)])
+    large = _shape("rectangle", [(0, 0), (5000, 5000)])
+    shapes = [square, far, None, circle, large]
+
+    index = ShapeGridIndex()
+    assert index.query_point(shapes, QtCore.QPointF(5, 5), 0) == [square, large]
+    # the circle extends beyond its two points
+    assert index.query_point(shapes, QtCore.QPointF(75, 100), 0) == [circle, large]
+    assert index.query_point(shapes, QtCore.QPointF(12, 5), 3) == [square, large]
+    assert index.query(shapes, 0, 0, 600, 600) == [square, far, circle, large]
+
+    # edits are picked up after invalidate(), added shapes automatically
+    far.points = [QtCore.QPointF(x + 1000, y) for x, y in [(0, 0), (9, 0), (9, 9)]]
+    index.invalidate()
+    shapes.append(_shape("point", [(1005, 5)]))
+    assert index.query_point(shapes, QtCore.QPointF(1005, 5), 1) == [
+        far,
+        large,
+        shapes[-1],
+    ]
+    assert index.query_items(shapes, 0, 0, 10, 10)[0] == (square, (0, 0, 10, 10))
+
+    # moving a shape without invalidate() is picked up by refresh()
+    square.moveBy(QtCore.QPointF(2000, 0))
+    index.refresh(shapes, [square])
+    assert index.query_point(shapes, QtCore.QPointF(5, 5), 0) == [large]
+    assert index.query_point(shapes, QtCore.QPointF(2005, 5), 0) == [square, large]
+
+
+def test_canvas_drag_keeps_index(qapp, monkeypatch):
+    from qtpy import QtGui
+
+    from labelme.dlcv.canvas import Canvas
+
+    canvas = Canvas(epsilon=10.0, double_click="close", num_backups=10)
+    pixmap = QtGui.QPixmap(1000, 1000)
+    pixmap.fill()
+    canvas.loadPixmap(pixmap)
+    shapes = [
+        _shape("polygon", [(x, y), (x + 10, y), (x + 10, y + 10), (x, y + 10)])
+        for x in range(0, 1000, 50)
+        for y in range(0, 500, 50)
+    ]
+    canvas.loadShapes(shapes)
+    target = shapes[0]
+
+    builds = []
+    build = ShapeGridIndex._build
+    monkeypatch.setattr(
+        ShapeGridIndex, "_build", lambda self, s: (builds.append(1), build(self, s))
+    )
+    index = canvas._shape_index
+    assert index.query_point(canvas.shapes, QtCore.QPointF(5, 5), 0) == [target]
+    assert len(builds) == 1
+
+    # MainWindow 收到 selectionChanged 后设置选中图形
+    canvas.selectedShapes = [target]
+    canvas.prevPoint = QtCore.QPointF(5, 5)
+    for x in range(10, 40, 10):
+        canvas.mouseMoveEvent(
+            QtGui.QMouseEvent(
+                QtCore.QEvent.MouseMove,
+                QtCore.QPointF(5 + x, 5 + 600),
+                QtCore.Qt.NoButton,
+                QtCore.Qt.LeftButton,
+                QtCore.Qt.NoModifier,
+            )
+        )
+
+    # 拖动中不重建索引，被拖动的图形按新位置返回
+    assert len(builds) == 1
+    canvas._sync_shape_index()
+    assert index.query_point(canvas.shapes, QtCore.QPointF(5, 5), 0) == []
+    assert index.query_point(canvas.shapes, QtCore.QPointF(35, 605), 0) == [target]
+    assert len(builds) == 1
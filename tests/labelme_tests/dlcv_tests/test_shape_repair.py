@@ -0,0 +1,91 @@
+import numpy as np
+from qtpy import QtCore
+from shapely import Polygon
+
+import labelme.dlcv.shape_repair as shape_repair
+from labelme.dlcv.shape import Shape
+from labelme.dlcv.shape_repair import PolygonValidityCache
+from labelme.dlcv.shape_repair import fix_points
+from labelme.dlcv.shape_repair import polygons_valid
+
+
+def test_polygons_valid():
+    square = [[0, 0], [10, 0], [10, 10], [0, 10]]
+    bowtie = [[0, 0], [10, 10], [10, 0], [0, 10]]
+    degenerate = [[0, 0], [1, 0], [0, 0]]
+    points_list = [square, bowtie, degenerate, square]
+
+    valid = polygons_valid(points_list)
+    np.testing.assert_array_equal(valid, [True, False, False, True])
+    assert len(polygons_valid([])) == 0
+
+
+def test_fix_points():
+    points = fix_points("polygon", [[-5, 0], [20, 0], [20, 20], [0, 20]], 10, 10)
+    assert points == [[0.0, 0.0], [9.999, 0.0], [9.999, 9.999], [0.0, 9.999]]
+
+    points = fix_points("polygon", [[0, 0], [9, 9], [9, 0], [0, 9]], 10, 10)
+    assert points is not None
+    assert Polygon(points).is_valid
+
+    assert fix_points("polygon", [[0, 0], [1, 1]], 10, 10) is None
+    assert fix_points("rectangle", [[-1, -1], [11, 11]], 10, 10) == [
+        [0.0, 0.0],
+        [9.999, 9.999],
+    ]
+
+
+def test_polygon_validity_cache(monkeypatch):
+    square = Shape(
+        label="a", shape_type="polygon", points=[[0, 0], [10, 0], [10, 10], [0, 10]]
+    )
+    bowtie = Shape(
+        label="b", shape_type="polygon", points=[[0, 0], [10, 10], [10, 0], [0, 10]]
+    )
+    rectangle = Shape(label="c", shape_type="rectangle", points=[[0, 0], [5, 5]])
+    shapes = [rectangle, square, bowtie]
+
+    checked = []
+
+    def counting_polygons_valid(points_list):
+        checked.append(len(points_list))
+        return polygons_valid(points_list)
+
+    monkeypatch.setattr(shape_repair, "polygons_valid", counting_polygons_valid)
+
+    cache = PolygonValidityCache()
+    invalid = cache.check(shapes)
+    assert [(index, shape) for index, shape, _ in invalid] == [(2, bowtie)]
+    assert "Self-intersection" in invalid[0][2]
+
+    # 没有修改时不再检查
+    assert cache.check(shapes) == invalid
+    assert checked == [2]
+
+    # 只重新检查修改过的图形
+    square.moveVertexBy(2, QtCore.QPointF(-10, -10))
+    bowtie.points = [QtCore.QPointF(x, y) for x, y in [(0, 0), (10, 0), (10, 10)]]
+    assert [(index, shape) for index, shape, _ in cache.check(shapes)] == [(1, square)]
+    assert checked == [2, 2]
+    cache.check(shapes)
+    assert checked == [2, 2]
+
+
+def test_repair_polygon_points_from_mask_crop():
+    import cv2
+
+    from labelme.ai._utils import compute_polygon_from_mask
+
+    width, height = 200, 120
+    for points in (
+        [[0, 0], [9, 9], [9, 0], [0, 9]],
+        [[150, 30], [199, 119], [199, 30], [150, 119]],
+        [[40, 50], [80, 90], [80, 50], [60, 70], [40, 90]],
+    ):
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, [np.array(points, dtype=np.int32).reshape(-1, 1, 2)], 1)
+        expected = compute_polygon_from_mask(mask=mask.astype(bool)).tolist()
+        assert (
+            shape_repair.repair_polygon_points_from_mask(points, width, height)
+            == expected
+        )
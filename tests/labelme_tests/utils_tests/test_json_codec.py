@@ -0,0 +1,65 @@
+import json
+import math
+
+from labelme.label_file import LabelFile
+from labelme.utils import json_codec
+
+
+def test_codecs_match_stdlib():
+    data = {
+        "label": "缺陷",
+        "points": [(1.25, 2.0), [3.1415926535, 1e-7]],
+        "flags": {"ok": True},
+        "big": 2**70,
+        "group_id": None,
+    }
+    expected = json.loads(json.dumps(data))
+    for codec in json_codec.available_codecs():
+        indented = json_codec.dumps(data, codec=codec)
+        compact = json_codec.dumps(data, compact=True, codec=codec)
+        assert json_codec.loads(indented, codec=codec) == expected
+        assert json_codec.loads(compact, codec=codec) == expected
+        assert b"\n" not in compact
+        assert "缺陷".encode("utf-8") in indented
+    assert json_codec.dumps(data, codec="json") == json.dumps(
+        data, ensure_ascii=False, indent=2
+    ).encode("utf-8")
+
+
+def test_codecs_keep_non_finite_floats():
+    data = {"points": [[float("nan"), 1.5], [float("inf"), -float("inf")]]}
+    for codec in json_codec.available_codecs():
+        for compact in (False, True):
+            encoded = json_codec.dumps(data, compact=compact, codec=codec)
+            assert b"null" not in encoded
+            for load_codec in json_codec.available_codecs():
+                points = json_codec.loads(encoded, codec=load_codec)["points"]
+                assert math.isnan(points[0][0])
+                assert points[0][1] == 1.5
+                assert points[1] == [math.inf, -math.inf]
+
+
+def test_label_file_compact_save(tmp_path):
+    filename = str(tmp_path / "a.json")
+    shape = dict(
+        label="a",
+        points=[[1.23456, 2.0], [3.0, 4.98765]],
+        group_id=None,
+        description="",
+        shape_type="line",
+        flags={},
+        mask=None,
+    )
+    LabelFile().save(
+        filename=filename,
+        shapes=[shape],
+        imagePath="a.png",
+        imageHeight=10,
+        imageWidth=10,
+        compact=True,
+        point_decimals=2,
+    )
+    with open(filename, "rb") as f:
+        assert b"\n" not in f.read()
+    data = json_codec.load_file(filename)
+    assert data["shapes"][0]["points"] == [[1.23, 2.0], [3.0, 4.99]]
@@ -1,6 +1,7 @@
 # -*- encoding: utf-8 -*-
 
 import pytest
+from qtpy import QtCore
 
 from labelme.widgets import LabelListWidget
 from labelme.widgets import LabelListWidgetItem
@@ -18,3 +19,44 @@ def test_LabelListWidget(qtbot):
     widget.show()
     qtbot.addWidget(widget)
     qtbot.waitExposed(widget)
+
+
+class _Shape(object):
+    pass
+
+
+@pytest.mark.gui
+def test_LabelListWidget_bulk(qtbot):
+    widget = LabelListWidget()
+    qtbot.addWidget(widget)
+    dropped = []
+    widget.itemDropped.connect(lambda: dropped.append(True))
+
+    shapes = [_Shape() for _ in range(6)]
+    items = [LabelListWidgetItem(text=str(i), shape=s) for i, s in enumerate(shapes)]
+    for item in items:
+        widget.addItem(item)
+    assert widget.findItemByShape(shapes[3]) is items[3]
+
+    widget.selectItems([items[1], items[2], items[4]])
+    assert widget.selectedItems() == [items[1], items[2], items[4]]
+
+    widget.removeItems([items[4], items[0], items[1]])
+    assert [item.text() for item in widget] == ["2", "3", "5"]
+    assert len(dropped) == 1
+    with pytest.raises(ValueError):
+        widget.findItemByShape(shapes[0])
+    assert widget.findItemByShape(shapes[5]) is items[5]
+
+    # drag and drop inserts copies of the items
+    model = widget.model()
+    data = model.mimeData([model.index(0, 0)])
+    model.dropMimeData(data, QtCore.Qt.MoveAction, 3, 0, QtCore.QModelIndex())
+    model.removeRows(0, 1)
+    assert [item.text() for item in widget] == ["3", "5", "2"]
+    for item in widget:
+        assert widget.findItemByShape(item.shape()) is item
+
+    widget.clear()
+    with pytest.raises(ValueError):
+        widget.findItemByShape(shapes[3])